@@ -0,0 +1,73 @@
+"""
+Measures the per-stream CPU cost of the PCM and Opus output modes.
+
+Usage: python -m benchmarks.codec_cpu <audio file or URL> [bitrate_kbps]
+
+Each mode is driven the way discord.py's AudioPlayer drives it: PCM frames are
+Opus-encoded inside this process, Opus packets are only read. CPU time is
+reported separately for this process and for the FFmpeg child, normalised per
+minute of audio.
+"""
+import resource
+import sys
+import time
+
+import discord
+
+from utils.audio_sources import STREAM_BEFORE_OPTIONS
+
+
+def _cpu() -> tuple[float, float]:
+    own = resource.getrusage(resource.RUSAGE_SELF)
+    children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return own.ru_utime + own.ru_stime, children.ru_utime + children.ru_stime
+
+
+def measure(mode: str, location: str, bitrate: int) -> dict:
+    before_options = STREAM_BEFORE_OPTIONS if location.startswith(("http://", "https://")) else None
+    if mode == "opus":
+        source = discord.FFmpegOpusAudio(location, bitrate=bitrate, before_options=before_options, options="-vn")
+        encoder = None
+    else:
+        source = discord.FFmpegPCMAudio(location, before_options=before_options, options="-vn")
+        encoder = discord.opus.Encoder()
+        encoder.set_bitrate(bitrate)
+
+    own_start, children_start = _cpu()
+    wall_start = time.perf_counter()
+    frames = 0
+    while True:
+        data = source.read()
+        if not data:
+            break
+        if encoder is not None:
+            encoder.encode(data, encoder.SAMPLES_PER_FRAME)
+        frames += 1
+    source.cleanup()
+    wall = time.perf_counter() - wall_start
+    own_end, children_end = _cpu()
+
+    audio_minutes = frames * 0.02 / 60 or 1
+    return {
+        "mode": mode,
+        "frames": frames,
+        "audio_seconds": round(frames * 0.02, 2),
+        "wall_seconds": round(wall, 3),
+        "bot_cpu_per_audio_minute": round((own_end - own_start) / audio_minutes, 4),
+        "ffmpeg_cpu_per_audio_minute": round((children_end - children_start) / audio_minutes, 4),
+    }
+
+
+def main():
+    if len(sys.argv) < 2:
+        print(__doc__)
+        return
+    location = sys.argv[1]
+    bitrate = int(sys.argv[2]) if len(sys.argv) > 2 else 64
+    for mode in ("pcm", "opus"):
+        result = measure(mode, location, bitrate)
+        print(" ".join(f"{key}={value}" for key, value in result.items()))
+
+
+if __name__ == '__main__':
+    main()
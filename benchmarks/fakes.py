@@ -0,0 +1,150 @@
+"""
+Stand-ins for the Discord objects `QuranDashboardView` touches.
+
+`FakeVoiceClient` pulls frames from audio sources in real time (one per 20ms),
+the way discord.py's AudioPlayer does, and records when every audible frame
+was delivered.
+"""
+import asyncio
+import threading
+import time
+
+import discord
+
+from utils.audio_sources import OPUS_SILENCE_FRAME, SILENCE_FRAME
+
+FRAME_SECONDS = 0.02
+
+
+class FakeVoiceClient:
+    def __init__(self, channel: "FakeVoiceChannel"):
+        self.channel = channel
+        self.frame_times = []
+        self.plays = 0
+        self._connected = True
+        self._thread = None
+        self._stopped = threading.Event()
+        self._encoder = None
+
+    def is_connected(self) -> bool:
+        return self._connected
+
+    def is_playing(self) -> bool:
+        return self._thread is not None and self._thread.is_alive() and not self._stopped.is_set()
+
+    async def move_to(self, channel: "FakeVoiceChannel"):
+        self.channel = channel
+
+    async def disconnect(self, *, force: bool = False):
+        self.stop()
+        self._connected = False
+
+    def play(self, source: discord.AudioSource, *, after=None):
+        if self.is_playing():
+            raise discord.ClientException("Already playing audio.")
+        self.plays += 1
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, args=(source, after, self._stopped), daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stopped.set()
+
+    def _encode(self, data: bytes):
+        # Mirror the CPU the real player spends encoding PCM in-process
+        if self._encoder is None:
+            if not discord.opus.is_loaded():
+                return
+            self._encoder = discord.opus.Encoder()
+        self._encoder.encode(data, self._encoder.SAMPLES_PER_FRAME)
+
+    def _run(self, source: discord.AudioSource, after, stopped: threading.Event):
+        error = None
+        next_tick = time.perf_counter()
+        try:
+            while not stopped.is_set():
+                data = source.read()
+                if not data:
+                    break
+                if not source.is_opus():
+                    self._encode(data)
+                if data not in (SILENCE_FRAME, OPUS_SILENCE_FRAME):
+                    self.frame_times.append(time.perf_counter())
+                next_tick += FRAME_SECONDS
+                delay = next_tick - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                else:
+                    next_tick = time.perf_counter()
+        except Exception as e:
+            error = e
+        finally:
+            source.cleanup()
+            stopped.set()
+            if after is not None:
+                after(error)
+
+
+class FakeVoiceChannel:
+    def __init__(self, guild: "FakeGuild", bitrate: int = 64000):
+        self.guild = guild
+        self.bitrate = bitrate
+
+    async def connect(self) -> FakeVoiceClient:
+        self.guild.voice_client = FakeVoiceClient(self)
+        return self.guild.voice_client
+
+
+class FakeGuild:
+    def __init__(self, guild_id: int):
+        self.id = guild_id
+        self.voice_client = None
+
+
+class FakeVoiceState:
+    def __init__(self, channel: FakeVoiceChannel):
+        self.channel = channel
+
+
+class FakeUser:
+    display_name = "benchmark"
+
+    def __init__(self, channel: FakeVoiceChannel):
+        self.voice = FakeVoiceState(channel)
+
+
+class FakeMessage:
+    def __init__(self, message_id: int, embed: discord.Embed):
+        self.id = message_id
+        self.embeds = [embed]
+
+
+class FakeResponse:
+    async def send_message(self, *args, **kwargs):
+        pass
+
+    async def edit_message(self, *args, **kwargs):
+        pass
+
+    async def send_modal(self, *args, **kwargs):
+        pass
+
+
+class FakeInteraction:
+    """
+    Interaction whose message edits are recorded with their latency.
+    """
+    def __init__(self, guild: FakeGuild, channel: FakeVoiceChannel, message: FakeMessage, edit_latency: float = 0.0):
+        self.guild = guild
+        self.user = FakeUser(channel)
+        self.message = message
+        self.response = FakeResponse()
+        self.data = {}
+        self.edit_latency = edit_latency
+        self.edits = []
+
+    async def edit_original_response(self, **kwargs):
+        start = time.perf_counter()
+        if self.edit_latency:
+            await asyncio.sleep(self.edit_latency)
+        self.edits.append(time.perf_counter() - start)
@@ -0,0 +1,189 @@
+"""
+Reproducible playback benchmarks against local API and voice stand-ins.
+
+Usage: python -m benchmarks.run [--scenario NAME ...] [--latency MS] [--error-rate P] [--cache]
+
+Drives `QuranDashboardView` through full-surah, range, translation and Full Quran
+playback, then reports time-to-first-audio, the inter-ayah gap distribution,
+API calls per surah, CPU and RSS. Results are saved as JSON (one file per run,
+named after the timestamp and commit) so runs can be compared across commits.
+Requires FFmpeg on PATH.
+"""
+import argparse
+import asyncio
+import json
+import os
+import resource
+import statistics
+import subprocess
+import tempfile
+import time
+
+import discord
+
+from benchmarks.fakes import FRAME_SECONDS, FakeGuild, FakeInteraction, FakeMessage, FakeVoiceChannel
+from benchmarks.stand_ins import StandInAPI
+from cogs.quran_dashboard import QuranDashboardView
+from utils import api_client, audio_cache, ayah_timestamps, chapter_index, embed_updates, opus_store, playback, providers, sessions, translation_store
+
+# name -> (surah_number, language, start_ayah, end_ayah, first_surah for Full Quran)
+SCENARIOS = {
+    "full_surah": (1, "none", None, None, None),
+    "range": (2, "none", 1, 10, None),
+    "translation": (1, "en.sahih", None, None, None),
+    "full_quran": (0, "none", None, None, 112),
+}
+
+
+def _cpu_seconds() -> dict:
+    own = resource.getrusage(resource.RUSAGE_SELF)
+    children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return {"bot": own.ru_utime + own.ru_stime, "ffmpeg": children.ru_utime + children.ru_stime}
+
+
+def _rss_bytes() -> int:
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+
+
+def _percentile(values: list[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def _commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def reset_state(api: StandInAPI, workdir: str, cache_bytes: int):
+    """
+    Gives every scenario fresh process-wide singletons pointed at the stand-ins.
+    """
+    api_client.set_client(api_client.QuranAPIClient(
+        quran_com_api=api.quran_com_api, alquran_cloud_api=api.alquran_cloud_api, islamic_network_cdn=api.islamic_network_cdn,
+    ))
+    audio_cache._cache = audio_cache.AudioCache(os.path.join(workdir, "audio"), cache_bytes)
+    chapter_index._index = None
+    ayah_timestamps._index = ayah_timestamps.AyahTimestampIndex(os.path.join(workdir, "ayah_timestamps.sqlite3"))
+    translation_store._store = translation_store.TranslationStore(os.path.join(workdir, "translations.sqlite3"))
+    opus_store._store = opus_store.OpusAssetStore(os.path.join(workdir, "opus"), workers=0)
+    playback._engine = None
+    embed_updates._scheduler = None
+    providers._resolver = None
+    sessions._registry = sessions.SessionRegistry(os.path.join(workdir, "sessions.sqlite3"))
+
+
+async def run_scenario(name: str, api: StandInAPI, guild_id: int) -> dict:
+    surah_number, language, start_ayah, end_ayah, first_surah = SCENARIOS[name]
+    guild = FakeGuild(guild_id)
+    channel = FakeVoiceChannel(guild)
+    embed = discord.Embed(title="benchmark", description="")
+    interaction = FakeInteraction(guild, channel, FakeMessage(guild_id, embed))
+
+    view = QuranDashboardView()
+    session = sessions.get_session_registry().create(interaction.message.id, guild_id, surah_number)
+    session.language = language
+    session.start_ayah, session.end_ayah = start_ayah, end_ayah
+    if first_surah:
+        session.current_surah = first_surah
+
+    api.calls.clear()
+    cpu_start = _cpu_seconds()
+    started = time.perf_counter()
+
+    await view.play_button.callback(interaction)
+    if session.play_task:
+        await session.play_task
+    player = playback.get_engine().players.get(guild.id)
+    if player is not None and player.current is not None:
+        await player.current.future
+    await asyncio.sleep(0.1)
+
+    elapsed = time.perf_counter() - started
+    cpu_end = _cpu_seconds()
+    frames = channel.guild.voice_client.frame_times if channel.guild.voice_client else []
+    intervals = [b - a for a, b in zip(frames, frames[1:])]
+    gaps = [interval - FRAME_SECONDS for interval in intervals if interval > 2 * FRAME_SECONDS]
+
+    api_calls = {endpoint: count for endpoint, count in api.calls.items() if not endpoint.startswith("/audio")}
+    surahs = (115 - first_surah) if first_surah else 1
+    return {
+        "wall_seconds": round(elapsed, 3),
+        "audio_seconds": round(len(frames) * FRAME_SECONDS, 3),
+        "time_to_first_audio": round(frames[0] - started, 4) if frames else None,
+        "gaps": {
+            "count": len(gaps),
+            "total": round(sum(gaps), 4),
+            "p50": round(_percentile(gaps, 50), 4),
+            "p90": round(_percentile(gaps, 90), 4),
+            "p99": round(_percentile(gaps, 99), 4),
+            "max": round(max(gaps, default=0.0), 4),
+        },
+        "api_calls": api_calls,
+        "api_calls_per_surah": round(sum(api_calls.values()) / surahs, 2),
+        "audio_requests": sum(count for endpoint, count in api.calls.items() if endpoint.startswith("/audio")),
+        "embed_edits": len(interaction.edits),
+        "embed_edit_latency_mean": round(statistics.fmean(interaction.edits), 4) if interaction.edits else None,
+        "cpu_seconds": {key: round(cpu_end[key] - cpu_start[key], 4) for key in cpu_end},
+        "rss_bytes": _rss_bytes(),
+    }
+
+
+async def main(args: argparse.Namespace) -> dict:
+    api = StandInAPI(latency=args.latency / 1000, jitter=args.jitter / 1000, error_rate=args.error_rate,
+                     ayah_seconds=args.ayah_seconds, surah_seconds=args.surah_seconds, seed=args.seed)
+    await api.start()
+    results = {}
+    try:
+        for index, name in enumerate(args.scenario, start=1):
+            with tempfile.TemporaryDirectory(prefix="bench-") as workdir:
+                reset_state(api, workdir, args.cache_bytes if args.cache else 0)
+                try:
+                    results[name] = await run_scenario(name, api, index)
+                finally:
+                    await playback.get_engine().close()
+                    await embed_updates.get_embed_scheduler().close()
+                    await api_client.get_client().close()
+                    sessions.get_session_registry().close()
+                    ayah_timestamps.get_timestamp_index().close()
+            print(f"{name}: {json.dumps(results[name])}")
+    finally:
+        await api.close()
+
+    return {
+        "commit": _commit(),
+        "timestamp": int(time.time()),
+        "config": {key: value for key, value in vars(args).items() if key != "output_dir"},
+        "max_rss_bytes": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024,
+        "scenarios": results,
+    }
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Quran bot playback benchmarks")
+    parser.add_argument("--scenario", nargs="+", choices=list(SCENARIOS), default=list(SCENARIOS))
+    parser.add_argument("--latency", type=float, default=50.0, help="API latency in milliseconds")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Extra random latency in milliseconds")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of API requests answered with 503")
+    parser.add_argument("--ayah-seconds", type=float, default=1.0)
+    parser.add_argument("--surah-seconds", type=float, default=3.0)
+    parser.add_argument("--cache", action="store_true", help="Enable the local audio cache")
+    parser.add_argument("--cache-bytes", type=int, default=256 * 1024 ** 2)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output-dir", default="bench_results")
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+    args = parse_args()
+    report = asyncio.run(main(args))
+    os.makedirs(args.output_dir, exist_ok=True)
+    path = os.path.join(args.output_dir, f"{report['timestamp']}-{report['commit']}.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"Saved {path}")
@@ -0,0 +1,170 @@
+"""
+Local stand-ins for the Quran.com v4 and AlQuran.cloud endpoints used by `utils.api_client`,
+plus a static audio host and the AlQuran.cloud surah audio CDN.
+
+Every response can be delayed and a fraction of requests can fail, and calls are
+counted per endpoint so benchmarks can report upstream load.
+"""
+import asyncio
+import os
+import random
+import subprocess
+import tempfile
+from collections import Counter
+
+from aiohttp import web
+
+from utils.surahs import SURAH_INFO, SURAHS
+
+# Ayah counts per surah, used to shape the fake responses
+AYAH_COUNTS = [surah.ayah_count for surah in SURAH_INFO[1:]]
+
+
+def generate_audio(path: str, seconds: float, frequency: int = 440):
+    """
+    Writes a sine-tone MP3 with FFmpeg.
+    """
+    subprocess.run(
+        ["ffmpeg", "-nostdin", "-loglevel", "error", "-y", "-f", "lavfi",
+         "-i", f"sine=frequency={frequency}:duration={seconds}", "-ac", "2", "-b:a", "64k", path],
+        check=True,
+    )
+
+
+class StandInAPI:
+    """
+    aiohttp application emulating both upstream APIs and the audio CDN.
+    """
+    def __init__(self, latency: float = 0.0, jitter: float = 0.0, error_rate: float = 0.0,
+                 ayah_seconds: float = 1.0, surah_seconds: float = 3.0, seed: int = 0):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.ayah_seconds = ayah_seconds
+        self.surah_seconds = surah_seconds
+        self.random = random.Random(seed)
+        self.calls = Counter()
+        self.audio_dir = tempfile.mkdtemp(prefix="bench-audio-")
+        self.base_url = None
+        self._runner = None
+
+    def _app(self) -> web.Application:
+        app = web.Application(middlewares=[self._middleware])
+        app.router.add_get("/quran_com/chapter_recitations/{reciter}", self.chapter_recitations)
+        app.router.add_get("/quran_com/chapter_recitations/{reciter}/{surah}", self.chapter_recitation)
+        app.router.add_get("/quran_com/quran/recitations/{reciter}", self.verse_recitations)
+        app.router.add_get("/alquran_cloud/ayah/{ref}/{edition}", self.ayah)
+        app.router.add_get("/alquran_cloud/surah/{surah}/editions/{editions}", self.surah_editions)
+        app.router.add_get("/alquran_cloud/quran/{edition}", self.quran)
+        app.router.add_get("/audio/{name}", self.audio)
+        app.router.add_get("/cdn/audio-surah/{bitrate}/{edition}/{surah}.mp3", self.cdn_surah)
+        return app
+
+    @web.middleware
+    async def _middleware(self, request: web.Request, handler):
+        endpoint = request.match_info.route.resource.canonical if request.match_info.route.resource else request.path
+        self.calls[endpoint] += 1
+        delay = self.latency + self.random.uniform(0, self.jitter)
+        if delay:
+            await asyncio.sleep(delay)
+        if self.error_rate and not endpoint.startswith("/audio") and self.random.random() < self.error_rate:
+            return web.json_response({"code": 503, "status": "Injected error"}, status=503)
+        return await handler(request)
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0):
+        generate_audio(os.path.join(self.audio_dir, "ayah.mp3"), self.ayah_seconds, 440)
+        generate_audio(os.path.join(self.audio_dir, "surah.mp3"), self.surah_seconds, 660)
+        self._runner = web.AppRunner(self._app())
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        self.base_url = f"http://{host}:{port}"
+
+    async def close(self):
+        if self._runner is not None:
+            await self._runner.cleanup()
+
+    @property
+    def quran_com_api(self) -> str:
+        return f"{self.base_url}/quran_com"
+
+    @property
+    def alquran_cloud_api(self) -> str:
+        return f"{self.base_url}/alquran_cloud"
+
+    @property
+    def islamic_network_cdn(self) -> str:
+        return f"{self.base_url}/cdn"
+
+    def _audio_url(self, kind: str, tag: str) -> str:
+        # The query string keeps URLs distinct per recording so cache keys behave realistically
+        return f"{self.base_url}/audio/{kind}.mp3?{tag}"
+
+    async def chapter_recitations(self, request: web.Request) -> web.Response:
+        reciter = request.match_info["reciter"]
+        size = os.path.getsize(os.path.join(self.audio_dir, "surah.mp3"))
+        return web.json_response({"audio_files": [
+            {"id": surah, "chapter_id": surah, "file_size": size, "format": "mp3",
+             "audio_url": self._audio_url("surah", f"r={reciter}&s={surah}")}
+            for surah in range(1, len(SURAHS) + 1)
+        ]})
+
+    async def chapter_recitation(self, request: web.Request) -> web.Response:
+        reciter, surah = request.match_info["reciter"], int(request.match_info["surah"])
+        audio_file = {
+            "id": surah, "chapter_id": surah, "audio_url": self._audio_url("surah", f"r={reciter}&s={surah}"),
+            "file_size": os.path.getsize(os.path.join(self.audio_dir, "surah.mp3")),
+        }
+        if request.query.get("segments") == "true":
+            # Ayahs spread evenly over the surah recording
+            count = AYAH_COUNTS[surah - 1]
+            step = self.surah_seconds * 1000 / count
+            audio_file["timestamps"] = [
+                {"verse_key": f"{surah}:{n}", "timestamp_from": round((n - 1) * step), "timestamp_to": round(n * step)}
+                for n in range(1, count + 1)
+            ]
+        return web.json_response({"audio_file": audio_file})
+
+    async def verse_recitations(self, request: web.Request) -> web.Response:
+        reciter, surah = request.match_info["reciter"], int(request.query["chapter_number"])
+        return web.json_response({"audio_files": [
+            {"verse_key": f"{surah}:{n}", "url": self._audio_url("ayah", f"r={reciter}&a={surah}:{n}")}
+            for n in range(1, AYAH_COUNTS[surah - 1] + 1)
+        ]})
+
+    def _ayah_payload(self, edition: str, surah: int, ayah: int) -> dict:
+        payload = {"numberInSurah": ayah, "text": f"{edition} text of {surah}:{ayah}"}
+        if edition.startswith("ar."):
+            payload["audio"] = self._audio_url("ayah", f"e={edition}&a={surah}:{ayah}")
+        return payload
+
+    async def ayah(self, request: web.Request) -> web.Response:
+        surah, ayah = (int(part) for part in request.match_info["ref"].split(":"))
+        if not 1 <= surah <= len(AYAH_COUNTS) or not 1 <= ayah <= AYAH_COUNTS[surah - 1]:
+            return web.json_response({"code": 404, "data": "Not found"}, status=404)
+        return web.json_response({"data": self._ayah_payload(request.match_info["edition"], surah, ayah)})
+
+    async def surah_editions(self, request: web.Request) -> web.Response:
+        surah = int(request.match_info["surah"])
+        count = AYAH_COUNTS[surah - 1]
+        offset = int(request.query.get("offset", 0))
+        limit = int(request.query.get("limit", count))
+        numbers = range(offset + 1, min(count, offset + limit) + 1)
+        return web.json_response({"data": [
+            {"edition": {"identifier": edition}, "ayahs": [self._ayah_payload(edition, surah, n) for n in numbers]}
+            for edition in request.match_info["editions"].split(",")
+        ]})
+
+    async def quran(self, request: web.Request) -> web.Response:
+        edition = request.match_info["edition"]
+        return web.json_response({"data": {"surahs": [
+            {"number": surah, "ayahs": [self._ayah_payload(edition, surah, n) for n in range(1, count + 1)]}
+            for surah, count in enumerate(AYAH_COUNTS, start=1)
+        ]}})
+
+    async def audio(self, request: web.Request) -> web.StreamResponse:
+        return web.FileResponse(os.path.join(self.audio_dir, request.match_info["name"]))
+
+    async def cdn_surah(self, request: web.Request) -> web.StreamResponse:
+        return web.FileResponse(os.path.join(self.audio_dir, "surah.mp3"))
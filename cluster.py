@@ -0,0 +1,155 @@
+"""
+Cluster launcher: runs the bot as several worker processes, each owning a range of shards.
+
+Usage: python cluster.py [--workers N] [--shards N]
+
+Every worker is a separate `main.py` interpreter with its own event loop, voice
+connections and FFmpeg children, so voice capacity grows with the number of
+cores. Workers share nothing but the optional on-disk audio and Opus caches.
+A supervisor restarts any worker that exits, with exponential backoff.
+"""
+import argparse
+import asyncio
+import logging
+import math
+import os
+import signal
+import sys
+import time
+
+import aiohttp
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Worker processes (defaults to one per core) and total shards (0 asks Discord)
+CLUSTER_WORKERS = int(os.getenv("CLUSTER_WORKERS", "0")) or os.cpu_count() or 1
+CLUSTER_SHARDS = int(os.getenv("CLUSTER_SHARDS", "0"))
+# Seconds Discord requires between identifies in one rate-limit bucket
+IDENTIFY_INTERVAL = 5.5
+RESTART_BACKOFF_MAX = 60.0
+# A worker that stayed up this long is considered healthy again
+RESTART_RESET_AFTER = 300.0
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - [supervisor] %(levelname)s - %(name)s - %(message)s')
+logger = logging.getLogger('cluster')
+
+
+async def fetch_gateway_info(token: str) -> tuple[int, int]:
+    """
+    Returns Discord's recommended shard count and identify concurrency for this bot.
+    """
+    headers = {"Authorization": f"Bot {token}"}
+    async with aiohttp.ClientSession(headers=headers) as session:
+        async with session.get("https://discord.com/api/v10/gateway/bot") as response:
+            if response.status != 200:
+                raise Exception(f"Discord API returned status {response.status}: {await response.text()}")
+            data = await response.json()
+    return data["shards"], data.get("session_start_limit", {}).get("max_concurrency", 1)
+
+
+def shard_ranges(shard_count: int, workers: int) -> list[list[int]]:
+    """
+    Splits shard ids into contiguous, nearly equal ranges, one per worker.
+    """
+    workers = max(1, min(workers, shard_count))
+    size, extra = divmod(shard_count, workers)
+    ranges, start = [], 0
+    for worker in range(workers):
+        end = start + size + (1 if worker < extra else 0)
+        ranges.append(list(range(start, end)))
+        start = end
+    return ranges
+
+
+class Worker:
+    """
+    One supervised `main.py` process running a fixed range of shards.
+    """
+    def __init__(self, cluster_id: int, shard_ids: list[int], shard_count: int):
+        self.cluster_id = cluster_id
+        self.shard_ids = shard_ids
+        self.shard_count = shard_count
+        self.process = None
+        self.restarts = 0
+
+    def env(self) -> dict:
+        env = dict(os.environ)
+        env["CLUSTER_ID"] = str(self.cluster_id)
+        env["SHARD_IDS"] = ",".join(map(str, self.shard_ids))
+        env["SHARD_COUNT"] = str(self.shard_count)
+        # Each worker gets its own metrics port so they do not collide
+        metrics_port = int(os.getenv("METRICS_PORT", "0"))
+        if metrics_port:
+            env["METRICS_PORT"] = str(metrics_port + self.cluster_id)
+        return env
+
+    async def supervise(self, start_delay: float, stopping: asyncio.Event):
+        """
+        Starts the worker after `start_delay` and restarts it whenever it exits until `stopping` is set.
+        """
+        delay = start_delay
+        while not stopping.is_set():
+            if delay:
+                try:
+                    await asyncio.wait_for(stopping.wait(), timeout=delay)
+                    return
+                except asyncio.TimeoutError:
+                    pass
+
+            started = time.monotonic()
+            self.process = await asyncio.create_subprocess_exec(
+                sys.executable, os.path.join(os.path.dirname(os.path.abspath(__file__)), "main.py"), env=self.env()
+            )
+            logger.info(f"Started cluster {self.cluster_id} (pid {self.process.pid}) with shards {self.shard_ids[0]}-{self.shard_ids[-1]}")
+            returncode = await self.process.wait()
+            if stopping.is_set():
+                return
+
+            if time.monotonic() - started >= RESTART_RESET_AFTER:
+                self.restarts = 0
+            delay = min(RESTART_BACKOFF_MAX, 2 ** self.restarts)
+            self.restarts += 1
+            logger.warning(f"Cluster {self.cluster_id} exited with {returncode}, restarting in {delay:.0f}s")
+
+    def terminate(self):
+        if self.process is not None and self.process.returncode is None:
+            self.process.terminate()
+
+
+async def main(workers: int, shard_count: int):
+    token = os.getenv('DISCORD_TOKEN')
+    if not token or token == 'your_token_here':
+        logger.error("Please set a valid DISCORD_TOKEN in the environment variables.")
+        return
+
+    recommended, max_concurrency = await fetch_gateway_info(token)
+    shard_count = shard_count or recommended
+    cluster = [Worker(cluster_id, shard_ids, shard_count) for cluster_id, shard_ids in enumerate(shard_ranges(shard_count, workers))]
+    logger.info(f"Running {shard_count} shards across {len(cluster)} workers")
+
+    stopping = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stopping.set)
+
+    # Workers identify their shards one bucket at a time, so stagger starts to stay under the identify limit
+    tasks, delay = [], 0.0
+    for worker in cluster:
+        tasks.append(asyncio.create_task(worker.supervise(delay, stopping)))
+        delay += math.ceil(len(worker.shard_ids) / max_concurrency) * IDENTIFY_INTERVAL
+
+    await stopping.wait()
+    logger.info("Stopping workers...")
+    for worker in cluster:
+        worker.terminate()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    await asyncio.gather(*(worker.process.wait() for worker in cluster if worker.process), return_exceptions=True)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Run the bot as a supervised multi-process shard cluster.")
+    parser.add_argument("--workers", type=int, default=CLUSTER_WORKERS, help="number of worker processes")
+    parser.add_argument("--shards", type=int, default=CLUSTER_SHARDS, help="total shard count (default: Discord's recommendation)")
+    args = parser.parse_args()
+    asyncio.run(main(args.workers, args.shards))
@@ -0,0 +1,169 @@
+"""
+Broadcast Cog for community khatams: one recitation played in many guilds at once.
+"""
+import asyncio
+import functools
+import logging
+
+import discord
+from discord import app_commands
+from discord.ext import commands
+
+from cogs.quran_dashboard import cached_surah_source
+from utils.api_client import RECITER_MAPPING
+from utils.audio_cache import get_cache
+from utils.audio_sources import GaplessAudioSource
+from utils.broadcast import BROADCAST_BITRATE, BroadcastSession, get_broadcast_hub
+from utils.logs import bind
+from utils.playback import get_engine
+from utils.providers import resolve_surah_audio_url
+from utils.surah_search import get_surah_index
+from utils.surahs import SURAH_COUNT, get_surah
+
+logger = logging.getLogger(__name__)
+
+RECITER_CHOICES = [app_commands.Choice(name=info["name"], value=key) for key, info in list(RECITER_MAPPING.items())[:25]]
+
+
+class BroadcastCog(commands.GroupCog, group_name="broadcast", group_description="Play one recitation in many servers at once"):
+    """
+    Cog for starting, joining and leaving shared broadcasts.
+
+    A broadcast is decoded and encoded once; every joined guild receives the
+    same Opus frames (see `utils.broadcast`). Broadcasts are per process, so in
+    cluster mode only guilds on the same worker can join.
+    """
+    def __init__(self, bot: commands.Bot):
+        self.bot = bot
+
+    async def cog_unload(self):
+        get_broadcast_hub().close()
+
+    async def feed(self, source: GaplessAudioSource, reciter_config: dict, surahs: range):
+        """
+        Queues each surah on the broadcast source once the one before it starts playing.
+
+        A whole-surah stream must not be spawned ahead of time, since it would hold
+        its CDN connection open for the entire surah before it. The next surah is
+        downloaded into the audio cache instead and queued as a local file; when
+        it cannot be cached, its stream is only opened once the current one ends.
+        """
+        try:
+            for surah in surahs:
+                try:
+                    await source.wait_for_slot()
+                    audio_key, audio_url = await resolve_surah_audio_url(reciter_config, surah)
+                    if source.playing and not await self.download(audio_key, surah, audio_url):
+                        await source.wait_until_idle()
+                    await source.put(surah, cached_surah_source(audio_key, surah, audio_url, BROADCAST_BITRATE, opus=True))
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    logger.warning("Broadcast failed to queue Surah %s: %s", surah, e)
+        finally:
+            source.close_input()
+
+    @staticmethod
+    async def download(audio_key: str, surah: int, audio_url: str) -> bool:
+        """
+        Downloads a surah into the audio cache and returns whether a local copy exists.
+        """
+        try:
+            return await get_cache().fetch(audio_key, surah, None, audio_url) is not None
+        except Exception as e:
+            logger.warning("Broadcast failed to download Surah %s: %s", surah, e)
+            return False
+
+    async def listen(self, interaction: discord.Interaction, session: BroadcastSession) -> bool:
+        """
+        Connects the caller's voice channel and plays the broadcast in it.
+        """
+        if interaction.user.voice is None or interaction.user.voice.channel is None:
+            await interaction.response.send_message("You need to join a voice channel first!", ephemeral=True)
+            return False
+
+        player = get_engine().player_for(interaction.guild)
+        await player.connect(interaction.user.voice.channel)
+        player.stop()
+        player.enqueue(functools.partial(session.subscribe, interaction.guild_id))
+        return True
+
+    @app_commands.command(name="start", description="Start a broadcast that other servers can join")
+    @app_commands.describe(surah_number="Surah to start from", reciter="Reciter", to_end="Continue through to the end of the Quran", name="Name other servers use to join")
+    @app_commands.choices(reciter=RECITER_CHOICES)
+    @app_commands.default_permissions(manage_guild=True)
+    async def start(self, interaction: discord.Interaction, surah_number: int, reciter: str = "husary",
+                    to_end: bool = False, name: str = None):
+        surah = get_surah(surah_number)
+        if surah is None:
+            await interaction.response.send_message(f"Surah number must be between 1 and {SURAH_COUNT}.", ephemeral=True)
+            return
+        if interaction.user.voice is None or interaction.user.voice.channel is None:
+            await interaction.response.send_message("You need to join a voice channel first!", ephemeral=True)
+            return
+
+        name = name or f"{reciter}-{surah_number}"
+        hub = get_broadcast_hub()
+        if hub.get(name):
+            await interaction.response.send_message(f"A broadcast named `{name}` is already running; use `/broadcast join`.", ephemeral=True)
+            return
+
+        reciter_config = RECITER_MAPPING.get(reciter, RECITER_MAPPING["husary"])
+        bind(guild_id=interaction.guild_id, session_id=name)
+        source = GaplessAudioSource(asyncio.get_running_loop(), on_track_start=lambda n: setattr(session, "now_playing", n), opus=True)
+        session = hub.start(name, source, owner_id=interaction.guild_id)
+        surahs = range(surah_number, SURAH_COUNT + 1) if to_end else range(surah_number, surah_number + 1)
+        feeder = asyncio.create_task(self.feed(source, reciter_config, surahs))
+        session.finished.add_done_callback(lambda _: feeder.cancel())
+
+        await self.listen(interaction, session)
+        await interaction.response.send_message(
+            f"📡 Broadcasting **{surah.label}**{' to the end of the Quran' if to_end else ''} as `{name}`. "
+            f"Other servers can join with `/broadcast join {name}`."
+        )
+
+    @app_commands.command(name="join", description="Play a running broadcast in your voice channel")
+    @app_commands.describe(name="Broadcast to join")
+    async def join(self, interaction: discord.Interaction, name: str):
+        session = get_broadcast_hub().get(name)
+        if session is None:
+            await interaction.response.send_message(f"No broadcast named `{name}` is running.", ephemeral=True)
+            return
+        if await self.listen(interaction, session):
+            await interaction.response.send_message(f"📡 Joined broadcast `{name}` ({session.listeners + 1} servers listening).")
+
+    @join.autocomplete("name")
+    async def join_autocomplete(self, interaction: discord.Interaction, current: str) -> list[app_commands.Choice[str]]:
+        choices = []
+        for session in get_broadcast_hub().sessions.values():
+            if current.lower() in session.name.lower():
+                playing = get_surah_index().choices[session.now_playing].name if session.now_playing else "starting"
+                choices.append(app_commands.Choice(name=f"{session.name} · {playing} · {session.listeners} listening"[:100], value=session.name))
+        return choices[:25]
+
+    @app_commands.command(name="leave", description="Stop playing the broadcast in this server")
+    async def leave(self, interaction: discord.Interaction):
+        player = get_engine().players.get(interaction.guild_id)
+        if player is None or not player.is_connected():
+            await interaction.response.send_message("The bot is not currently in a voice channel.", ephemeral=True)
+            return
+        await get_engine().disconnect(interaction.guild)
+        await interaction.response.send_message("Left the broadcast and disconnected.", ephemeral=True)
+
+    @app_commands.command(name="stop", description="End a broadcast started from this server for every listener")
+    @app_commands.describe(name="Broadcast to end")
+    @app_commands.default_permissions(manage_guild=True)
+    async def stop(self, interaction: discord.Interaction, name: str):
+        session = get_broadcast_hub().get(name)
+        if session is None or session.owner_id != interaction.guild_id:
+            await interaction.response.send_message(f"This server has no broadcast named `{name}`.", ephemeral=True)
+            return
+        session.stop()
+        await interaction.response.send_message(f"Ended broadcast `{name}`.", ephemeral=True)
+
+
+async def setup(bot: commands.Bot):
+    """
+    Extension setup function.
+    """
+    await bot.add_cog(BroadcastCog(bot))
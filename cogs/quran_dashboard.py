@@ -2,12 +2,100 @@
 Quran Dashboard Cog to provide a UI for interacting with Quranic verses and recitations.
 """
 import asyncio
+import functools
+import logging
+import os
+
 import discord
 from discord import app_commands
 from discord.ext import commands
 
-from utils.api_client import get_full_surah_audio, get_ayah_audio, get_translation_text, RECITER_MAPPING, TRANSLATION_MAPPING
-from utils.surahs import SURAHS
+from utils.api_client import RECITER_MAPPING, TRANSLATION_MAPPING
+from utils.audio_cache import get_cache
+from utils.audio_sources import OPUS_OUTPUT, GaplessAudioSource, make_audio_source, make_concat_source
+from utils.ayah_timestamps import SurahTimestamps, get_timestamp_index
+from utils.embed_updates import get_embed_scheduler
+from utils.logs import bind
+from utils.opus_store import get_opus_store
+from utils.playback import Disconnected, GuildPlayer, get_engine
+from utils.prefetch import AyahPrefetchQueue
+from utils.providers import resolve_surah_audio_url, resolve_surah_ayahs
+from utils.sessions import POSITION_SAVE_INTERVAL, DashboardSession, get_session_registry
+from utils.surah_search import get_surah_index
+from utils.surahs import SURAH_COUNT, SURAHS, clamp_ayah_range, get_surah
+
+logger = logging.getLogger(__name__)
+
+def cached_surah_source(audio_key: str, surah_number: int, audio_url: str, bitrate: int = None,
+                        opus: bool = OPUS_OUTPUT) -> discord.AudioSource:
+    """
+    Plays a full surah from the transcoded Opus store or the local cache, or streams it
+    while caching it in the background.
+
+    `audio_key` is the key `resolve_surah_audio_url` returned with `audio_url`.
+    """
+    opus_path = get_opus_store().get(audio_key, surah_number)
+    if opus_path:
+        return make_audio_source(opus_path, bitrate, copy=True, opus=opus)
+
+    cache = get_cache()
+    path = cache.get(audio_key, surah_number)
+    get_opus_store().record_play(audio_key, surah_number, None, path or audio_url)
+    if path:
+        return make_audio_source(path, bitrate, opus=opus)
+    cache.fetch_in_background(audio_key, surah_number, None, audio_url)
+    return make_audio_source(audio_url, bitrate, opus=opus)
+
+def seek_surah_source(reciter_id: int, surah_number: int, timestamps: SurahTimestamps, start_ayah: int,
+                      end_ayah: int = None, bitrate: int = None) -> discord.AudioSource:
+    """
+    Plays a full-surah recording from `start_ayah` through `end_ayah` by seeking into it.
+
+    The timestamps describe Quran.com's file only, so the local copy is used when
+    it is that file (same size) and the file is streamed otherwise.
+    """
+    start = timestamps.offset(start_ayah)
+    duration = timestamps.duration(start_ayah, end_ayah) if end_ayah and end_ayah < timestamps.ayah_count else None
+    reciter_key = f"quran_com:{reciter_id}"
+    cache = get_cache()
+    path = cache.get(reciter_key, surah_number)
+    if path and os.path.getsize(path) == timestamps.file_size:
+        return make_audio_source(path, bitrate, start=start, duration=duration)
+    if path is None:
+        cache.fetch_in_background(reciter_key, surah_number, None, timestamps.audio_url)
+    return make_audio_source(timestamps.audio_url, bitrate, start=start, duration=duration)
+
+def timed_reciter(audio_key: str, reciter_id: int) -> int:
+    """
+    Returns the Quran.com reciter id whose Ayah timestamps fit the recording behind `audio_key`, or None.
+    """
+    return reciter_id if reciter_id and audio_key == f"quran_com:{reciter_id}" else None
+
+@functools.lru_cache(maxsize=None)
+def reciting_header(reciter_key: str, language_key: str) -> str:
+    """
+    Returns the cached static part of the "Now Reciting" embed description.
+    """
+    lang_display = TRANSLATION_MAPPING.get(language_key, {"name": "❌ ไม่แปล (No Translation)"})["name"]
+    rec_name = RECITER_MAPPING.get(reciter_key, {"name": "Unknown"})["name"]
+    return f"👤 **Reciter:** {rec_name}\n🌍 **Translation Language:** {lang_display}\n\nYou can set an Ayah range, or directly press play to listen to the full Surah.\n\n📖 **Now Reciting:** "
+
+@functools.lru_cache(maxsize=None)
+def reciter_options(selected: str) -> list[discord.SelectOption]:
+    """
+    Returns the reciter options with `selected` as the default, shared by every dashboard.
+    """
+    return [
+        discord.SelectOption(label=info["name"], value=key, description=info.get("description", ""), default=(key == selected))
+        for key, info in list(RECITER_MAPPING.items())[:25]
+    ]
+
+@functools.lru_cache(maxsize=None)
+def language_options(selected: str) -> list[discord.SelectOption]:
+    """
+    Returns the translation options with `selected` as the default, shared by every dashboard.
+    """
+    return [discord.SelectOption(label=info['name'], value=key, default=(key == selected)) for key, info in TRANSLATION_MAPPING.items()]
 
 class AyahRangeModal(discord.ui.Modal, title="Set Ayah Range"):
     start_ayah = discord.ui.TextInput(
@@ -21,9 +109,9 @@ class AyahRangeModal(discord.ui.Modal, title="Set Ayah Range"):
         required=True
     )
 
-    def __init__(self, view: discord.ui.View):
+    def __init__(self, session: DashboardSession):
         super().__init__()
-        self.dashboard_view = view
+        self.session = session
 
     async def on_submit(self, interaction: discord.Interaction):
         try:
@@ -32,8 +120,13 @@ class AyahRangeModal(discord.ui.Modal, title="Set Ayah Range"):
             if start_val > end_val or start_val < 1:
                 await interaction.response.send_message("Invalid range.", ephemeral=True)
                 return
-            self.dashboard_view.start_ayah = start_val
-            self.dashboard_view.end_ayah = end_val
+            surah = get_surah(self.session.surah_number)
+            if surah and end_val > surah.ayah_count:
+                await interaction.response.send_message(f"Surah {surah.name} only has {surah.ayah_count} Ayahs.", ephemeral=True)
+                return
+            self.session.start_ayah = start_val
+            self.session.end_ayah = end_val
+            get_session_registry().save(self.session)
             await interaction.response.send_message(f"Range set: Ayah {start_val} to {end_val}", ephemeral=True)
         except ValueError:
             await interaction.response.send_message("Please enter valid integers.", ephemeral=True)
@@ -41,274 +134,421 @@ class AyahRangeModal(discord.ui.Modal, title="Set Ayah Range"):
 class QuranDashboardView(discord.ui.View):
     """
     A View containing a Select menu for Reciter, along with Play/Stop buttons and Ayah Range setting.
+
+    A single persistent instance, registered with `bot.add_view`, handles the
+    controls of every dashboard message and looks up that message's state in the
+    session registry. `render()` builds the components shown for one session.
     """
-    def __init__(self, surah_number: int):
+    def __init__(self, reciter: str = "husary", language: str = "none"):
         super().__init__(timeout=None)
-        self.surah_number = surah_number
-        self.selected_reciter = "husary"
-        self.selected_language = "none"
-        self.is_full_quran = (surah_number == 0)
-        self.current_surah = 1 if self.is_full_quran else self.surah_number
-        
-        # Default selections
-        self.start_ayah = None
-        self.end_ayah = None
-        self.selected_reciter = "husary"
-        
-        # Audio playback state
-        self.audio_queue = []
-        self.play_task = None
-        self.stop_event = asyncio.Event()
 
         # Select Reciter
-        reciter_options = []
-        for key, info in list(RECITER_MAPPING.items())[:25]:
-            reciter_options.append(
-                discord.SelectOption(label=info["name"], value=key, description=info.get("description", ""))
-            )
-            
         reciter_select = discord.ui.Select(
             placeholder="Select Reciter",
             min_values=1,
             max_values=1,
-            options=reciter_options,
+            options=reciter_options(reciter),
             custom_id="reciter_select"
         )
         reciter_select.callback = self.reciter_callback
         self.add_item(reciter_select)
 
         # Select Translation Language
-        lang_options = []
-        for key, info in TRANSLATION_MAPPING.items():
-            lang_options.append(discord.SelectOption(label=info['name'], value=key))
-                
         lang_select = discord.ui.Select(
             placeholder="Select Translation (Text)",
             min_values=1,
             max_values=1,
-            options=lang_options,
+            options=language_options(language),
             custom_id="lang_select"
         )
         lang_select.callback = self.lang_callback
         self.add_item(lang_select)
 
+    @classmethod
+    def render(cls, reciter: str = "husary", language: str = "none") -> "QuranDashboardView":
+        """
+        Returns components showing the given selections, for sending or editing a dashboard.
+        """
+        view = cls(reciter, language)
+        # A finished view is not tracked per message; the registered instance handles its interactions
+        view.stop()
+        return view
+
+    async def session_for(self, interaction: discord.Interaction) -> DashboardSession:
+        session = get_session_registry().get(interaction.message.id)
+        if session is None:
+            await interaction.response.send_message("This dashboard has expired. Use `/quran` to open a new one.", ephemeral=True)
+            return None
+        # Records logged while handling this interaction, and by the playback tasks it starts, carry the session
+        bind(guild_id=session.guild_id, session_id=session.message_id)
+        return session
+
     async def reciter_callback(self, interaction: discord.Interaction):
-        self.selected_reciter = interaction.data["values"][0]
-        
-        for child in self.children:
-            if getattr(child, "custom_id", None) == "reciter_select":
-                for opt in child.options:
-                    opt.default = (opt.value == self.selected_reciter)
-                break
-                
-        await interaction.response.edit_message(view=self)
+        session = await self.session_for(interaction)
+        if session is None:
+            return
+        session.reciter = interaction.data["values"][0]
+        get_session_registry().save(session)
+        await interaction.response.edit_message(view=self.render(session.reciter, session.language))
 
     async def lang_callback(self, interaction: discord.Interaction):
-        self.selected_language = interaction.data["values"][0]
-        
-        for child in self.children:
-            if getattr(child, "custom_id", None) == "lang_select":
-                for opt in child.options:
-                    opt.default = (opt.value == self.selected_language)
-                break
-        
+        session = await self.session_for(interaction)
+        if session is None:
+            return
+        session.language = interaction.data["values"][0]
+
         embed = interaction.message.embeds[0]
-        rec_name = RECITER_MAPPING.get(self.selected_reciter, {"name": "Mahmoud Khalil Al-Husary"})["name"]
-        
-        if self.is_full_quran:
-            self.selected_language = "none"
+        rec_name = RECITER_MAPPING.get(session.reciter, {"name": "Mahmoud Khalil Al-Husary"})["name"]
+
+        if session.is_full_quran:
+            session.language = "none"
             embed.description = f"👤 **Reciter:** {rec_name}\n🌍 **Translation:** ❌ ไม่แปล (Full Quran Mode bypasses translations to prevent queue locks)\n\nUse the selection menu to choose a Reciter, then press play to listen."
         else:
-            lang_display = TRANSLATION_MAPPING.get(self.selected_language, {"name": "❌ ไม่แปล (No Translation)"})["name"]
+            lang_display = TRANSLATION_MAPPING.get(session.language, {"name": "❌ ไม่แปล (No Translation)"})["name"]
             embed.description = f"👤 **Reciter:** {rec_name}\n🌍 **Translation Language:** {lang_display}\n\nUse the selection menu to choose a Reciter. You can set an Ayah range, or directly press play to listen to the full Surah."
-            
-        await interaction.response.edit_message(embed=embed, view=self)
+
+        get_session_registry().save(session)
+        await interaction.response.edit_message(embed=embed, view=self.render(session.reciter, session.language))
 
     @discord.ui.button(label="Set Ayah Range", style=discord.ButtonStyle.secondary, custom_id="range_button")
     async def range_button(self, interaction: discord.Interaction, button: discord.ui.Button):
-        await interaction.response.send_modal(AyahRangeModal(self))
+        session = await self.session_for(interaction)
+        if session is None:
+            return
+        await interaction.response.send_modal(AyahRangeModal(session))
 
     @discord.ui.button(label="▶️ Start Playback", style=discord.ButtonStyle.primary, custom_id="play_button")
     async def play_button(self, interaction: discord.Interaction, button: discord.ui.Button):
         """Play audio in voice channel."""
+        session = await self.session_for(interaction)
+        if session is None:
+            return
         if interaction.user.voice is None or interaction.user.voice.channel is None:
             await interaction.response.send_message("You need to join a voice channel first!", ephemeral=True)
             return
 
         voice_channel = interaction.user.voice.channel
-        voice_client = interaction.guild.voice_client
-
-        if voice_client is None:
-            voice_client = await voice_channel.connect()
-        elif voice_client.channel != voice_channel:
-            await voice_client.move_to(voice_channel)
+        player = get_engine().player_for(interaction.guild)
+        await player.connect(voice_channel)
 
         # Clear any existing playback
-        self.stop_event.clear()
-        if voice_client.is_playing():
-            voice_client.stop()
-        if self.play_task and not self.play_task.done():
-            self.play_task.cancel()
+        if session.stop_event is None:
+            session.stop_event = asyncio.Event()
+        session.stop_event.clear()
+        player.stop()
+        if session.play_task and not session.play_task.done():
+            session.play_task.cancel()
 
-        await interaction.response.send_message("Fetching audio...", ephemeral=True)
-        
-        reciter_config = RECITER_MAPPING.get(self.selected_reciter, RECITER_MAPPING["husary"])
+        response = await interaction.response.send_message("Fetching audio...", ephemeral=True)
+        # The reply gets a copy of the dashboard while reciting, so its controls must reach this session
+        get_session_registry().alias(getattr(response, "message_id", None), session)
+
+        reciter_config = RECITER_MAPPING.get(session.reciter, RECITER_MAPPING["husary"])
 
         try:
-            if self.is_full_quran:
-                self.play_task = asyncio.create_task(self.play_full_quran_loop(interaction, voice_client, reciter_config["quran_com"]))
+            if session.is_full_quran:
+                self.start_playback(session, self.play_full_quran_loop(interaction, session, player, reciter_config))
                 await interaction.edit_original_response(content="Starting Full Quran recitation...")
-            elif self.selected_language == 'none' and (self.start_ayah is None or self.end_ayah is None):
-                # Play full surah efficiently natively
-                audio_url = await get_full_surah_audio(self.surah_number, reciter_config["quran_com"])
-                if not audio_url:
-                    await interaction.edit_original_response(content="Could not retrieve full Surah audio URL.")
-                    return
-                
-                if audio_url.startswith("//"):
-                    audio_url = "https:" + audio_url
-                    
-                voice_client.play(discord.FFmpegPCMAudio(audio_url))
-                await interaction.edit_original_response(content=f"Playing full Surah {self.surah_number}...")
+            elif session.language == 'none':
+                # One stream for the whole surah; a range seeks into it instead of playing Ayah by Ayah
+                if session.start_ayah is None or session.end_ayah is None:
+                    await interaction.edit_original_response(content=f"Playing full Surah {session.surah_number}...")
+                else:
+                    await interaction.edit_original_response(content=f"Playing Surah {session.surah_number} (Ayah {session.start_ayah} to {session.end_ayah})...")
+                self.start_playback(session, self.play_surah_stream(interaction, session, player, reciter_config, session.start_ayah, session.end_ayah))
             else:
-                # Play range or Ayah-by-Ayah for translations
-                self.audio_queue = []
-                self.play_task = asyncio.create_task(self.play_queue(interaction, voice_client, reciter_config["aladhan"]))
-                start_str = self.start_ayah if self.start_ayah else 1
-                end_str = self.end_ayah if self.end_ayah else "End"
-                await interaction.edit_original_response(content=f"Preparing to play Surah {self.surah_number} (Ayah {start_str} to {end_str})...")
-                
+                # Play Ayah-by-Ayah for translations
+                self.start_playback(session, self.play_queue(interaction, session, player, reciter_config))
+                start_str = session.start_ayah if session.start_ayah else 1
+                end_str = session.end_ayah if session.end_ayah else get_surah(session.surah_number).ayah_count
+                await interaction.edit_original_response(content=f"Preparing to play Surah {session.surah_number} (Ayah {start_str} to {end_str})...")
+
         except Exception as e:
             await interaction.edit_original_response(content=f"An error occurred: {e}")
 
-    async def play_full_quran_loop(self, interaction: discord.Interaction, voice_client: discord.VoiceClient, reciter_id: int):
-        while self.current_surah <= 114:
-            if self.stop_event.is_set():
+    def start_playback(self, session: DashboardSession, playback):
+        """
+        Runs a playback coroutine as the session's play task and keeps the guild's position saved while it runs.
+        """
+        session.track = None
+        session.play_task = asyncio.create_task(playback)
+        session.play_task.add_done_callback(self.playback_done)
+        asyncio.create_task(self.save_positions(session, session.play_task))
+
+    @staticmethod
+    def playback_done(task: asyncio.Task):
+        if task.cancelled() or isinstance(task.exception(), Disconnected):
+            return
+        if task.exception() is not None:
+            logger.warning("Playback failed", exc_info=task.exception())
+
+    async def save_positions(self, session: DashboardSession, task: asyncio.Task):
+        """
+        Saves the guild's position every `POSITION_SAVE_INTERVAL` seconds and once more when playback stops.
+
+        A recitation that plays to its end leaves nothing to resume, so its position is cleared.
+        Playback cut off by a lost voice connection ends with `Disconnected` and keeps it.
+        """
+        registry = get_session_registry()
+        while True:
+            track = session.track
+            if track is not None and track[0] is not None and track[3] is not None:
+                # Loaded ahead so the Ayah can be worked out the moment playback stops
+                await self.timestamps_for(track[0], track[1])
+            await asyncio.wait([task], timeout=POSITION_SAVE_INTERVAL)
+            if session.track is not None:
+                if task.done() and not task.cancelled() and task.exception() is None and not session.stop_event.is_set():
+                    registry.clear_position(session.guild_id)
+                    return
+                reciter_id, surah = session.track[:2]
+                registry.save_position(session, *session.position(get_timestamp_index().cached(reciter_id, surah)))
+            if task.done():
+                return
+
+    @staticmethod
+    async def timestamps_for(reciter_id: int, surah: int) -> SurahTimestamps:
+        try:
+            return await get_timestamp_index().get(reciter_id, surah)
+        except Exception as e:
+            logger.debug("No Ayah timestamps for reciter %s Surah %s: %s", reciter_id, surah, e)
+            return None
+
+    @staticmethod
+    def track_started(session: DashboardSession, reciter_id: int, surah: int, ayah: int = 1, offset: float = 0.0):
+        session.mark_track(reciter_id, surah, ayah, offset)
+        # Persisted so a restarted dashboard continues from the surah that was playing
+        session.current_surah = surah
+        get_session_registry().save(session)
+
+    async def play_surah_stream(self, interaction: discord.Interaction, session: DashboardSession, player: GuildPlayer,
+                                reciter_config: dict, start_ayah: int = None, end_ayah: int = None):
+        """
+        Plays the session's surah as one stream, optionally limited to an Ayah range.
+
+        A range starts instantly by seeking into the full recording with the Ayah
+        timestamp index. Timestamps only exist for Quran.com's recordings, so for
+        other reciters (or without timestamps) the range's Ayah recordings are
+        concatenated into one stream.
+        """
+        reciter_id = reciter_config.get("quran_com_chapters")
+        surah = session.surah_number
+        ayah_count = get_surah(surah).ayah_count
+        start_ayah = start_ayah or 1
+        if start_ayah == 1 and (end_ayah or ayah_count) >= ayah_count:
+            audio_key, audio_url = await resolve_surah_audio_url(reciter_config, surah)
+            if not audio_url:
+                await interaction.edit_original_response(content="Could not retrieve full Surah audio URL.")
+                return
+            factory = functools.partial(cached_surah_source, audio_key, surah, audio_url, player.bitrate)
+            reciter_id = timed_reciter(audio_key, reciter_id)
+            offset = 0.0
+        else:
+            timestamps = await self.timestamps_for(reciter_id, surah) if reciter_id else None
+            if timestamps is None or timestamps.ayah_count != ayah_count:
+                await self.play_range_stream(session, player, reciter_config, start_ayah, end_ayah)
+                return
+            factory = functools.partial(seek_surah_source, reciter_id, surah, timestamps, start_ayah, end_ayah, player.bitrate)
+            offset = timestamps.offset(start_ayah)
+
+        error = await player.enqueue(factory, on_start=functools.partial(session.mark_track, reciter_id, surah, start_ayah, offset))
+        if isinstance(error, Disconnected):
+            raise error
+        if error:
+            logger.warning("Failed to play Surah %s: %s", surah, error)
+
+    async def play_range_stream(self, session: DashboardSession, player: GuildPlayer, reciter_config: dict,
+                                start_ayah: int, end_ayah: int = None):
+        """
+        Plays an Ayah range through a single FFmpeg process reading a concat playlist of its recordings.
+
+        Used when no per-Ayah embed updates are needed, so there is no reason to
+        start a decoder per Ayah.
+        """
+        surah = session.surah_number
+        factory = await self.range_stream_factory(reciter_config, surah, start_ayah, end_ayah, player.bitrate)
+        if factory is None:
+            return
+
+        error = await player.enqueue(factory, on_start=functools.partial(session.mark_track, None, surah, start_ayah))
+        if isinstance(error, Disconnected):
+            raise error
+        if error:
+            logger.warning("Failed to play Surah %s: %s", surah, error)
+
+    @staticmethod
+    async def range_stream_factory(reciter_config: dict, surah: int, start_ayah: int, end_ayah: int = None,
+                                   bitrate: int = None):
+        """
+        Returns a factory for a concat stream of an Ayah range's recordings, or None if none resolved.
+        """
+        start_ayah, end_ayah = clamp_ayah_range(surah, start_ayah, end_ayah)
+        audio_key, ayahs = await resolve_surah_ayahs(reciter_config, surah, None, start_ayah, end_ayah)
+        cache = get_cache()
+        locations = [cache.get(audio_key, surah, n) or ayah["audio"] for n, ayah in ayahs.items() if ayah["audio"]]
+        if not locations:
+            logger.warning("Failed to resolve Surah %s Ayahs %s-%s", surah, start_ayah, end_ayah)
+            return None
+        return functools.partial(make_concat_source, locations, bitrate)
+
+    async def play_full_quran_loop(self, interaction: discord.Interaction, session: DashboardSession, player: GuildPlayer,
+                                   reciter_config: dict, resume_ayah: int = None):
+        # Keep the next surah queued behind the current one so the engine moves on without waiting for us
+        reciter_id = reciter_config.get("quran_com_chapters")
+        surah = session.current_surah
+        playing = None
+        while surah <= SURAH_COUNT:
+            if session.stop_event.is_set():
                 break
-                
+
             try:
-                audio_url = await get_full_surah_audio(self.current_surah, reciter_id)
-                if not audio_url:
-                    self.current_surah += 1
-                    continue
-                
-                if audio_url.startswith("//"):
-                    audio_url = "https:" + audio_url
-                    
-                voice_client.play(discord.FFmpegPCMAudio(audio_url, before_options="-reconnect 1 -reconnect_streamed 1 -reconnect_delay_max 5", options="-vn"))
-                
-                # The most stable way to wait for audio to finish
-                while voice_client.is_playing():
-                    await asyncio.sleep(0.5)
-                    if self.stop_event.is_set():
-                        break
-                        
-                if self.stop_event.is_set():
-                    break
-                    
-                self.current_surah += 1
+                # Resuming mid-surah seeks into the first surah's recording, or concatenates
+                # its remaining Ayahs for reciters without Quran.com timestamps
+                ayah, resume_ayah = resume_ayah, None
+                timestamps = await self.timestamps_for(reciter_id, surah) if reciter_id and ayah and ayah > 1 else None
+                factory = None
+                if timestamps is not None:
+                    ayah = min(ayah, timestamps.ayah_count)
+                    factory = functools.partial(seek_surah_source, reciter_id, surah, timestamps, ayah, None, player.bitrate)
+                    on_start = functools.partial(self.track_started, session, reciter_id, surah, ayah, timestamps.offset(ayah))
+                elif ayah and ayah > 1:
+                    factory = await self.range_stream_factory(reciter_config, surah, ayah, None, player.bitrate)
+                    on_start = functools.partial(self.track_started, session, None, surah, ayah, None)
+                if factory is None:
+                    audio_key, audio_url = await resolve_surah_audio_url(reciter_config, surah)
+                    if not audio_url:
+                        surah += 1
+                        continue
+                    factory = functools.partial(cached_surah_source, audio_key, surah, audio_url, player.bitrate)
+                    on_start = functools.partial(self.track_started, session, timed_reciter(audio_key, reciter_id), surah)
+
+                queued = player.enqueue(factory, on_start=on_start)
+                if playing is not None and isinstance(await playing, Disconnected):
+                    raise Disconnected()
+                playing = queued
+            except Disconnected:
+                raise
             except Exception as e:
-                print(f"Failed to play Surah {self.current_surah}: {e}")
-                self.current_surah += 1
-                continue
-        
-        # Finished
-        if not self.stop_event.is_set():
-            if voice_client and voice_client.is_connected():
-                await voice_client.disconnect()
+                logger.warning("Failed to play Surah %s: %s", surah, e)
+            surah += 1
 
-    async def play_queue(self, interaction: discord.Interaction, voice_client: discord.VoiceClient, reciter_string: str):
-        start = self.start_ayah if self.start_ayah else 1
-        end = self.end_ayah if self.end_ayah else 286 # Start off high, loop breaks on 404
-        
-        for i in range(start, end + 1):
-            if self.stop_event.is_set(): break
-            
-            try:
-                # Prepare Language text if needed
-                translation_text = None
-                if self.selected_language != 'none':
-                    lang_code = TRANSLATION_MAPPING.get(self.selected_language, {}).get("aladhan")
-                    if lang_code:
-                        try:
-                            translation_text = await get_translation_text(self.surah_number, i, lang_code)
-                            if translation_text:
-                                # Strip HTML or footnotes gracefully if any
-                                translation_text = translation_text.replace("\n", " ").strip()
-                        except Exception as e:
-                            print(f"DEBUG: Failed to fetch translation text for Surah {self.surah_number} Ayah {i}: {e}")
+        if playing is not None and not session.stop_event.is_set():
+            if isinstance(await playing, Disconnected):
+                raise Disconnected()
+
+        # Finished
+        if not session.stop_event.is_set():
+            await get_engine().disconnect(interaction.guild)
+
+    async def play_queue(self, interaction: discord.Interaction, session: DashboardSession, player: GuildPlayer,
+                         reciter_config: dict, start_ayah: int = None, end_ayah: int = None):
+        lang_code = None
+        if session.language != 'none':
+            lang_code = TRANSLATION_MAPPING.get(session.language, {}).get("aladhan")
+
+        # A producer task resolves and prepares upcoming Ayahs while the current one plays
+        audio_queue = AyahPrefetchQueue(session.surah_number, reciter_config, lang_code,
+                                        start_ayah or session.start_ayah, end_ayah or session.end_ayah)
+        audio_queue.start(session.stop_event)
+        session.audio_queue = audio_queue
+        try:
+            await self._consume_queue(interaction, session, player, audio_queue)
+        finally:
+            audio_queue.close()
+            if session.audio_queue is audio_queue:
+                session.audio_queue = None
+            if audio_queue.error:
+                logger.warning("Failed to resolve Surah %s: %s", session.surah_number, audio_queue.error)
+
+    async def _consume_queue(self, interaction: discord.Interaction, session: DashboardSession, player: GuildPlayer, audio_queue: AyahPrefetchQueue):
+        loop = asyncio.get_running_loop()
+        finished = None
+
+        def on_track_start(item):
+            session.mark_track(None, session.surah_number, item[0])
+            self.show_now_reciting(interaction, session, *item)
+
+        # One continuous source; the next Ayah's decoder is spawned while the current one plays
+        source = GaplessAudioSource(loop, on_track_start=on_track_start)
+        try:
+            while True:
+                item = await audio_queue.get()
+                if item is None: break
+                i, ayah = item
 
                 # Arabic Part (Always plays)
-                url = await get_ayah_audio(self.surah_number, i, reciter_string)
-                if url:
-                    print(f"DEBUG: Playing Arabic for Surah {self.surah_number} Ayah {i} using URL: {url}")
-                    
-                    if not voice_client.is_connected() or self.stop_event.is_set():
-                        break
-
-                    # Dynamically update the embed to show the translation while Arabic plays
-                    try:
-                        embed = interaction.message.embeds[0]
-                        lang_display = TRANSLATION_MAPPING.get(self.selected_language, {"name": "❌ ไม่แปล (No Translation)"})["name"]
-                        rec_name = RECITER_MAPPING.get(self.selected_reciter, {"name": "Unknown"})["name"]
-                        
-                        base_desc = f"👤 **Reciter:** {rec_name}\n🌍 **Translation Language:** {lang_display}\n\nYou can set an Ayah range, or directly press play to listen to the full Surah."
-                        new_desc = base_desc + f"\n\n📖 **Now Reciting:** Surah {self.surah_number}, Ayah {i}"
-                        
-                        if self.selected_language == 'none':
-                            new_desc += f"\n---\n📝 **Translation:** None"
-                        elif translation_text:
-                            new_desc += f"\n---\n📝 **Translation:** {translation_text}"
-                            
-                        embed.description = new_desc
-                        await interaction.edit_original_response(embed=embed, view=self)
-                    except Exception as e:
-                        print(f"DEBUG: Failed to update embed for Ayah {i}: {e}")
-                        
-                    # Basic FFmpeg play
-                    source = discord.FFmpegPCMAudio(url, before_options="-reconnect 1 -reconnect_streamed 1 -reconnect_delay_max 5", options="-vn")
-                    voice_client.play(source, after=lambda e: print(f'Finished playing: {e}') if e else None)
-                    
-                    # Wait for audio to actually start playing (Timeout protecting)
-                    timeout = 0
-                    while not voice_client.is_playing() and timeout < 10:
-                        await asyncio.sleep(0.5)
-                        timeout += 1
-                        if self.stop_event.is_set():
-                            break
-                            
-                    if not voice_client.is_playing() and not self.stop_event.is_set():
-                        print(f"DEBUG: Timeout waiting for audio to start for Surah {self.surah_number} Ayah {i}. Skipping to next.")
-                        continue
-                        
-                    # The most stable way to wait for audio to finish
-                    while voice_client.is_playing():
-                        await asyncio.sleep(0.5)
-                        if self.stop_event.is_set():
-                            break
-                            
-                    print(f"DEBUG: Arabic Finished for Surah {self.surah_number} Ayah {i}")
-                else:
-                    break # End of Surah
-                        
-            except Exception as e:
-                print(f"Failed to play Ayah {i}: {e}")
-                continue
+                url = ayah["audio"]
+                if not url:
+                    continue
+                if not player.is_connected() or session.stop_event.is_set():
+                    break
+
+                logger.debug("Queueing Arabic for Surah %s Ayah %s using URL: %s", session.surah_number, i, url)
+                try:
+                    # From the local cache when the producer already downloaded it
+                    await source.put(item, make_audio_source(ayah.get("path") or url, player.bitrate, copy=ayah.get("opus", False)))
+                except Exception as e:
+                    logger.warning("Failed to play Ayah %s: %s", i, e)
+                    continue
+
+                if finished is None:
+                    finished = player.enqueue(lambda: source)
+        finally:
+            source.close_input()
+            if finished is None:
+                source.cleanup()
+
+        if finished is not None:
+            error = await finished
+            if isinstance(error, Disconnected):
+                raise error
+            if error:
+                logger.warning("Finished playing: %s", error)
+
+    def show_now_reciting(self, interaction: discord.Interaction, session: DashboardSession, ayah_number: int, ayah: dict):
+        """
+        Schedules an embed update showing the Ayah (and its translation) that just started.
+
+        Edits are coalesced per message and sent off the playback path.
+        """
+        # Prepare Language text if needed
+        translation_text = ayah["text"]
+        if translation_text:
+            # Strip HTML or footnotes gracefully if any
+            translation_text = translation_text.replace("\n", " ").strip()
+
+        # Dynamically update the embed to show the translation while Arabic plays
+        try:
+            embed = interaction.message.embeds[0]
+            new_desc = reciting_header(session.reciter, session.language) + f"Surah {session.surah_number}, Ayah {ayah_number}"
+
+            if session.language == 'none':
+                new_desc += f"\n---\n📝 **Translation:** None"
+            elif translation_text:
+                new_desc += f"\n---\n📝 **Translation:** {translation_text}"
+
+            embed.description = new_desc
+            view = self.render(session.reciter, session.language)
+            get_embed_scheduler().submit(interaction.message.id, functools.partial(interaction.edit_original_response, embed=embed, view=view))
+        except Exception as e:
+            logger.debug("Failed to update embed for Ayah %s: %s", ayah_number, e)
 
     @discord.ui.button(label="⏹️ Stop", style=discord.ButtonStyle.danger, custom_id="stop_button")
     async def stop_button(self, interaction: discord.Interaction, button: discord.ui.Button):
         """Stop audio in voice channel."""
-        self.stop_event.set()
-        self.audio_queue.clear()
-        
-        if self.play_task and not self.play_task.done():
-            self.play_task.cancel()
-            
-        voice_client = interaction.guild.voice_client
-        if voice_client and voice_client.is_connected():
-            if voice_client.is_playing():
-                voice_client.stop()
-            await voice_client.disconnect()
+        session = await self.session_for(interaction)
+        if session is None:
+            return
+        if session.stop_event is not None:
+            session.stop_event.set()
+        if session.audio_queue:
+            session.audio_queue.close()
+
+        if session.play_task and not session.play_task.done():
+            session.play_task.cancel()
+
+        player = get_engine().player_for(interaction.guild)
+        if player.is_connected():
+            await get_engine().disconnect(interaction.guild)
             await interaction.response.send_message("Stopped playback and disconnected.", ephemeral=True)
         else:
             await interaction.response.send_message("The bot is not currently in a voice channel.", ephemeral=True)
@@ -344,6 +584,15 @@ class QuranDashboardCog(commands.Cog):
     """
     def __init__(self, bot: commands.Bot):
         self.bot = bot
+        self.surah_list_embeds = []
+        self.dashboard = QuranDashboardView()
+
+    async def cog_load(self):
+        # Both are static, so they are built once instead of on every interaction
+        get_surah_index()
+        self.surah_list_embeds = self.build_surah_list_embeds()
+        # One persistent view serves every dashboard, including those sent before a restart
+        self.bot.add_view(self.dashboard)
 
     @app_commands.command(name="quran", description="Open the Quran Dashboard")
     @app_commands.describe(surah_number="Surah number 1-114, or 0 to play the entire Quran from the beginning")
@@ -351,8 +600,8 @@ class QuranDashboardCog(commands.Cog):
         """
         Responds with an embed and a view to select reciter and play options.
         """
-        if surah_number < 0 or surah_number > 114:
-            await interaction.response.send_message("Surah number must be between 0 and 114.", ephemeral=True)
+        if surah_number != 0 and get_surah(surah_number) is None:
+            await interaction.response.send_message(f"Surah number must be between 0 and {SURAH_COUNT}.", ephemeral=True)
             return
             
         if surah_number == 0:
@@ -370,14 +619,64 @@ class QuranDashboardCog(commands.Cog):
             )
             embed.set_footer(text=f"Requested by {interaction.user.display_name}")
 
-        view = QuranDashboardView(surah_number)
-        await interaction.response.send_message(embed=embed, view=view)
+        response = await interaction.response.send_message(embed=embed, view=QuranDashboardView.render())
+        get_session_registry().create(response.message_id, interaction.guild_id, surah_number)
 
-    @app_commands.command(name="surah_list", description="Display a list of all 114 Surahs")
-    async def surah_list(self, interaction: discord.Interaction):
+    @app_commands.command(name="resume", description="Continue this server's last recitation from where it stopped")
+    async def resume(self, interaction: discord.Interaction):
         """
-        Responds with paginated embeds listing all Surahs.
+        Opens a dashboard at the server's saved position and starts streaming from that Ayah.
         """
+        registry = get_session_registry()
+        position = registry.get_position(interaction.guild_id)
+        if position is None:
+            await interaction.response.send_message("There is no recitation to resume in this server.", ephemeral=True)
+            return
+        if interaction.user.voice is None or interaction.user.voice.channel is None:
+            await interaction.response.send_message("You need to join a voice channel first!", ephemeral=True)
+            return
+
+        player = get_engine().player_for(interaction.guild)
+        await player.connect(interaction.user.voice.channel)
+        player.stop()
+
+        if position.surah_number == 0:
+            title = "📖 Now Playing: The Noble Quran (Full Recitation)"
+        else:
+            title = f"📖 Quran Dashboard (Surah {position.surah_number})"
+        embed = discord.Embed(
+            title=title,
+            description=reciting_header(position.reciter, "none") + f"Surah {position.surah}, Ayah {position.ayah}",
+            color=discord.Color.green()
+        )
+        embed.set_footer(text=f"Resumed by {interaction.user.display_name}")
+        response = await interaction.response.send_message(embed=embed, view=QuranDashboardView.render(position.reciter))
+
+        session = registry.create(response.message_id, interaction.guild_id, position.surah_number)
+        bind(guild_id=session.guild_id, session_id=session.message_id)
+        session.reciter = position.reciter
+        session.current_surah = position.surah
+        if position.end_ayah:
+            session.start_ayah, session.end_ayah = position.ayah, position.end_ayah
+        registry.save(session)
+        session.stop_event = asyncio.Event()
+
+        reciter_config = RECITER_MAPPING.get(session.reciter, RECITER_MAPPING["husary"])
+        if session.is_full_quran:
+            playback = self.dashboard.play_full_quran_loop(interaction, session, player, reciter_config, position.ayah)
+        else:
+            playback = self.dashboard.play_surah_stream(interaction, session, player, reciter_config, position.ayah, position.end_ayah)
+        self.dashboard.start_playback(session, playback)
+
+    @quran.autocomplete("surah_number")
+    async def surah_number_autocomplete(self, interaction: discord.Interaction, current: str) -> list[app_commands.Choice[int]]:
+        """
+        Suggests surahs matching a number, transliterated name or English name.
+        """
+        return get_surah_index().autocomplete(current)
+
+    @staticmethod
+    def build_surah_list_embeds() -> list[discord.Embed]:
         embeds = []
         chunk_size = 30 # Display 30 per page
         
@@ -392,7 +691,14 @@ class QuranDashboardCog(commands.Cog):
             )
             embed.set_footer(text=f"Page {len(embeds) + 1} of {(len(SURAHS) + chunk_size - 1) // chunk_size}")
             embeds.append(embed)
-            
+        return embeds
+
+    @app_commands.command(name="surah_list", description="Display a list of all 114 Surahs")
+    async def surah_list(self, interaction: discord.Interaction):
+        """
+        Responds with paginated embeds listing all Surahs.
+        """
+        embeds = self.surah_list_embeds or self.build_surah_list_embeds()
         view = SurahListPaginationView(embeds)
         await interaction.response.send_message(embed=embeds[0], view=view, ephemeral=True)
 
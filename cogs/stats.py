@@ -0,0 +1,107 @@
+"""
+Stats Cog exposing the bot's hot-path metrics to administrators.
+"""
+import os
+
+import discord
+from aiohttp import web
+from discord import app_commands
+from discord.ext import commands
+
+from utils.broadcast import BROADCAST_LISTENERS
+from utils.logs import get_log_router
+from utils.metrics import (
+    API_LATENCY, API_REQUESTS, CACHE_REQUESTS, EMBED_EDIT_LATENCY, FIRST_FRAME_LATENCY,
+    LOOP_LAG, REGISTRY, TRACK_GAPS, VOICE_SESSIONS,
+)
+
+# Local port for the Prometheus text endpoint (0 disables it)
+METRICS_PORT = int(os.getenv("METRICS_PORT", "0"))
+METRICS_HOST = os.getenv("METRICS_HOST", "127.0.0.1")
+
+
+def _ms(seconds: float) -> str:
+    return f"{seconds * 1000:.0f}ms"
+
+
+def _latency_line(histogram, *labels) -> str:
+    _, total, count = histogram.values.get(labels, (None, 0.0, 0))
+    if not count:
+        return "no samples"
+    return (f"n={count} avg={_ms(total / count)} p50≤{_ms(histogram.percentile(0.5, *labels))} "
+            f"p95≤{_ms(histogram.percentile(0.95, *labels))} p99≤{_ms(histogram.percentile(0.99, *labels))}")
+
+
+class StatsCog(commands.Cog):
+    """
+    Cog for the `/stats` command and the optional Prometheus endpoint.
+    """
+    def __init__(self, bot: commands.Bot):
+        self.bot = bot
+        self.runner = None
+
+    async def cog_load(self):
+        if METRICS_PORT:
+            app = web.Application()
+            app.router.add_get("/metrics", self.metrics_handler)
+            self.runner = web.AppRunner(app)
+            await self.runner.setup()
+            await web.TCPSite(self.runner, METRICS_HOST, METRICS_PORT).start()
+
+    async def cog_unload(self):
+        if self.runner is not None:
+            await self.runner.cleanup()
+
+    async def metrics_handler(self, request: web.Request) -> web.Response:
+        return web.Response(text=REGISTRY.render_prometheus(), content_type="text/plain", charset="utf-8")
+
+    @app_commands.command(name="stats", description="Show playback and API performance statistics")
+    @app_commands.default_permissions(administrator=True)
+    async def stats(self, interaction: discord.Interaction):
+        """
+        Responds with an ephemeral summary of counters and latency histograms.
+        """
+        embed = discord.Embed(title="📊 Bot Statistics", color=discord.Color.blue())
+        embed.add_field(name="Voice Sessions", value=str(int(VOICE_SESSIONS.value())), inline=True)
+        shard_ids = self.bot.shard_ids or range(self.bot.shard_count or 1)
+        embed.add_field(name="Shards", value=f"{len(shard_ids)} of {self.bot.shard_count or 1} in this process", inline=True)
+        embed.add_field(name="Broadcast Listeners", value=str(int(BROADCAST_LISTENERS.value())), inline=True)
+        embed.add_field(name="Event Loop Lag", value=_latency_line(LOOP_LAG), inline=False)
+
+        api_lines = []
+        for (endpoint,) in sorted(API_LATENCY.values):
+            errors = sum(count for (name, status), count in API_REQUESTS.values.items() if name == endpoint and status not in ("200", "206"))
+            api_lines.append(f"`{endpoint}` {_latency_line(API_LATENCY, endpoint)} errors={errors}")
+        embed.add_field(name="API Requests", value="\n".join(api_lines) or "no samples", inline=False)
+
+        cache_lines = []
+        for cache in sorted({cache for cache, _ in CACHE_REQUESTS.values}):
+            results = {result: int(count) for (name, result), count in CACHE_REQUESTS.values.items() if name == cache}
+            cache_lines.append(f"`{cache}` " + " ".join(f"{result}={count}" for result, count in sorted(results.items())))
+        embed.add_field(name="Caches", value="\n".join(cache_lines) or "no samples", inline=False)
+
+        embed.add_field(name="FFmpeg First Frame", value=_latency_line(FIRST_FRAME_LATENCY), inline=False)
+        embed.add_field(name="Gaps Between Ayahs", value=_latency_line(TRACK_GAPS, "ayah"), inline=False)
+        embed.add_field(name="Gaps Between Tracks", value=_latency_line(TRACK_GAPS, "track"), inline=False)
+        embed.add_field(name="Embed Edits", value=_latency_line(EMBED_EDIT_LATENCY), inline=False)
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+
+    @app_commands.command(name="trace", description="Turn verbose playback logging for this server on or off")
+    @app_commands.default_permissions(administrator=True)
+    async def trace(self, interaction: discord.Interaction, enabled: bool):
+        """
+        Logs every debug record of this guild while enabled; other guilds stay sampled.
+        """
+        router = get_log_router()
+        router.set_trace(interaction.guild_id, enabled)
+        await interaction.response.send_message(
+            f"Verbose logging {'enabled' if enabled else 'disabled'} for this server ({len(router.traced())} traced in this process).",
+            ephemeral=True,
+        )
+
+
+async def setup(bot: commands.Bot):
+    """
+    Extension setup function.
+    """
+    await bot.add_cog(StatsCog(bot))
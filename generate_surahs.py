@@ -1,11 +1,38 @@
+"""
+Regenerates `utils/surah_table.py` from the Quran.com chapters endpoint.
+
+Usage: python generate_surahs.py
+"""
 import urllib.request
 import json
-req = urllib.request.Request("https://api.quran.com/api/v4/chapters?language=en", headers={'User-Agent': 'Mozilla/5.0'})
-with urllib.request.urlopen(req) as response:
-    data = json.loads(response.read())
-surahs = [f"{c['id']}. {c['name_simple']} ({c['translated_name']['name']})" for c in data['chapters']]
-with open("utils/surahs.py", "w", encoding="utf-8") as f:
-    f.write("SURAHS = [\n")
-    for s in surahs:
-        f.write(f'    "{s}",\n')
-    f.write("]\n")
+
+
+def build_rows(chapters: list[dict]) -> list[tuple]:
+    """
+    Returns one `(id, name, translated_name, ayah_count, revelation_place, ayah_offset)` row per chapter.
+
+    `ayah_offset` is the number of Ayahs in all earlier surahs, so the global
+    number of Ayah `n` is `ayah_offset + n`.
+    """
+    rows, offset = [], 0
+    for c in sorted(chapters, key=lambda c: c['id']):
+        rows.append((c['id'], c['name_simple'], c['translated_name']['name'], c['verses_count'], c['revelation_place'], offset))
+        offset += c['verses_count']
+    return rows
+
+
+def write_table(rows: list[tuple], path: str = "utils/surah_table.py"):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write('"""\nGenerated by generate_surahs.py; do not edit.\n\n')
+        f.write('Rows are (id, name, translated_name, ayah_count, revelation_place, ayah_offset).\n"""\n')
+        f.write("SURAH_TABLE = (\n")
+        for row in rows:
+            f.write(f"    {row!r},\n")
+        f.write(")\n")
+
+
+if __name__ == '__main__':
+    req = urllib.request.Request("https://api.quran.com/api/v4/chapters?language=en", headers={'User-Agent': 'Mozilla/5.0'})
+    with urllib.request.urlopen(req) as response:
+        data = json.loads(response.read())
+    write_table(build_rows(data['chapters']))
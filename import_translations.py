@@ -0,0 +1,27 @@
+"""
+Imports translation editions from AlQuran.cloud into the offline translation store.
+
+Usage: python import_translations.py [edition ...]
+With no arguments every edition in TRANSLATION_MAPPING is imported.
+"""
+import asyncio
+import sys
+
+from utils.api_client import TRANSLATION_MAPPING, get_client
+from utils.translation_store import get_translation_store
+
+
+async def main(editions: list[str]):
+    store = get_translation_store()
+    try:
+        for edition in editions:
+            count = await store.import_edition(edition)
+            print(f"Imported {edition}: {count} ayahs")
+    finally:
+        await get_client().close()
+        store.close()
+
+
+if __name__ == '__main__':
+    editions = sys.argv[1:] or [info["aladhan"] for info in TRANSLATION_MAPPING.values() if info["aladhan"]]
+    asyncio.run(main(editions))
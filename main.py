@@ -4,55 +4,130 @@ Main entry point for the Discord bot.
 import asyncio
 import logging
 import os
+import time
 
 import discord
 from discord.ext import commands
 from dotenv import load_dotenv
 
-# Setup basic logging
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(name)s - %(message)s')
-logger = logging.getLogger('discord')
+from utils.api_client import QuranAPIClient, set_client
+from utils.audio_cache import get_cache
+from utils.ayah_timestamps import get_timestamp_index
+from utils.broadcast import get_broadcast_hub
+from utils.command_sync import sync_if_changed
+from utils.embed_updates import get_embed_scheduler
+from utils.logs import setup_logging, stop_logging
+from utils.metrics import monitor_event_loop
+from utils.opus_store import get_opus_store
+from utils.playback import get_engine
+from utils.sessions import get_session_registry
 
 # Load environment variables
 load_dotenv()
 
-class QuranBot(commands.Bot):
+# Shard layout of this process; set by cluster.py, or left empty to let Discord pick the shard count
+SHARD_COUNT = int(os.getenv('SHARD_COUNT', '0')) or None
+SHARD_IDS = [int(shard_id) for shard_id in os.getenv('SHARD_IDS', '').split(',') if shard_id] or None
+CLUSTER_ID = os.getenv('CLUSTER_ID')
+
+# Route logging through a background listener so the event loop never blocks on stdout
+log_prefix = f'[cluster {CLUSTER_ID}] ' if CLUSTER_ID is not None else ''
+setup_logging(log_prefix)
+logger = logging.getLogger('discord')
+
+class QuranBot(commands.AutoShardedBot):
     """
     A scalable Python Discord bot project.
+
+    Runs every shard in `shard_ids` (all of them if None) on one event loop;
+    `cluster.py` spreads shard ranges over several such processes.
     """
-    def __init__(self):
+    def __init__(self, shard_ids: list[int] = None, shard_count: int = None):
         super().__init__(
             command_prefix=commands.when_mentioned_or('!'),
             intents=discord.Intents.default(),
-            help_command=None
+            help_command=None,
+            shard_ids=shard_ids,
+            shard_count=shard_count
         )
+        self.api_client = QuranAPIClient()
+        set_client(self.api_client)
+        self.loop_monitor = None
+        self.cache_loading = None
+        self.started_at = time.perf_counter()
+        self.ready_logged = False
 
     async def setup_hook(self):
         """
         Setup hook to automatically load all cogs from the `cogs/` directory.
         """
+        logger.info(f"Logged in after {time.perf_counter() - self.started_at:.2f}s")
+        self.loop_monitor = asyncio.create_task(monitor_event_loop())
+        # Index the audio cache in a worker thread before the first playback needs it
+        self.cache_loading = asyncio.create_task(get_cache().load())
+        self.cache_loading.add_done_callback(lambda t: t.cancelled() or t.exception())
+
         # Ensure cogs directory exists
         if not os.path.exists('./cogs'):
             os.makedirs('./cogs')
-            
-        for filename in os.listdir('./cogs'):
-            if filename.endswith('.py') and not filename.startswith('__'):
-                cog_name = f'cogs.{filename[:-3]}'
-                try:
-                    await self.load_extension(cog_name)
-                    logger.info(f"Loaded cog: {cog_name}")
-                except Exception as e:
-                    logger.exception(f"Failed to load cog {cog_name}")
-
-        # Sync the app commands with Discord.
-        await self.tree.sync()
-        logger.info("Application commands synced.")
+
+        # Extensions are independent, so they load concurrently
+        phase_started = time.perf_counter()
+        cog_names = [
+            f'cogs.{filename[:-3]}' for filename in sorted(os.listdir('./cogs'))
+            if filename.endswith('.py') and not filename.startswith('__')
+        ]
+        await asyncio.gather(*(self.load_cog(cog_name) for cog_name in cog_names))
+        logger.info(f"Loaded {len(self.extensions)}/{len(cog_names)} cogs in {time.perf_counter() - phase_started:.2f}s")
+
+        # Commands are global, so only the process running shard 0 syncs them
+        if self.shard_ids is not None and 0 not in self.shard_ids:
+            return
+
+        # Sync the app commands with Discord only when they changed since the last sync
+        phase_started = time.perf_counter()
+        try:
+            if await sync_if_changed(self.tree, self.application_id):
+                logger.info(f"Application commands synced in {time.perf_counter() - phase_started:.2f}s")
+            else:
+                logger.info("Application commands unchanged, skipped sync.")
+        except Exception:
+            logger.exception("Failed to sync application commands")
+
+    async def load_cog(self, cog_name: str):
+        """
+        Loads a single cog extension, logging how long it took.
+        """
+        started = time.perf_counter()
+        try:
+            await self.load_extension(cog_name)
+            logger.info(f"Loaded cog: {cog_name} ({time.perf_counter() - started:.2f}s)")
+        except Exception:
+            logger.exception(f"Failed to load cog {cog_name}")
+
+    async def close(self):
+        """
+        Disconnects voice sessions, stops background workers and closes the shared API client before shutting down the bot.
+        """
+        if self.loop_monitor:
+            self.loop_monitor.cancel()
+        get_broadcast_hub().close()
+        await get_engine().close()
+        await get_opus_store().close()
+        await get_embed_scheduler().close()
+        await self.api_client.close()
+        get_session_registry().close()
+        get_timestamp_index().close()
+        await super().close()
 
     async def on_ready(self):
         """
         Event triggered when the bot is ready.
         """
         logger.info(f"Logged in as {self.user} (ID: {self.user.id})")
+        if not self.ready_logged:
+            self.ready_logged = True
+            logger.info(f"Ready {time.perf_counter() - self.started_at:.2f}s after start")
         logger.info("------")
 
 
@@ -65,8 +140,12 @@ def main():
         logger.error("Please set a valid DISCORD_TOKEN in the environment variables.")
         return
 
-    bot = QuranBot()
-    bot.run(token)
+    bot = QuranBot(shard_ids=SHARD_IDS, shard_count=SHARD_COUNT)
+    try:
+        # Logging is already set up; discord.py must not add its own blocking handler
+        bot.run(token, log_handler=None)
+    finally:
+        stop_logging()
 
 
 if __name__ == '__main__':
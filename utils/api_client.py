@@ -4,30 +4,53 @@ API Client for fetching Quran audio URLs.
 This module provides asynchronous API calls to fetch audio URLs
 from the Quran.com API (for full surahs) and the Aladhan API (for specific ayahs).
 """
+import contextlib
+import logging
+import os
+import time
+
 import aiohttp
 
-# Central mapping for reciters to their respective API IDs and Names
+from utils.metrics import API_LATENCY, API_REQUESTS
+from utils.single_flight import SingleFlight, single_flight
+
+logger = logging.getLogger(__name__)
+
+# API base URLs, overridable to point the bot at mirrors or local stand-ins
+QURAN_COM_API = os.getenv("QURAN_COM_API", "https://api.quran.com/api/v4")
+ALQURAN_CLOUD_API = os.getenv("ALQURAN_CLOUD_API", "https://api.alquran.cloud/v1")
+# Audio hosts: Quran.com's per-verse files and AlQuran.cloud's full-surah files
+QURAN_COM_VERSES_CDN = os.getenv("QURAN_COM_VERSES_CDN", "https://verses.quran.com")
+ISLAMIC_NETWORK_CDN = os.getenv("ISLAMIC_NETWORK_CDN", "https://cdn.islamic.network/quran")
+
+# Resolved URLs and texts shared across guilds: entry count and lifetime in seconds
+API_CACHE_SIZE = int(os.getenv("API_CACHE_SIZE", "4096"))
+API_CACHE_TTL = float(os.getenv("API_CACHE_TTL", "600"))
+
+# Central mapping for reciters to their respective API IDs and Names.
+# "quran_com_chapters" is a chapter-reciter id and "quran_com_verses" a per-verse recitation
+# id (a separate id space); both are set only where Quran.com hosts this reciter's own recording.
 RECITER_MAPPING = {
-    "alafasy": {"name": "Mishary Rashid Alafasy", "description": "Kuwait", "quran_com": 7, "aladhan": "ar.alafasy"},
-    "husary": {"name": "Mahmoud Khalil Al-Husary", "description": "Egypt", "quran_com": 6, "aladhan": "ar.husary"},
-    "abdulsamad": {"name": "AbdulBaset AbdulSamad", "description": "Egypt", "quran_com": 1, "aladhan": "ar.abdulsamad"},
-    "sudais": {"name": "Abdur-Rahman as-Sudais", "description": "Mecca", "quran_com": 3, "aladhan": "ar.abdurrahmaansudais"},
-    "shuraym": {"name": "Saud Al-Shuraim", "description": "Mecca", "quran_com": 12, "aladhan": "ar.saoodshuraym"},
-    "maher": {"name": "Maher Al-Muaiqly", "description": "Mecca", "quran_com": 11, "aladhan": "ar.mahermuaiqly"},
-    "shaatree": {"name": "Abu Bakr al-Shatri", "description": "Saudi Arabia", "quran_com": 4, "aladhan": "ar.shaatree"},
-    "ajamy": {"name": "Ahmed ibn Ali al-Ajamy", "description": "Saudi Arabia", "quran_com": 2, "aladhan": "ar.ahmedajamy"},
-    "rifai": {"name": "Hani ar-Rifai", "description": "Saudi Arabia", "quran_com": 5, "aladhan": "ar.hanirifai"},
-    "hudhaify": {"name": "Ali Alhuthaifi", "description": "Medina", "quran_com": 8, "aladhan": "ar.hudhaify"},
-    "minshawi": {"name": "Muhammad Siddiq al-Minshawi", "description": "Egypt", "quran_com": 11, "aladhan": "ar.minshawi"},
-    "ayyoub": {"name": "Muhammad Ayyub", "description": "Medina", "quran_com": 9, "aladhan": "ar.muhammadayyoub"},
-    "jibreel": {"name": "Muhammad Jibreel", "description": "Egypt", "quran_com": 10, "aladhan": "ar.muhammadjibreel"},
-    "basfar": {"name": "Abdullah Basfar", "description": "Saudi Arabia", "quran_com": 7, "aladhan": "ar.abdullahbasfar"},
-    "akhbar": {"name": "Ibrahim Al Akhdar", "description": "Saudi Arabia", "quran_com": 7, "aladhan": "ar.ibrahimakhbar"},
-    "parhizgar": {"name": "Shahriar Parhizgar", "description": "Iran", "quran_com": 7, "aladhan": "ar.parhizgar"},
-    "aymanswoaid": {"name": "Ayman Sowaid", "description": "Saudi Arabia", "quran_com": 7, "aladhan": "ar.aymanswoaid"},
-    "husarymujawwad": {"name": "Al-Husary (Mujawwad)", "description": "Egypt", "quran_com": 6, "aladhan": "ar.husarymujawwad"},
-    "minshawimujawwad": {"name": "Al-Minshawi (Mujawwad)", "description": "Egypt", "quran_com": 11, "aladhan": "ar.minshawimujawwad"},
-    "abdulbasit": {"name": "AbdulBaset (Murattal)", "description": "Egypt", "quran_com": 2, "aladhan": "ar.abdulbasitmurattal"},
+    "alafasy": {"name": "Mishary Rashid Alafasy", "description": "Kuwait", "quran_com_chapters": 7, "quran_com_verses": 7, "aladhan": "ar.alafasy"},
+    "husary": {"name": "Mahmoud Khalil Al-Husary", "description": "Egypt", "quran_com_chapters": 6, "quran_com_verses": 6, "aladhan": "ar.husary"},
+    "abdulsamad": {"name": "AbdulBaset AbdulSamad", "description": "Egypt", "aladhan": "ar.abdulsamad"},
+    "sudais": {"name": "Abdur-Rahman as-Sudais", "description": "Mecca", "quran_com_chapters": 3, "quran_com_verses": 3, "aladhan": "ar.abdurrahmaansudais"},
+    "shuraym": {"name": "Saud Al-Shuraim", "description": "Mecca", "quran_com_chapters": 10, "quran_com_verses": 10, "aladhan": "ar.saoodshuraym"},
+    "maher": {"name": "Maher Al-Muaiqly", "description": "Mecca", "aladhan": "ar.mahermuaiqly"},
+    "shaatree": {"name": "Abu Bakr al-Shatri", "description": "Saudi Arabia", "quran_com_chapters": 4, "quran_com_verses": 4, "aladhan": "ar.shaatree"},
+    "ajamy": {"name": "Ahmed ibn Ali al-Ajamy", "description": "Saudi Arabia", "aladhan": "ar.ahmedajamy"},
+    "rifai": {"name": "Hani ar-Rifai", "description": "Saudi Arabia", "quran_com_chapters": 5, "quran_com_verses": 5, "aladhan": "ar.hanirifai"},
+    "hudhaify": {"name": "Ali Alhuthaifi", "description": "Medina", "aladhan": "ar.hudhaify"},
+    "minshawi": {"name": "Muhammad Siddiq al-Minshawi", "description": "Egypt", "quran_com_chapters": 9, "quran_com_verses": 9, "aladhan": "ar.minshawi"},
+    "ayyoub": {"name": "Muhammad Ayyub", "description": "Medina", "aladhan": "ar.muhammadayyoub"},
+    "jibreel": {"name": "Muhammad Jibreel", "description": "Egypt", "aladhan": "ar.muhammadjibreel"},
+    "basfar": {"name": "Abdullah Basfar", "description": "Saudi Arabia", "aladhan": "ar.abdullahbasfar"},
+    "akhbar": {"name": "Ibrahim Al Akhdar", "description": "Saudi Arabia", "aladhan": "ar.ibrahimakhbar"},
+    "parhizgar": {"name": "Shahriar Parhizgar", "description": "Iran", "aladhan": "ar.parhizgar"},
+    "aymanswoaid": {"name": "Ayman Sowaid", "description": "Saudi Arabia", "aladhan": "ar.aymanswoaid"},
+    "husarymujawwad": {"name": "Al-Husary (Mujawwad)", "description": "Egypt", "aladhan": "ar.husarymujawwad"},
+    "minshawimujawwad": {"name": "Al-Minshawi (Mujawwad)", "description": "Egypt", "quran_com_chapters": 8, "quran_com_verses": 8, "aladhan": "ar.minshawimujawwad"},
+    "abdulbasit": {"name": "AbdulBaset (Murattal)", "description": "Egypt", "quran_com_chapters": 2, "quran_com_verses": 2, "aladhan": "ar.abdulbasitmurattal"},
 }
 
 # Central mapping for text translations
@@ -45,14 +68,81 @@ TRANSLATION_MAPPING = {
     "tr.diyanet": {"name": "🇹🇷 Turkish", "aladhan": "tr.diyanet"},
 }
 
-async def get_full_surah_audio(surah_number: int, reciter_id: int) -> str:
+def _copy_ayah_table(table: dict[int, dict]) -> dict[int, dict]:
+    # Callers annotate the per-Ayah dicts, so each one gets its own copy
+    return {ayah_number: dict(ayah) for ayah_number, ayah in table.items()}
+
+
+class QuranAPIClient:
     """
-    Fetches the full surah audio URL from the Quran.com API.
+    Long-lived HTTP client shared by every API call.
+
+    Keeps a single `aiohttp.ClientSession` with per-host keep-alive pools and
+    DNS caching, so consecutive ayah lookups reuse the same TLS connection
+    instead of opening a new one per request. Identical concurrent lookups are
+    coalesced into one request and their results cached briefly.
     """
-    url = f"https://api.quran.com/api/v4/chapter_recitations/{reciter_id}/{surah_number}"
-    
-    async with aiohttp.ClientSession() as session:
-        async with session.get(url) as response:
+    def __init__(self, limit: int = 100, limit_per_host: int = 16, dns_ttl: int = 300, timeout: float = 15.0,
+                 quran_com_api: str = QURAN_COM_API, alquran_cloud_api: str = ALQURAN_CLOUD_API,
+                 quran_com_verses_cdn: str = QURAN_COM_VERSES_CDN, islamic_network_cdn: str = ISLAMIC_NETWORK_CDN):
+        self.quran_com_api = quran_com_api.rstrip("/")
+        self.alquran_cloud_api = alquran_cloud_api.rstrip("/")
+        self.quran_com_verses_cdn = quran_com_verses_cdn.rstrip("/")
+        self.islamic_network_cdn = islamic_network_cdn.rstrip("/")
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.dns_ttl = dns_ttl
+        self.timeout = aiohttp.ClientTimeout(total=timeout)
+        self.flights = SingleFlight(API_CACHE_SIZE, API_CACHE_TTL)
+        self._session = None
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        """
+        Returns the shared session, creating it on first use.
+        """
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.limit,
+                limit_per_host=self.limit_per_host,
+                ttl_dns_cache=self.dns_ttl,
+                use_dns_cache=True,
+                keepalive_timeout=60,
+            )
+            self._session = aiohttp.ClientSession(connector=connector, timeout=self.timeout)
+        return self._session
+
+    async def close(self):
+        """
+        Closes the shared session and its connection pools.
+        """
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    @contextlib.asynccontextmanager
+    async def get(self, endpoint: str, url: str, **kwargs):
+        """
+        Issues a GET on the shared session, recording its latency and status under `endpoint`.
+        """
+        start = time.perf_counter()
+        status = "error"
+        try:
+            async with self.session.get(url, **kwargs) as response:
+                status = str(response.status)
+                yield response
+        finally:
+            API_LATENCY.observe(time.perf_counter() - start, endpoint)
+            API_REQUESTS.inc(endpoint, status)
+
+    @single_flight("chapter_recitation")
+    async def get_full_surah_audio(self, surah_number: int, reciter_id: int) -> str:
+        """
+        Fetches the full surah audio URL from the Quran.com API.
+        """
+        url = f"{self.quran_com_api}/chapter_recitations/{reciter_id}/{surah_number}"
+
+        async with self.get("chapter_recitation", url) as response:
             if response.status == 200:
                 data = await response.json()
                 audio_file = data.get("audio_file", {})
@@ -60,15 +150,112 @@ async def get_full_surah_audio(surah_number: int, reciter_id: int) -> str:
             else:
                 raise Exception(f"Quran.com API returned status {response.status}")
 
-async def get_ayah_audio(surah_number: int, ayah_number: int, reciter_string: str) -> str:
-    """
-    Fetches the audio URL for a specific Ayah from the Aladhan (AlQuran.cloud) API.
-    """
-    url = f"https://api.alquran.cloud/v1/ayah/{surah_number}:{ayah_number}/{reciter_string}"
-    print(f"DEBUG: Requesting URL: {url}")
-    
-    async with aiohttp.ClientSession() as session:
-        async with session.get(url) as response:
+    @single_flight("chapter_segments")
+    async def get_chapter_timestamps(self, surah_number: int, reciter_id: int) -> dict:
+        """
+        Fetches a chapter's audio file together with the timing of every Ayah within it from the Quran.com API.
+
+        Returns e.g. `{"audio_url": "https://...", "file_size": 123456, "timestamps": {1: (0, 6493), ...}}`
+        with Ayah start and end offsets in milliseconds. The timestamps only hold
+        for that exact file.
+        """
+        url = f"{self.quran_com_api}/chapter_recitations/{reciter_id}/{surah_number}"
+
+        async with self.get("chapter_segments", url, params={"segments": "true"}) as response:
+            if response.status == 200:
+                data = await response.json()
+            else:
+                raise Exception(f"Quran.com API returned status {response.status}")
+
+        audio_file = data.get("audio_file", {})
+        audio_url = audio_file.get("audio_url", "")
+        if audio_url.startswith("//"):
+            audio_url = "https:" + audio_url
+        timestamps = {}
+        for timestamp in audio_file.get("timestamps") or []:
+            ayah_number = int(timestamp["verse_key"].split(":")[1])
+            timestamps[ayah_number] = (timestamp["timestamp_from"], timestamp["timestamp_to"])
+        return {"audio_url": audio_url, "file_size": audio_file.get("file_size"), "timestamps": dict(sorted(timestamps.items()))}
+
+    @single_flight("chapter_recitations")
+    async def get_chapter_audio_files(self, reciter_id: int) -> dict[int, dict]:
+        """
+        Fetches every chapter's audio file for a reciter from the Quran.com API in one request.
+
+        Returns a table keyed by surah number, e.g.
+        `{1: {"audio_url": "https://...", "file_size": 123456, "duration": None}}`.
+        """
+        url = f"{self.quran_com_api}/chapter_recitations/{reciter_id}"
+
+        async with self.get("chapter_recitations", url) as response:
+            if response.status == 200:
+                data = await response.json()
+            else:
+                raise Exception(f"Quran.com API returned status {response.status}")
+
+        files = {}
+        for audio_file in data.get("audio_files", []):
+            audio_url = audio_file.get("audio_url", "")
+            if audio_url.startswith("//"):
+                audio_url = "https:" + audio_url
+            files[audio_file["chapter_id"]] = {
+                "audio_url": audio_url,
+                "file_size": audio_file.get("file_size"),
+                "duration": audio_file.get("duration"),
+            }
+        return files
+
+    @single_flight("verse_recitations", copy=_copy_ayah_table)
+    async def get_verse_audio_files(self, surah_number: int, recitation_id: int,
+                                    start: int = None, end: int = None) -> dict[int, dict]:
+        """
+        Fetches every Ayah audio URL of a surah from the Quran.com API in one request.
+
+        Returns the same table shape as `get_surah_ayahs`, without translation texts.
+        """
+        url = f"{self.quran_com_api}/quran/recitations/{recitation_id}"
+
+        async with self.get("verse_recitations", url, params={"chapter_number": surah_number}) as response:
+            if response.status == 200:
+                data = await response.json()
+            else:
+                raise Exception(f"Quran.com API returned status {response.status}")
+
+        table = {}
+        for audio_file in data.get("audio_files", []):
+            ayah_number = int(audio_file["verse_key"].split(":")[1])
+            if (start and ayah_number < start) or (end and ayah_number > end):
+                continue
+            audio_url = audio_file.get("url", "")
+            if audio_url.startswith("//"):
+                audio_url = "https:" + audio_url
+            elif audio_url and not audio_url.startswith(("http://", "https://")):
+                audio_url = f"{self.quran_com_verses_cdn}/{audio_url}"
+            table[ayah_number] = {"audio": audio_url, "text": None}
+        return dict(sorted(table.items()))
+
+    @single_flight("surah_audio_cdn")
+    async def get_surah_audio_cdn(self, surah_number: int, edition: str, bitrate: int = 128) -> str:
+        """
+        Returns AlQuran.cloud's full-surah audio URL for an edition after checking that it exists.
+        """
+        url = f"{self.islamic_network_cdn}/audio-surah/{bitrate}/{edition}/{surah_number}.mp3"
+
+        async with self.get("surah_audio_cdn", url, headers={"Range": "bytes=0-0"}) as response:
+            if response.status in (200, 206):
+                return url
+            else:
+                raise Exception(f"AlQuran.cloud CDN returned status {response.status}")
+
+    @single_flight("ayah_audio")
+    async def get_ayah_audio(self, surah_number: int, ayah_number: int, reciter_string: str) -> str:
+        """
+        Fetches the audio URL for a specific Ayah from the Aladhan (AlQuran.cloud) API.
+        """
+        url = f"{self.alquran_cloud_api}/ayah/{surah_number}:{ayah_number}/{reciter_string}"
+        logger.debug("Requesting URL: %s", url)
+
+        async with self.get("ayah_audio", url) as response:
             if response.status == 200:
                 data = await response.json()
                 return data.get("data", {}).get("audio", "")
@@ -76,17 +263,108 @@ async def get_ayah_audio(surah_number: int, ayah_number: int, reciter_string: st
                 error_text = await response.text()
                 raise Exception(f"AlQuran.cloud API returned status {response.status}: {error_text}")
 
-async def get_translation_text(surah_number: int, ayah_number: int, lang_code: str) -> str:
-    """
-    Fetches the translation text for a specific Ayah from the AlQuran.cloud API.
-    """
-    url = f"https://api.alquran.cloud/v1/ayah/{surah_number}:{ayah_number}/{lang_code}"
-    
-    async with aiohttp.ClientSession() as session:
-        async with session.get(url) as response:
+    @single_flight("ayah_translation")
+    async def get_translation_text(self, surah_number: int, ayah_number: int, lang_code: str) -> str:
+        """
+        Fetches the translation text for a specific Ayah from the AlQuran.cloud API.
+        """
+        url = f"{self.alquran_cloud_api}/ayah/{surah_number}:{ayah_number}/{lang_code}"
+
+        async with self.get("ayah_translation", url) as response:
             if response.status == 200:
                 data = await response.json()
                 return data.get("data", {}).get("text", "")
             else:
                 error_text = await response.text()
                 raise Exception(f"AlQuran.cloud Translation API returned status {response.status}: {error_text}")
+
+    @single_flight("surah_editions", copy=_copy_ayah_table)
+    async def get_surah_ayahs(self, surah_number: int, reciter_string: str, lang_code: str = None,
+                              start: int = None, end: int = None) -> dict[int, dict]:
+        """
+        Resolves the audio URL and translation text for every Ayah of a surah in one request.
+
+        Uses AlQuran.cloud's multi-edition endpoint and returns a table keyed by
+        Ayah number, e.g. `{1: {"audio": "https://...", "text": "..."}}`.
+        `start` and `end` are inclusive Ayah bounds.
+        """
+        editions = reciter_string if not lang_code else f"{reciter_string},{lang_code}"
+        url = f"{self.alquran_cloud_api}/surah/{surah_number}/editions/{editions}"
+        params = {}
+        if start:
+            params["offset"] = start - 1
+        if end:
+            params["limit"] = end - (start or 1) + 1
+
+        async with self.get("surah_editions", url, params=params) as response:
+            if response.status == 200:
+                data = await response.json()
+            else:
+                error_text = await response.text()
+                raise Exception(f"AlQuran.cloud API returned status {response.status}: {error_text}")
+
+        table = {}
+        for edition in data.get("data", []):
+            identifier = edition.get("edition", {}).get("identifier")
+            field = "audio" if identifier == reciter_string else "text"
+            for ayah in edition.get("ayahs", []):
+                entry = table.setdefault(ayah["numberInSurah"], {"audio": "", "text": None})
+                entry[field] = ayah.get(field, "")
+        return dict(sorted(table.items()))
+
+    async def prefetch_audio(self, audio_url: str, num_bytes: int = 65536) -> bytes:
+        """
+        Fetches the first bytes of an audio file to warm the CDN edge and the pooled connection.
+        """
+        if audio_url.startswith("//"):
+            audio_url = "https:" + audio_url
+
+        async with self.get("audio_prefetch", audio_url, headers={"Range": f"bytes=0-{num_bytes - 1}"}) as response:
+            if response.status in (200, 206):
+                return await response.content.read(num_bytes)
+            else:
+                raise Exception(f"Audio CDN returned status {response.status}")
+
+
+_client = None
+
+def get_client() -> QuranAPIClient:
+    """
+    Returns the process-wide API client, creating a default one if the bot has not set it.
+    """
+    global _client
+    if _client is None:
+        _client = QuranAPIClient()
+    return _client
+
+def set_client(client: QuranAPIClient):
+    """
+    Installs the API client used by the module-level helpers.
+    """
+    global _client
+    _client = client
+
+async def get_full_surah_audio(surah_number: int, reciter_id: int) -> str:
+    """
+    Fetches the full surah audio URL from the Quran.com API.
+    """
+    return await get_client().get_full_surah_audio(surah_number, reciter_id)
+
+async def get_ayah_audio(surah_number: int, ayah_number: int, reciter_string: str) -> str:
+    """
+    Fetches the audio URL for a specific Ayah from the Aladhan (AlQuran.cloud) API.
+    """
+    return await get_client().get_ayah_audio(surah_number, ayah_number, reciter_string)
+
+async def get_translation_text(surah_number: int, ayah_number: int, lang_code: str) -> str:
+    """
+    Fetches the translation text for a specific Ayah from the AlQuran.cloud API.
+    """
+    return await get_client().get_translation_text(surah_number, ayah_number, lang_code)
+
+async def get_surah_ayahs(surah_number: int, reciter_string: str, lang_code: str = None,
+                          start: int = None, end: int = None) -> dict[int, dict]:
+    """
+    Resolves audio URLs and translation texts for a whole surah (or Ayah range) in one request.
+    """
+    return await get_client().get_surah_ayahs(surah_number, reciter_string, lang_code, start, end)
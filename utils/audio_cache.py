@@ -0,0 +1,233 @@
+"""
+Local on-disk cache for recitation audio.
+
+Files are content-addressed by a hash of (reciter, surah, ayah) and evicted
+least-recently-used first once the cache exceeds its byte budget.
+"""
+import asyncio
+import hashlib
+import os
+from collections import OrderedDict
+
+from utils.api_client import get_client
+from utils.metrics import CACHE_REQUESTS
+
+# Where cached audio lives and how much disk it may use (0 disables the cache)
+AUDIO_CACHE_DIR = os.getenv("AUDIO_CACHE_DIR", ".cache/audio")
+AUDIO_CACHE_MAX_BYTES = int(os.getenv("AUDIO_CACHE_MAX_BYTES", str(1024 ** 3)))
+
+
+class AudioCache:
+    """
+    LRU cache of audio files keyed by (reciter, surah, ayah).
+
+    `ayah` is None for full-surah recordings. Concurrent downloads of the same
+    key share a single in-flight task. The index of files already on disk is
+    built in a worker thread; until `load()` has finished, lookups check the
+    file itself.
+    """
+    def __init__(self, directory: str = AUDIO_CACHE_DIR, max_bytes: int = AUDIO_CACHE_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        self._entries = OrderedDict()
+        self._loaded = False
+        self._loading = None
+        self._inflight = {}
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0
+
+    @staticmethod
+    def key_for(reciter: str, surah_number: int, ayah_number: int = None) -> str:
+        """
+        Returns the content address for a recording.
+        """
+        raw = f"{reciter}:{surah_number}:{ayah_number or 0}"
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:32]
+
+    def path_for(self, reciter: str, surah_number: int, ayah_number: int = None) -> str:
+        key = self.key_for(reciter, surah_number, ayah_number)
+        return os.path.join(self.directory, key[:2], key + ".mp3")
+
+    def _scan(self) -> list[tuple[str, int]]:
+        """
+        Lists the files already on disk with their sizes, oldest access first.
+        """
+        if not os.path.isdir(self.directory):
+            return []
+
+        files = []
+        for root, _, names in os.walk(self.directory):
+            for name in names:
+                if not name.endswith(".mp3"):
+                    continue
+                path = os.path.join(root, name)
+                stat = os.stat(path)
+                files.append((stat.st_mtime, path, stat.st_size))
+
+        return [(path, size) for _, path, size in sorted(files)]
+
+    async def load(self):
+        """
+        Builds the LRU index from the files already on disk without blocking the event loop.
+        """
+        if self._loaded:
+            return
+        if self._loading is None:
+            self._loading = asyncio.create_task(self._load())
+        await asyncio.shield(self._loading)
+
+    async def _load(self):
+        try:
+            files = await asyncio.to_thread(self._scan)
+        finally:
+            self._loading = None
+
+        # Files used or downloaded while the directory was being scanned are the most recent
+        entries = OrderedDict(files)
+        for path, size in self._entries.items():
+            entries.pop(path, None)
+            entries[path] = size
+        self._entries = entries
+        self.total_bytes = sum(entries.values())
+        self._loaded = True
+        await self._evict()
+
+    @property
+    def entries(self) -> OrderedDict:
+        if not self._loaded and self._loading is None:
+            try:
+                loop = asyncio.get_running_loop()
+            except RuntimeError:
+                # No event loop: nothing else can be blocked, so scan in place
+                self._entries = OrderedDict(self._scan())
+                self.total_bytes = sum(self._entries.values())
+                self._loaded = True
+            else:
+                self._loading = loop.create_task(self._load())
+                self._loading.add_done_callback(lambda t: t.cancelled() or t.exception())
+        return self._entries
+
+    def get(self, reciter: str, surah_number: int, ayah_number: int = None) -> str:
+        """
+        Returns the local path of a cached recording, or None on a miss.
+        """
+        if not self.enabled:
+            return None
+
+        path = self.path_for(reciter, surah_number, ayah_number)
+        if path not in self.entries:
+            # Another process sharing the directory may have downloaded it since the index was built
+            try:
+                size = os.path.getsize(path)
+            except OSError:
+                CACHE_REQUESTS.inc("audio", "miss")
+                return None
+            self.entries[path] = size
+            self.total_bytes += size
+        elif not os.path.exists(path):
+            self.total_bytes -= self.entries.pop(path)
+            CACHE_REQUESTS.inc("audio", "miss")
+            return None
+
+        CACHE_REQUESTS.inc("audio", "hit")
+        self.entries.move_to_end(path)
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return path
+
+    async def fetch(self, reciter: str, surah_number: int, ayah_number: int, audio_url: str) -> str:
+        """
+        Returns the local path of a recording, downloading it first if needed.
+        """
+        path = self.get(reciter, surah_number, ayah_number)
+        if path or not self.enabled:
+            return path
+
+        path = self.path_for(reciter, surah_number, ayah_number)
+        task = self._inflight.get(path)
+        if task is None:
+            task = asyncio.create_task(self._download(path, audio_url))
+            self._inflight[path] = task
+            task.add_done_callback(lambda _: self._inflight.pop(path, None))
+        return await asyncio.shield(task)
+
+    def fetch_in_background(self, reciter: str, surah_number: int, ayah_number: int, audio_url: str):
+        """
+        Schedules a download so the next playback of this recording is served locally.
+        """
+        if not self.enabled or self.get(reciter, surah_number, ayah_number):
+            return
+        task = asyncio.create_task(self.fetch(reciter, surah_number, ayah_number, audio_url))
+        task.add_done_callback(lambda t: t.cancelled() or t.exception())
+
+    async def _download(self, path: str, audio_url: str) -> str:
+        if audio_url.startswith("//"):
+            audio_url = "https:" + audio_url
+
+        tmp_path = f"{path}.{os.getpid()}.part"
+        size = 0
+        # Disk writes run in a worker thread so a slow disk never stalls playback
+        await asyncio.to_thread(os.makedirs, os.path.dirname(path), exist_ok=True)
+        f = await asyncio.to_thread(open, tmp_path, "wb")
+        try:
+            try:
+                async with get_client().get("audio_download", audio_url) as response:
+                    if response.status != 200:
+                        raise Exception(f"Audio CDN returned status {response.status}")
+                    async for chunk in response.content.iter_chunked(65536):
+                        await asyncio.to_thread(f.write, chunk)
+                        size += len(chunk)
+            finally:
+                await asyncio.to_thread(f.close)
+            # Atomic publish: readers only ever see complete files
+            await asyncio.to_thread(os.replace, tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+        self.total_bytes -= self.entries.pop(path, 0)
+        self.entries[path] = size
+        self.total_bytes += size
+        await self._evict()
+        return path
+
+    async def _evict(self):
+        """
+        Removes least-recently-used files until the cache fits its budget.
+
+        Nothing is evicted before the index is loaded, since the budget cannot be
+        checked against a partial index.
+        """
+        victims = []
+        while self._loaded and self.total_bytes > self.max_bytes and len(self.entries) > 1:
+            path, size = self.entries.popitem(last=False)
+            self.total_bytes -= size
+            victims.append(path)
+        if victims:
+            await asyncio.to_thread(self._remove, victims)
+
+    @staticmethod
+    def _remove(paths: list[str]):
+        for path in paths:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+_cache = None
+
+def get_cache() -> AudioCache:
+    """
+    Returns the process-wide audio cache.
+    """
+    global _cache
+    if _cache is None:
+        _cache = AudioCache()
+    return _cache
@@ -0,0 +1,259 @@
+"""
+Custom audio sources for voice playback.
+"""
+import asyncio
+import os
+import tempfile
+import threading
+import time
+
+import discord
+
+from utils.metrics import FIRST_FRAME_LATENCY, TRACK_GAPS
+
+# "opus" has FFmpeg encode straight to Opus so Python only forwards packets; "pcm" is the fallback
+AUDIO_OUTPUT = os.getenv("AUDIO_OUTPUT", "opus").lower()
+OPUS_OUTPUT = AUDIO_OUTPUT == "opus"
+
+STREAM_BEFORE_OPTIONS = "-reconnect 1 -reconnect_streamed 1 -reconnect_delay_max 5"
+
+# One 20ms frame of 48kHz stereo 16-bit silence, and the Opus equivalent
+SILENCE_FRAME = b"\x00" * discord.opus.Encoder.FRAME_SIZE
+OPUS_SILENCE_FRAME = b"\xf8\xff\xfe"
+
+
+def make_audio_source(location: str, bitrate: int = None, copy: bool = False, opus: bool = OPUS_OUTPUT,
+                      start: float = None, duration: float = None) -> discord.AudioSource:
+    """
+    Builds an FFmpeg source for a remote URL or a locally cached file.
+
+    In Opus mode FFmpeg encodes at `bitrate` kbps (the voice channel's bitrate),
+    so the bot process never touches PCM. `copy` marks a pre-transcoded Ogg Opus
+    file whose packets are passed through without decoding. `opus` overrides
+    `AUDIO_OUTPUT` for callers that always need Opus frames.
+
+    `start` seeks that many seconds into the input before decoding (over HTTP
+    FFmpeg fetches from the matching byte range) and `duration` stops after that
+    many seconds.
+    """
+    before_options = STREAM_BEFORE_OPTIONS if location.startswith(("http://", "https://")) else ""
+    options = "-vn"
+    if start:
+        before_options = f"{before_options} -ss {start:.3f}".strip()
+    if duration:
+        options += f" -t {duration:.3f}"
+    before_options = before_options or None
+    if opus and copy:
+        return discord.FFmpegOpusAudio(location, codec="copy", before_options=before_options, options=options)
+    if opus:
+        return discord.FFmpegOpusAudio(location, bitrate=bitrate or 128, before_options=before_options, options=options)
+    return discord.FFmpegPCMAudio(location, before_options=before_options, options=options)
+
+
+class PlaylistSource(discord.AudioSource):
+    """
+    FFmpeg source reading a generated concat playlist, which is deleted on cleanup.
+    """
+    def __init__(self, source: discord.AudioSource, playlist: str):
+        self.source = source
+        self.playlist = playlist
+        # Frames come straight from FFmpeg; the wrapper only owns the playlist file
+        self.read = source.read
+
+    def is_opus(self) -> bool:
+        return self.source.is_opus()
+
+    def cleanup(self):
+        self.source.cleanup()
+        try:
+            os.remove(self.playlist)
+        except OSError:
+            pass
+
+
+def make_concat_source(locations: list[str], bitrate: int = None, opus: bool = OPUS_OUTPUT) -> discord.AudioSource:
+    """
+    Builds one FFmpeg source that plays `locations` (URLs or local files) back to back.
+
+    FFmpeg's concat demuxer opens each recording in turn inside the same process,
+    so a long range costs one decoder start-up instead of one per recording.
+    All recordings must share a codec and sample rate.
+    """
+    fd, playlist = tempfile.mkstemp(prefix="quran-", suffix=".ffconcat")
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        f.write("ffconcat version 1.0\n")
+        for location in locations:
+            escaped = location.replace("'", "'\\''")
+            f.write(f"file '{escaped}'\n")
+
+    before_options = "-f concat -safe 0 -protocol_whitelist file,http,https,tcp,tls,crypto"
+    try:
+        if opus:
+            source = discord.FFmpegOpusAudio(playlist, bitrate=bitrate or 128, before_options=before_options, options="-vn")
+        else:
+            source = discord.FFmpegPCMAudio(playlist, before_options=before_options, options="-vn")
+    except BaseException:
+        os.remove(playlist)
+        raise
+    return PlaylistSource(source, playlist)
+
+
+class TimedSource(discord.AudioSource):
+    """
+    Forwards to another source and reports how long its first frame took.
+
+    After the first frame the wrapper steps out of the way: `read` is rebound
+    to the inner source's method, so steady-state frames cost nothing extra.
+    A `GaplessAudioSource` records the latency of each of its tracks itself, so
+    it is not recorded again for the wrapper.
+    """
+    def __init__(self, source: discord.AudioSource, on_first_frame=None):
+        self.source = source
+        self.on_first_frame = on_first_frame
+        self.observe_latency = not isinstance(source, GaplessAudioSource)
+        self.created = time.perf_counter()
+
+    def read(self) -> bytes:
+        data = self.source.read()
+        if data:
+            now = time.perf_counter()
+            if self.observe_latency:
+                FIRST_FRAME_LATENCY.observe(now - self.created)
+            if self.on_first_frame:
+                self.on_first_frame(now)
+            self.read = self.source.read
+        return data
+
+    def is_opus(self) -> bool:
+        return self.source.is_opus()
+
+    def cleanup(self):
+        self.source.cleanup()
+
+
+class GaplessAudioSource(discord.AudioSource):
+    """
+    Plays a sequence of tracks back to back as one continuous source.
+
+    While the current track plays, the next one is already spawned: its FFmpeg
+    process connects, probes and fills its output pipe ahead of time, so the
+    hand-off happens on the very next 20ms frame. If the producer falls behind,
+    silence frames keep the voice connection alive until the next track arrives.
+
+    `on_track_start(item)` is called on the event loop whenever a track begins.
+    All queued tracks must match `opus` (see `make_audio_source`).
+
+    Each track's first-frame latency is recorded from when it became current:
+    its spawn if nothing was waiting, otherwise its promotion, so a pre-spawned
+    track only counts the time playback actually waited on it.
+    """
+    def __init__(self, loop: asyncio.AbstractEventLoop, on_track_start=None, opus: bool = OPUS_OUTPUT):
+        self.loop = loop
+        self.on_track_start = on_track_start
+        self.opus = opus
+        self._lock = threading.Lock()
+        self._current = None
+        self._next = None
+        self._input_closed = False
+        self._gap_started = None
+        self._track_started = None
+        self._slot_free = asyncio.Event()
+        self._slot_free.set()
+        self._idle = asyncio.Event()
+        self._idle.set()
+
+    def is_opus(self) -> bool:
+        return self.opus
+
+    @property
+    def playing(self) -> bool:
+        with self._lock:
+            return self._current is not None
+
+    async def wait_for_slot(self):
+        """
+        Waits until the next track can be queued.
+        """
+        await self._slot_free.wait()
+
+    async def wait_until_idle(self):
+        """
+        Waits until every queued track has finished playing.
+        """
+        await self._idle.wait()
+
+    async def put(self, item, source: discord.AudioSource):
+        """
+        Queues the next track, waiting until the pre-spawned slot is free.
+        """
+        spawned = time.perf_counter()
+        await self._slot_free.wait()
+        with self._lock:
+            if self._input_closed:
+                source.cleanup()
+                return
+            if self._current is None:
+                self._current = (item, source)
+                self._track_started = spawned
+                self._idle.clear()
+                started = True
+            else:
+                self._next = (item, source)
+                self._slot_free.clear()
+                started = False
+        if started:
+            self._notify(item)
+
+    def close_input(self):
+        """
+        Marks the queue as complete; the source ends once the last track finishes.
+        """
+        with self._lock:
+            self._input_closed = True
+
+    def _notify(self, item):
+        if self.on_track_start:
+            self.loop.call_soon_threadsafe(self.on_track_start, item)
+
+    def read(self) -> bytes:
+        with self._lock:
+            current = self._current
+
+        while current is not None:
+            data = current[1].read()
+            if data:
+                if self._track_started is not None:
+                    FIRST_FRAME_LATENCY.observe(time.perf_counter() - self._track_started)
+                    self._track_started = None
+                if self._gap_started is not None:
+                    TRACK_GAPS.observe(time.perf_counter() - self._gap_started, "ayah")
+                    self._gap_started = None
+                return data
+
+            # Current track ended: promote the pre-spawned one on the same frame
+            self._gap_started = time.perf_counter()
+            current[1].cleanup()
+            with self._lock:
+                current = self._current = self._next
+                self._next = None
+                self._track_started = time.perf_counter() if current is not None else None
+            self.loop.call_soon_threadsafe(self._slot_free.set)
+            if current is not None:
+                self._notify(current[0])
+            else:
+                self.loop.call_soon_threadsafe(self._idle.set)
+
+        with self._lock:
+            if self._input_closed:
+                return b""
+        return OPUS_SILENCE_FRAME if self.opus else SILENCE_FRAME
+
+    def cleanup(self):
+        with self._lock:
+            tracks = [t for t in (self._current, self._next) if t is not None]
+            self._current = self._next = None
+            self._input_closed = True
+        self.loop.call_soon_threadsafe(self._slot_free.set)
+        self.loop.call_soon_threadsafe(self._idle.set)
+        for _, source in tracks:
+            source.cleanup()
@@ -0,0 +1,158 @@
+"""
+Per-(reciter, surah) index of where each Ayah starts within the full-surah recording.
+
+Quran.com publishes the timing of every Ayah for its chapter recordings. The
+timings are fetched once per reciter and surah, stored in SQLite and kept in
+memory, so a full-surah stream can be started at any Ayah by seeking into the
+file instead of falling back to Ayah-by-Ayah playback.
+"""
+import asyncio
+import bisect
+import os
+import sqlite3
+from typing import NamedTuple
+
+from utils.api_client import get_client
+from utils.metrics import CACHE_REQUESTS
+
+AYAH_TIMESTAMP_DB = os.getenv("AYAH_TIMESTAMP_DB", "data/ayah_timestamps.sqlite3")
+
+
+class SurahTimestamps(NamedTuple):
+    """
+    Ayah timings (milliseconds) of one recording; index 0 is Ayah 1.
+    """
+    audio_url: str
+    file_size: int
+    starts: tuple
+    ends: tuple
+
+    @property
+    def ayah_count(self) -> int:
+        return len(self.starts)
+
+    def offset(self, ayah_number: int) -> float:
+        """
+        Returns the second at which an Ayah starts.
+        """
+        return self.starts[ayah_number - 1] / 1000
+
+    def duration(self, start: int, end: int) -> float:
+        """
+        Returns the seconds from the start of Ayah `start` to the end of Ayah `end`.
+        """
+        return (self.ends[end - 1] - self.starts[start - 1]) / 1000
+
+    def ayah_at(self, seconds: float) -> int:
+        """
+        Returns the Ayah playing `seconds` into the recording.
+        """
+        index = bisect.bisect_right(self.starts, seconds * 1000)
+        return min(max(index, 1), self.ayah_count)
+
+
+class AyahTimestampIndex:
+    """
+    Memory and SQLite cache of `QuranAPIClient.get_chapter_timestamps` results.
+    """
+    def __init__(self, path: str = AYAH_TIMESTAMP_DB):
+        self.path = path
+        self._conn = None
+        self._entries = {}
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        if self._conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS recordings ("
+                "reciter_id INTEGER NOT NULL, surah INTEGER NOT NULL, audio_url TEXT NOT NULL, file_size INTEGER, "
+                "PRIMARY KEY (reciter_id, surah)) WITHOUT ROWID"
+            )
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS timestamps ("
+                "reciter_id INTEGER NOT NULL, surah INTEGER NOT NULL, ayah INTEGER NOT NULL, "
+                "start_ms INTEGER NOT NULL, end_ms INTEGER NOT NULL, "
+                "PRIMARY KEY (reciter_id, surah, ayah)) WITHOUT ROWID"
+            )
+        return self._conn
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+        self._conn = None
+
+    def cached(self, reciter_id: int, surah_number: int) -> SurahTimestamps:
+        """
+        Returns the timings if they are already in memory, without any I/O.
+        """
+        return self._entries.get((reciter_id, surah_number))
+
+    def _load(self, reciter_id: int, surah_number: int) -> SurahTimestamps:
+        recording = self.conn.execute(
+            "SELECT audio_url, file_size FROM recordings WHERE reciter_id = ? AND surah = ?", (reciter_id, surah_number)
+        ).fetchone()
+        if recording is None:
+            return None
+        rows = self.conn.execute(
+            "SELECT start_ms, end_ms FROM timestamps WHERE reciter_id = ? AND surah = ? ORDER BY ayah",
+            (reciter_id, surah_number),
+        ).fetchall()
+        return SurahTimestamps(*recording, tuple(row[0] for row in rows), tuple(row[1] for row in rows))
+
+    def _store(self, reciter_id: int, surah_number: int, timestamps: SurahTimestamps):
+        with self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO recordings VALUES (?, ?, ?, ?)",
+                (reciter_id, surah_number, timestamps.audio_url, timestamps.file_size),
+            )
+            self.conn.execute("DELETE FROM timestamps WHERE reciter_id = ? AND surah = ?", (reciter_id, surah_number))
+            self.conn.executemany(
+                "INSERT INTO timestamps VALUES (?, ?, ?, ?, ?)",
+                [(reciter_id, surah_number, n, start, end)
+                 for n, (start, end) in enumerate(zip(timestamps.starts, timestamps.ends), start=1)],
+            )
+
+    async def get(self, reciter_id: int, surah_number: int) -> SurahTimestamps:
+        """
+        Returns a surah's Ayah timings for a reciter, or None if Quran.com has none for that recording.
+        """
+        key = (reciter_id, surah_number)
+        timestamps = self._entries.get(key)
+        if timestamps is not None:
+            CACHE_REQUESTS.inc("ayah_timestamps", "hit")
+            return timestamps
+
+        timestamps = await asyncio.to_thread(self._load, reciter_id, surah_number)
+        if timestamps is not None:
+            CACHE_REQUESTS.inc("ayah_timestamps", "stored")
+        else:
+            CACHE_REQUESTS.inc("ayah_timestamps", "miss")
+            data = await get_client().get_chapter_timestamps(surah_number, reciter_id)
+            # Ayahs must be contiguous from 1, otherwise offsets cannot be looked up by number
+            numbers = list(data["timestamps"])
+            if not data["audio_url"] or not numbers or numbers != list(range(1, len(numbers) + 1)):
+                return None
+            timestamps = SurahTimestamps(
+                data["audio_url"], data["file_size"],
+                tuple(start for start, _ in data["timestamps"].values()),
+                tuple(end for _, end in data["timestamps"].values()),
+            )
+            await asyncio.to_thread(self._store, reciter_id, surah_number, timestamps)
+        self._entries[key] = timestamps
+        return timestamps
+
+
+_index = None
+
+def get_timestamp_index() -> AyahTimestampIndex:
+    """
+    Returns the process-wide Ayah timestamp index.
+    """
+    global _index
+    if _index is None:
+        _index = AyahTimestampIndex()
+    return _index
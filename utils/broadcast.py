@@ -0,0 +1,199 @@
+"""
+Broadcast sessions: one decode and Opus encode fanned out to many voice clients.
+
+A single pump thread reads 20ms Opus frames from the upstream source in real
+time and appends each frame to every subscriber's small buffer. Each guild's
+voice player just pops frames from its buffer, so adding a listener costs no
+FFmpeg process and no encode. A subscriber that falls behind loses its oldest
+frames instead of holding up the pump or the other listeners.
+"""
+import asyncio
+import os
+import threading
+import time
+from collections import deque
+
+import discord
+
+from utils.audio_sources import OPUS_SILENCE_FRAME
+from utils.metrics import REGISTRY
+
+# Frames buffered per listener before the oldest are dropped (25 frames = 500ms)
+BROADCAST_BUFFER_FRAMES = int(os.getenv("BROADCAST_BUFFER_FRAMES", "25"))
+BROADCAST_BITRATE = int(os.getenv("BROADCAST_BITRATE", "64"))
+# Seconds a broadcast keeps running without listeners
+BROADCAST_IDLE_TIMEOUT = float(os.getenv("BROADCAST_IDLE_TIMEOUT", "30"))
+
+FRAME_SECONDS = discord.opus.Encoder.FRAME_LENGTH / 1000
+
+BROADCAST_LISTENERS = REGISTRY.gauge("quran_broadcast_listeners", "Voice clients subscribed to broadcasts")
+BROADCAST_DROPPED = REGISTRY.counter("quran_broadcast_frames_dropped_total", "Frames dropped for listeners that fell behind")
+
+
+class BroadcastSubscriber(discord.AudioSource):
+    """
+    One guild's view of a broadcast, played like any other Opus source.
+
+    It starts at the live position, yields silence if its buffer runs dry, and
+    ends once the broadcast has ended and the buffer is drained.
+    """
+    def __init__(self, session: "BroadcastSession", guild_id: int, buffer_frames: int):
+        self.session = session
+        self.guild_id = guild_id
+        self.frames = deque(maxlen=buffer_frames)
+        self.ended = False
+
+    def push(self, frame: bytes):
+        if len(self.frames) == self.frames.maxlen:
+            BROADCAST_DROPPED.inc()
+        self.frames.append(frame)
+
+    def read(self) -> bytes:
+        try:
+            return self.frames.popleft()
+        except IndexError:
+            return b"" if self.ended else OPUS_SILENCE_FRAME
+
+    def is_opus(self) -> bool:
+        return True
+
+    def cleanup(self):
+        self.session.unsubscribe(self)
+
+
+class BroadcastSession:
+    """
+    Pumps an upstream Opus source in real time to every subscriber.
+
+    `finished` resolves on the event loop once the upstream ends or `stop()` is called.
+    """
+    def __init__(self, name: str, source: discord.AudioSource, loop: asyncio.AbstractEventLoop,
+                 owner_id: int = None, buffer_frames: int = BROADCAST_BUFFER_FRAMES):
+        if not source.is_opus():
+            raise ValueError("Broadcast sources must produce Opus frames")
+        self.name = name
+        self.owner_id = owner_id
+        self.source = source
+        self.loop = loop
+        self.buffer_frames = buffer_frames
+        self.now_playing = None
+        self.finished = loop.create_future()
+        self._subscribers = {}
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=f"broadcast-{name}", daemon=True)
+
+    @property
+    def listeners(self) -> int:
+        return len(self._subscribers)
+
+    def start(self):
+        self._thread.start()
+
+    def subscribe(self, guild_id: int) -> BroadcastSubscriber:
+        """
+        Returns a new source for a guild, replacing that guild's previous subscription.
+        """
+        subscriber = BroadcastSubscriber(self, guild_id, self.buffer_frames)
+        with self._lock:
+            previous = self._subscribers.get(guild_id)
+            self._subscribers[guild_id] = subscriber
+            if self._stopped.is_set():
+                subscriber.ended = True
+        if previous is not None:
+            previous.ended = True
+        return subscriber
+
+    def unsubscribe(self, subscriber: BroadcastSubscriber):
+        with self._lock:
+            if self._subscribers.get(subscriber.guild_id) is subscriber:
+                del self._subscribers[subscriber.guild_id]
+
+    def stop(self):
+        """
+        Ends the broadcast for every listener.
+        """
+        self._stopped.set()
+
+    def _run(self):
+        next_frame = time.perf_counter()
+        empty_since = None
+        try:
+            while not self._stopped.is_set():
+                frame = self.source.read()
+                if not frame:
+                    break
+                with self._lock:
+                    subscribers = list(self._subscribers.values())
+                for subscriber in subscribers:
+                    subscriber.push(frame)
+
+                # Nobody has listened for a while, so stop decoding for no one
+                if subscribers:
+                    empty_since = None
+                elif empty_since is None:
+                    empty_since = time.perf_counter()
+                elif time.perf_counter() - empty_since > BROADCAST_IDLE_TIMEOUT:
+                    break
+
+                # Pace by wall clock; after a long stall resynchronise instead of bursting
+                next_frame += FRAME_SECONDS
+                delay = next_frame - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                elif delay < -10 * FRAME_SECONDS:
+                    next_frame = time.perf_counter()
+        finally:
+            self._stopped.set()
+            with self._lock:
+                subscribers = list(self._subscribers.values())
+            for subscriber in subscribers:
+                subscriber.ended = True
+            self.source.cleanup()
+            self.loop.call_soon_threadsafe(self._finish)
+
+    def _finish(self):
+        if not self.finished.done():
+            self.finished.set_result(None)
+
+
+class BroadcastHub:
+    """
+    Named broadcasts running in this process.
+    """
+    def __init__(self):
+        self.sessions = {}
+
+    def start(self, name: str, source: discord.AudioSource, owner_id: int = None) -> BroadcastSession:
+        """
+        Starts a broadcast of `source` under `name`; it is forgotten once it finishes.
+        """
+        if name in self.sessions:
+            raise ValueError(f"A broadcast named {name!r} is already running")
+        session = BroadcastSession(name, source, asyncio.get_running_loop(), owner_id)
+        self.sessions[name] = session
+        session.finished.add_done_callback(lambda _: self.sessions.get(name) is session and self.sessions.pop(name))
+        session.start()
+        return session
+
+    def get(self, name: str) -> BroadcastSession:
+        return self.sessions.get(name)
+
+    def close(self):
+        for session in list(self.sessions.values()):
+            session.stop()
+
+
+_hub = None
+
+def get_broadcast_hub() -> BroadcastHub:
+    """
+    Returns the process-wide broadcast hub.
+    """
+    global _hub
+    if _hub is None:
+        _hub = BroadcastHub()
+    return _hub
+
+
+BROADCAST_LISTENERS.callback = lambda: sum(session.listeners for session in get_broadcast_hub().sessions.values())
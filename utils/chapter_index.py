@@ -0,0 +1,94 @@
+"""
+Per-reciter index of full-chapter audio URLs.
+
+All 114 chapter URLs of a reciter are fetched in one request and kept for a
+TTL. Stale entries keep being served while a background refresh runs, so moving
+to the next surah never waits on the network.
+"""
+import asyncio
+import logging
+import os
+import time
+
+from utils.api_client import get_client, get_full_surah_audio
+from utils.metrics import CACHE_REQUESTS
+
+logger = logging.getLogger(__name__)
+
+CHAPTER_INDEX_TTL = int(os.getenv("CHAPTER_INDEX_TTL", str(6 * 3600)))
+
+
+class ChapterIndex:
+    """
+    TTL cache of `QuranAPIClient.get_chapter_audio_files` results, keyed by reciter id.
+    """
+    def __init__(self, ttl: float = CHAPTER_INDEX_TTL):
+        self.ttl = ttl
+        self._entries = {}
+        self._inflight = {}
+
+    def _refresh(self, reciter_id: int) -> asyncio.Task:
+        task = self._inflight.get(reciter_id)
+        if task is None:
+            task = asyncio.create_task(self._fetch(reciter_id))
+            self._inflight[reciter_id] = task
+            task.add_done_callback(lambda t: self._done(reciter_id, t))
+        return task
+
+    def _done(self, reciter_id: int, task: asyncio.Task):
+        self._inflight.pop(reciter_id, None)
+        # Retrieve the exception so failed background refreshes are not reported as unhandled
+        if not task.cancelled():
+            task.exception()
+
+    async def _fetch(self, reciter_id: int) -> dict[int, dict]:
+        files = await get_client().get_chapter_audio_files(reciter_id)
+        self._entries[reciter_id] = (time.monotonic(), files)
+        return files
+
+    async def get(self, reciter_id: int) -> dict[int, dict]:
+        """
+        Returns the chapter table for a reciter, fetching it on first use.
+        """
+        entry = self._entries.get(reciter_id)
+        if entry is None:
+            CACHE_REQUESTS.inc("chapter_index", "miss")
+            return await asyncio.shield(self._refresh(reciter_id))
+
+        fetched_at, files = entry
+        if time.monotonic() - fetched_at > self.ttl:
+            CACHE_REQUESTS.inc("chapter_index", "stale")
+            self._refresh(reciter_id)
+        else:
+            CACHE_REQUESTS.inc("chapter_index", "hit")
+        return files
+
+    async def audio_url(self, reciter_id: int, surah_number: int) -> str:
+        """
+        Returns a chapter's audio URL, falling back to a single lookup if the index lacks it.
+        """
+        try:
+            chapter = (await self.get(reciter_id)).get(surah_number)
+        except Exception as e:
+            logger.debug("Failed to load chapter index for reciter %s: %s", reciter_id, e)
+            chapter = None
+
+        if chapter and chapter["audio_url"]:
+            return chapter["audio_url"]
+
+        audio_url = await get_full_surah_audio(surah_number, reciter_id)
+        if audio_url.startswith("//"):
+            audio_url = "https:" + audio_url
+        return audio_url
+
+
+_index = None
+
+def get_chapter_index() -> ChapterIndex:
+    """
+    Returns the process-wide chapter index.
+    """
+    global _index
+    if _index is None:
+        _index = ChapterIndex()
+    return _index
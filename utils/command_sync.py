@@ -0,0 +1,59 @@
+"""
+Skips redundant application command syncs on restart.
+
+`CommandTree.sync` is a slow, globally rate-limited request. The serialized
+command tree is hashed and the hash of the last successful sync is kept on disk
+per application, so a restart with unchanged commands does not sync at all.
+"""
+import hashlib
+import json
+import os
+
+from discord import app_commands
+
+COMMAND_SYNC_STATE = os.getenv("COMMAND_SYNC_STATE", ".cache/command_tree.json")
+# Set to 1 to sync on every start regardless of the stored hash
+FORCE_COMMAND_SYNC = os.getenv("FORCE_COMMAND_SYNC", "0") == "1"
+
+
+def command_tree_hash(tree: app_commands.CommandTree) -> str:
+    """
+    Returns a stable hash of the global commands exactly as they would be sent to Discord.
+    """
+    payload = sorted((command.to_dict(tree) for command in tree.get_commands()), key=lambda c: (c["type"], c["name"]))
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, separators=(",", ":")).encode()).hexdigest()
+
+
+def _load_state(path: str) -> dict:
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_state(path: str, state: dict):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.part"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(state, f)
+    os.replace(tmp_path, path)
+
+
+async def sync_if_changed(tree: app_commands.CommandTree, application_id: int,
+                          path: str = COMMAND_SYNC_STATE, force: bool = FORCE_COMMAND_SYNC) -> bool:
+    """
+    Syncs the global command tree only if it differs from the last synced one.
+
+    Returns True if a sync was sent. The stored hash is only updated after a
+    successful sync, so a failed one is retried on the next start.
+    """
+    digest = command_tree_hash(tree)
+    state = _load_state(path)
+    if not force and state.get(str(application_id)) == digest:
+        return False
+
+    await tree.sync()
+    state[str(application_id)] = digest
+    _save_state(path, state)
+    return True
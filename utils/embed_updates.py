@@ -0,0 +1,91 @@
+"""
+Coalesced, rate-aware message edits.
+
+Playback code submits the latest state of a message and moves on. A per-message
+worker sends only the newest pending edit, spaced by a minimum interval, so
+message edits never stall the playback coroutine. Rate limits (429s) are waited
+out and retried by discord.py's HTTP client inside `edit()` itself.
+"""
+import asyncio
+import logging
+import os
+import time
+
+from utils.metrics import EMBED_EDIT_LATENCY
+
+logger = logging.getLogger(__name__)
+
+# Minimum seconds between two edits of the same message
+EMBED_MIN_INTERVAL = float(os.getenv("EMBED_MIN_INTERVAL", "1.5"))
+
+
+class _Bucket:
+    __slots__ = ("pending", "next_allowed", "task")
+
+    def __init__(self):
+        self.pending = None
+        self.next_allowed = 0.0
+        self.task = None
+
+
+class EmbedUpdateScheduler:
+    """
+    Sends the latest submitted edit per key (usually a message id).
+    """
+    def __init__(self, min_interval: float = EMBED_MIN_INTERVAL):
+        self.min_interval = min_interval
+        self._buckets = {}
+
+    def submit(self, key, edit):
+        """
+        Replaces the pending edit for `key`. `edit` is a zero-argument coroutine function.
+        """
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = _Bucket()
+        bucket.pending = edit
+        if bucket.task is None or bucket.task.done():
+            bucket.task = asyncio.create_task(self._run(key, bucket))
+
+    async def _run(self, key, bucket: _Bucket):
+        while True:
+            # Also waits out the interval after the last edit, so a new submit cannot jump the bucket
+            delay = bucket.next_allowed - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            if bucket.pending is None:
+                break
+
+            edit, bucket.pending = bucket.pending, None
+            start = time.perf_counter()
+            try:
+                await edit()
+                EMBED_EDIT_LATENCY.observe(time.perf_counter() - start)
+            except Exception as e:
+                logger.debug("Failed to edit message %s: %s", key, e)
+            bucket.next_allowed = time.monotonic() + self.min_interval
+
+        if self._buckets.get(key) is bucket:
+            del self._buckets[key]
+
+    async def close(self):
+        """
+        Cancels every pending edit.
+        """
+        tasks = [bucket.task for bucket in self._buckets.values() if bucket.task]
+        self._buckets.clear()
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+_scheduler = None
+
+def get_embed_scheduler() -> EmbedUpdateScheduler:
+    """
+    Returns the process-wide embed update scheduler.
+    """
+    global _scheduler
+    if _scheduler is None:
+        _scheduler = EmbedUpdateScheduler()
+    return _scheduler
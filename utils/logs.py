@@ -0,0 +1,192 @@
+"""
+Structured, non-blocking logging.
+
+Loggers only build a record and put it on a queue; a `QueueListener` thread
+formats and writes it, so the event loop never waits on stdout. Records carry
+the guild and dashboard session they were emitted for (bound once per playback
+task through a context variable), and can be rendered as text or JSON lines.
+
+Debug records are rate-limited per call site unless their guild is being
+traced. Tracing is switched per guild at runtime (`/trace`); while no guild is
+traced the application loggers stay at `LOG_LEVEL`, so debug calls on the
+playback path cost a single level check.
+"""
+import contextvars
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import time
+
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+# "text" for humans, "json" for one JSON object per line
+LOG_FORMAT = os.getenv("LOG_FORMAT", "text").lower()
+# Debug records per second allowed from each call site of an untraced guild
+LOG_DEBUG_RATE = float(os.getenv("LOG_DEBUG_RATE", "1"))
+# Guild ids traced from startup, comma separated
+LOG_TRACE_GUILDS = {int(guild_id) for guild_id in os.getenv("LOG_TRACE_GUILDS", "").split(",") if guild_id}
+
+# Loggers of this project whose level follows the tracing state
+APP_LOGGERS = ("cogs", "utils")
+
+CONTEXT_FIELDS = ("guild_id", "session_id")
+
+_context = contextvars.ContextVar("log_context", default={})
+
+
+def bind(**fields):
+    """
+    Attaches context fields (e.g. `guild_id`, `session_id`) to every record logged
+    from the current task and the tasks it creates afterwards.
+    """
+    _context.set({**_context.get(), **fields})
+
+
+class ContextFilter(logging.Filter):
+    """
+    Copies the bound context onto each record, on the thread that logged it.
+    """
+    def filter(self, record: logging.LogRecord) -> bool:
+        for field in CONTEXT_FIELDS:
+            if not hasattr(record, field):
+                setattr(record, field, None)
+        for field, value in _context.get().items():
+            setattr(record, field, value)
+        return True
+
+
+class DebugSampler(logging.Filter):
+    """
+    Passes every debug record of a traced guild and at most `rate` per second per call site otherwise.
+    """
+    def __init__(self, rate: float = LOG_DEBUG_RATE, traced: set = None):
+        super().__init__()
+        self.rate = rate
+        self.traced = set(traced or ())
+        self._last = {}
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.INFO or getattr(record, "guild_id", None) in self.traced:
+            return True
+        if self.rate <= 0:
+            return False
+        site = (record.pathname, record.lineno)
+        now = time.monotonic()
+        if now - self._last.get(site, 0.0) < 1 / self.rate:
+            return False
+        self._last[site] = now
+        return True
+
+
+class JSONFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for field in CONTEXT_FIELDS:
+            if getattr(record, field, None) is not None:
+                entry[field] = getattr(record, field)
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class TextFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        context = " ".join(f"{field}={getattr(record, field)}" for field in CONTEXT_FIELDS if getattr(record, field, None) is not None)
+        record.context = f"[{context}] " if context else ""
+        return super().format(record)
+
+
+class DeferredQueueHandler(logging.handlers.QueueHandler):
+    """
+    Enqueues records unformatted; the listener thread does all formatting.
+    """
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+class LogRouter:
+    """
+    Owns the queue, the listener thread and the per-guild tracing state.
+    """
+    def __init__(self, prefix: str = "", level: str = LOG_LEVEL, fmt: str = LOG_FORMAT, stream=None):
+        self.level = logging.getLevelName(level) if isinstance(level, str) else level
+        self.sampler = DebugSampler(traced=LOG_TRACE_GUILDS)
+        self.queue = queue.SimpleQueue()
+
+        handler = logging.StreamHandler(stream)
+        if fmt == "json":
+            handler.setFormatter(JSONFormatter())
+        else:
+            handler.setFormatter(TextFormatter(f"%(asctime)s - {prefix}%(levelname)s - %(name)s - %(context)s%(message)s"))
+        self.listener = logging.handlers.QueueListener(self.queue, handler, respect_handler_level=True)
+
+        self.queue_handler = DeferredQueueHandler(self.queue)
+        self.queue_handler.addFilter(ContextFilter())
+        self.queue_handler.addFilter(self.sampler)
+
+    def start(self):
+        root = logging.getLogger()
+        for handler in list(root.handlers):
+            root.removeHandler(handler)
+        root.addHandler(self.queue_handler)
+        root.setLevel(self.level)
+        self._apply_levels()
+        self.listener.start()
+
+    def stop(self):
+        """
+        Flushes queued records and stops the listener thread.
+        """
+        self.listener.stop()
+        logging.getLogger().removeHandler(self.queue_handler)
+
+    def _apply_levels(self):
+        level = logging.DEBUG if self.sampler.traced else self.level
+        for name in APP_LOGGERS:
+            logging.getLogger(name).setLevel(level)
+
+    def traced(self) -> set:
+        return set(self.sampler.traced)
+
+    def set_trace(self, guild_id: int, enabled: bool):
+        """
+        Turns full debug output for one guild on or off.
+        """
+        if enabled:
+            self.sampler.traced.add(guild_id)
+        else:
+            self.sampler.traced.discard(guild_id)
+        self._apply_levels()
+
+
+_router = None
+
+def setup_logging(prefix: str = "") -> LogRouter:
+    """
+    Routes all logging through the queue listener; safe to call more than once.
+    """
+    global _router
+    if _router is None:
+        _router = LogRouter(prefix)
+        _router.start()
+    return _router
+
+
+def get_log_router() -> LogRouter:
+    """
+    Returns the process-wide log router, setting it up with defaults if needed.
+    """
+    return setup_logging()
+
+
+def stop_logging():
+    global _router
+    if _router is not None:
+        _router.stop()
+    _router = None
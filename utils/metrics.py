@@ -0,0 +1,149 @@
+"""
+Lightweight in-process metrics.
+
+Counters and fixed-bucket histograms cheap enough to leave on in production:
+recording is a dict lookup, a bisect and an addition under a lock (some
+observations come from voice player threads). Metrics can be rendered as a
+summary for `/stats` or in the Prometheus text format.
+"""
+import asyncio
+import threading
+import time
+from bisect import bisect_left
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Counter:
+    def __init__(self, name: str, help_text: str, labelnames: tuple = ()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = labelnames
+        self.values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels, amount: float = 1):
+        with self._lock:
+            self.values[labels] = self.values.get(labels, 0) + amount
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        for labels, value in sorted(self.values.items()):
+            lines.append(f"{self.name}{_format_labels(self.labelnames, labels)} {value}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name: str, help_text: str, labelnames: tuple = (), buckets: tuple = LATENCY_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.labelnames = labelnames
+        self.buckets = buckets
+        # labels -> [per-bucket counts (+Inf last), sum, count]
+        self.values = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labels):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self.values.get(labels)
+            if entry is None:
+                entry = self.values[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            entry[0][index] += 1
+            entry[1] += value
+            entry[2] += 1
+
+    def percentile(self, q: float, *labels) -> float:
+        """
+        Estimates a percentile as the upper bound of the bucket it falls in.
+        """
+        entry = self.values.get(labels)
+        if not entry or not entry[2]:
+            return 0.0
+        target = q * entry[2]
+        cumulative = 0
+        for bound, count in zip(self.buckets + (float("inf"),), entry[0]):
+            cumulative += count
+            if cumulative >= target:
+                return bound if bound != float("inf") else self.buckets[-1]
+        return self.buckets[-1]
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for labels, (counts, total, count) in sorted(self.values.items()):
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames + ('le',), labels + (le,))} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, labels)} {total}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, labels)} {count}")
+        return lines
+
+
+class Gauge:
+    """
+    A value read from a callback at collection time, so updating it costs nothing.
+    """
+    def __init__(self, name: str, help_text: str, callback=None):
+        self.name = name
+        self.help = help_text
+        self.callback = callback
+
+    def value(self) -> float:
+        try:
+            return self.callback() if self.callback else 0
+        except Exception:
+            return 0
+
+    def render(self) -> list[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} gauge", f"{self.name} {self.value()}"]
+
+
+def _format_labels(names: tuple, values: tuple) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(f'{name}="{value}"' for name, value in zip(names, values))
+    return "{" + pairs + "}"
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self.metrics = {}
+
+    def counter(self, name: str, help_text: str, labelnames: tuple = ()) -> Counter:
+        return self.metrics.setdefault(name, Counter(name, help_text, labelnames))
+
+    def histogram(self, name: str, help_text: str, labelnames: tuple = (), buckets: tuple = LATENCY_BUCKETS) -> Histogram:
+        return self.metrics.setdefault(name, Histogram(name, help_text, labelnames, buckets))
+
+    def gauge(self, name: str, help_text: str, callback=None) -> Gauge:
+        return self.metrics.setdefault(name, Gauge(name, help_text, callback))
+
+    def render_prometheus(self) -> str:
+        lines = []
+        for metric in self.metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+API_REQUESTS = REGISTRY.counter("quran_api_requests_total", "Upstream API requests", ("endpoint", "status"))
+API_LATENCY = REGISTRY.histogram("quran_api_request_seconds", "Upstream API request latency", ("endpoint",))
+CACHE_REQUESTS = REGISTRY.counter("quran_cache_requests_total", "Cache lookups", ("cache", "result"))
+FIRST_FRAME_LATENCY = REGISTRY.histogram("quran_ffmpeg_first_frame_seconds", "FFmpeg spawn to first audio frame")
+TRACK_GAPS = REGISTRY.histogram("quran_track_gap_seconds", "Silence between consecutive tracks", ("kind",))
+EMBED_EDIT_LATENCY = REGISTRY.histogram("quran_embed_edit_seconds", "Dashboard message edit latency")
+LOOP_LAG = REGISTRY.histogram("quran_event_loop_lag_seconds", "Event loop scheduling lag")
+VOICE_SESSIONS = REGISTRY.gauge("quran_voice_sessions", "Connected voice sessions")
+
+
+async def monitor_event_loop(interval: float = 0.5):
+    """
+    Measures how late the event loop wakes a sleeping task, forever.
+    """
+    while True:
+        expected = time.perf_counter() + interval
+        await asyncio.sleep(interval)
+        LOOP_LAG.observe(max(0.0, time.perf_counter() - expected))
@@ -0,0 +1,240 @@
+"""
+Pre-transcoded Ogg Opus assets for frequently played recitations.
+
+Once a recording has been played often enough, a background worker converts it
+to Ogg Opus at Discord's native 48kHz/20ms framing. Later plays stream that
+file with codec copy, so neither FFmpeg nor the bot decodes or encodes anything.
+"""
+import asyncio
+import json
+import logging
+import os
+import threading
+import time
+
+from utils.audio_cache import AudioCache
+from utils.audio_sources import STREAM_BEFORE_OPTIONS
+from utils.metrics import CACHE_REQUESTS
+
+logger = logging.getLogger(__name__)
+
+OPUS_STORE_DIR = os.getenv("OPUS_STORE_DIR", ".cache/opus")
+OPUS_ASSET_BITRATE = int(os.getenv("OPUS_ASSET_BITRATE", "96"))
+# Number of concurrent FFmpeg transcodes (0 disables the transcoding stage)
+OPUS_TRANSCODE_WORKERS = int(os.getenv("OPUS_TRANSCODE_WORKERS", "0"))
+# Plays after which a recording is considered hot and gets transcoded
+OPUS_HOT_THRESHOLD = int(os.getenv("OPUS_HOT_THRESHOLD", "3"))
+# Seconds between checks for assets published by other processes sharing the directory
+OPUS_MANIFEST_REFRESH = float(os.getenv("OPUS_MANIFEST_REFRESH", "30"))
+
+
+class OpusAssetStore:
+    """
+    Manifest-tracked store of Ogg Opus files keyed by (reciter, surah, ayah).
+
+    The manifest is read and written in worker threads. Lookups use the copy in
+    memory, which is refreshed from disk every `OPUS_MANIFEST_REFRESH` seconds
+    to pick up assets transcoded by other processes.
+    """
+    def __init__(self, directory: str = OPUS_STORE_DIR, workers: int = OPUS_TRANSCODE_WORKERS,
+                 hot_threshold: int = OPUS_HOT_THRESHOLD, bitrate: int = OPUS_ASSET_BITRATE,
+                 refresh_interval: float = OPUS_MANIFEST_REFRESH):
+        self.directory = directory
+        self.workers = workers
+        self.hot_threshold = hot_threshold
+        self.bitrate = bitrate
+        self.refresh_interval = refresh_interval
+        self.manifest_path = os.path.join(directory, "manifest.json")
+        self._manifest = {}
+        self._manifest_mtime = None
+        self._checked = None
+        self._refreshing = None
+        # Serialises manifest rewrites from concurrent transcodes
+        self._save_lock = threading.Lock()
+        self._plays = {}
+        self._pending = set()
+        self._jobs = None
+        self._tasks = []
+
+    def _read_manifest(self) -> dict:
+        try:
+            with open(self.manifest_path, encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _manifest_changed(self) -> bool:
+        try:
+            mtime = os.stat(self.manifest_path).st_mtime_ns
+        except OSError:
+            mtime = None
+        changed = mtime != self._manifest_mtime
+        self._manifest_mtime = mtime
+        return changed
+
+    def _reload_manifest(self) -> dict:
+        """
+        Returns the manifest on disk, or None if it has not changed since it was last read.
+        """
+        with self._save_lock:
+            return self._read_manifest() if self._manifest_changed() else None
+
+    @property
+    def manifest(self) -> dict:
+        now = time.monotonic()
+        if self._refreshing is None and (self._checked is None or now - self._checked >= self.refresh_interval):
+            self._checked = now
+            try:
+                loop = asyncio.get_running_loop()
+            except RuntimeError:
+                # No event loop: nothing else can be blocked, so read in place
+                self._merge_manifest(self._reload_manifest())
+            else:
+                self._refreshing = loop.create_task(self._refresh())
+                self._refreshing.add_done_callback(lambda t: t.cancelled() or t.exception())
+        return self._manifest
+
+    async def _refresh(self):
+        try:
+            self._merge_manifest(await asyncio.to_thread(self._reload_manifest))
+        finally:
+            self._refreshing = None
+
+    def _merge_manifest(self, manifest: dict):
+        if manifest is not None:
+            self._manifest = {**self._manifest, **manifest}
+
+    def _save_entry(self, key: str, entry: dict) -> dict:
+        """
+        Adds an entry to the manifest on disk and returns the merged manifest.
+        """
+        with self._save_lock:
+            manifest = {**self._read_manifest(), key: entry}
+            tmp_path = f"{self.manifest_path}.{os.getpid()}.part"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(manifest, f)
+            os.replace(tmp_path, self.manifest_path)
+            self._manifest_changed()
+            return manifest
+
+    def get(self, reciter: str, surah_number: int, ayah_number: int = None) -> str:
+        """
+        Returns the path of a transcoded asset, or None if it does not exist.
+        """
+        entry = self.manifest.get(AudioCache.key_for(reciter, surah_number, ayah_number))
+        path = os.path.join(self.directory, entry["file"]) if entry else None
+        if path is None or not os.path.exists(path):
+            CACHE_REQUESTS.inc("opus_store", "miss")
+            return None
+        CACHE_REQUESTS.inc("opus_store", "hit")
+        return path
+
+    def record_play(self, reciter: str, surah_number: int, ayah_number: int, location: str):
+        """
+        Counts a play and queues a transcode from `location` once the recording becomes hot.
+        """
+        if self.workers <= 0:
+            return
+        key = AudioCache.key_for(reciter, surah_number, ayah_number)
+        if key in self.manifest or key in self._pending:
+            return
+
+        self._plays[key] = self._plays.get(key, 0) + 1
+        if self._plays[key] >= self.hot_threshold:
+            self._submit(key, reciter, surah_number, ayah_number, location)
+
+    def _submit(self, key: str, reciter: str, surah_number: int, ayah_number: int, location: str):
+        if self._jobs is None:
+            self._jobs = asyncio.Queue()
+            self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+        self._pending.add(key)
+        self._jobs.put_nowait((key, reciter, surah_number, ayah_number, location))
+
+    async def _worker(self):
+        while True:
+            key, reciter, surah_number, ayah_number, location = await self._jobs.get()
+            try:
+                await self._transcode(key, reciter, surah_number, ayah_number, location)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning("Failed to transcode %s Surah %s Ayah %s: %s", reciter, surah_number, ayah_number, e)
+            finally:
+                self._pending.discard(key)
+                self._plays.pop(key, None)
+
+    async def _transcode(self, key: str, reciter: str, surah_number: int, ayah_number: int, location: str):
+        filename = f"{key[:2]}/{key}.ogg"
+        path = os.path.join(self.directory, filename)
+        await asyncio.to_thread(os.makedirs, os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.part"
+
+        args = ["ffmpeg", "-nostdin", "-loglevel", "error", "-y"]
+        if location.startswith(("http://", "https://")):
+            args += STREAM_BEFORE_OPTIONS.split()
+        args += [
+            "-i", location, "-vn",
+            "-c:a", "libopus", "-b:a", f"{self.bitrate}k", "-ar", "48000", "-ac", "2",
+            "-frame_duration", "20", "-application", "audio", "-f", "ogg", tmp_path,
+        ]
+
+        process = await asyncio.create_subprocess_exec(*args, stderr=asyncio.subprocess.PIPE)
+        try:
+            _, stderr = await process.communicate()
+        except asyncio.CancelledError:
+            process.kill()
+            raise
+        finally:
+            if process.returncode != 0:
+                await asyncio.to_thread(self._discard, tmp_path)
+        if process.returncode != 0:
+            raise Exception(f"FFmpeg exited with {process.returncode}: {stderr.decode(errors='replace').strip()}")
+
+        size = await asyncio.to_thread(self._publish, tmp_path, path)
+        entry = {
+            "reciter": reciter,
+            "surah": surah_number,
+            "ayah": ayah_number,
+            "file": filename,
+            "bytes": size,
+            "bitrate": self.bitrate,
+            "created": int(time.time()),
+        }
+        self._merge_manifest(await asyncio.to_thread(self._save_entry, key, entry))
+
+    @staticmethod
+    def _discard(path: str):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    @staticmethod
+    def _publish(tmp_path: str, path: str) -> int:
+        """
+        Moves a finished transcode into place and returns its size.
+        """
+        os.replace(tmp_path, path)
+        return os.path.getsize(path)
+
+    async def close(self):
+        """
+        Cancels the transcoding workers.
+        """
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._jobs = None
+
+
+_store = None
+
+def get_opus_store() -> OpusAssetStore:
+    """
+    Returns the process-wide Opus asset store.
+    """
+    global _store
+    if _store is None:
+        _store = OpusAssetStore()
+    return _store
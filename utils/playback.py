@@ -0,0 +1,199 @@
+"""
+Event-driven per-guild playback engine.
+
+Each guild gets a `GuildPlayer` that owns its voice client and a queue of
+tracks. Track completion is signalled from FFmpeg's `after` callback through
+`loop.call_soon_threadsafe`, so nothing polls the voice client and idle guilds
+cost no CPU.
+"""
+import asyncio
+import time
+from collections import deque
+
+import discord
+
+from utils.audio_sources import TimedSource
+from utils.metrics import TRACK_GAPS, VOICE_SESSIONS
+
+
+class Disconnected(Exception):
+    """
+    Result of a track that was skipped or cut short because the voice connection dropped.
+    """
+
+
+class Track:
+    """
+    A queued track. The source is only built when the track starts, so long
+    streams do not hold an idle HTTP connection while they wait their turn.
+    """
+    __slots__ = ("factory", "on_start", "future")
+
+    def __init__(self, factory, on_start, future: asyncio.Future):
+        self.factory = factory
+        self.on_start = on_start
+        self.future = future
+
+
+class GuildPlayer:
+    """
+    Owns one guild's voice client and plays its queued tracks in order.
+    """
+    def __init__(self, guild_id: int, loop: asyncio.AbstractEventLoop):
+        self.guild_id = guild_id
+        self.loop = loop
+        self.voice_client = None
+        self.queue = deque()
+        self.current = None
+
+    def is_connected(self) -> bool:
+        return self.voice_client is not None and self.voice_client.is_connected()
+
+    @property
+    def bitrate(self) -> int:
+        """
+        The connected voice channel's bitrate in kbps, clamped to what Opus supports.
+        """
+        if not self.is_connected():
+            return 128
+        return max(16, min(512, self.voice_client.channel.bitrate // 1000))
+
+    async def connect(self, channel: discord.VoiceChannel) -> discord.VoiceClient:
+        """
+        Connects to (or moves into) a voice channel and returns the voice client.
+        """
+        voice_client = self.voice_client or channel.guild.voice_client
+        if voice_client is None or not voice_client.is_connected():
+            voice_client = await channel.connect()
+        elif voice_client.channel != channel:
+            await voice_client.move_to(channel)
+        self.voice_client = voice_client
+        return voice_client
+
+    def enqueue(self, factory, on_start=None) -> asyncio.Future:
+        """
+        Queues a track built by `factory()`.
+
+        Returns a future that resolves when the track finishes, with the player
+        error, a `Disconnected` if the voice connection dropped before it finished,
+        or None. `on_start()` is called when the track begins playing.
+        """
+        future = self.loop.create_future()
+        self.queue.append(Track(factory, on_start, future))
+        if self.current is None:
+            self._advance()
+        return future
+
+    def _advance(self, gap_started: float = None):
+        """
+        Starts the next queued track. `gap_started` is when the previous track
+        ended, used to measure the silence between the two.
+        """
+        self.current = None
+        while self.queue:
+            track = self.queue.popleft()
+            if not self.is_connected():
+                self._resolve(track, Disconnected())
+                continue
+
+            try:
+                source = TimedSource(track.factory(), self._gap_reporter(gap_started))
+                if self.voice_client.is_playing():
+                    self.voice_client.stop()
+                self.voice_client.play(source, after=lambda error, t=track: self.loop.call_soon_threadsafe(self._finished, t, error))
+            except Exception as e:
+                self._resolve(track, e)
+                continue
+
+            self.current = track
+            if track.on_start:
+                track.on_start()
+            return
+
+    @staticmethod
+    def _gap_reporter(gap_started: float):
+        if gap_started is None:
+            return None
+        return lambda first_frame_at: TRACK_GAPS.observe(first_frame_at - gap_started, "track")
+
+    def _finished(self, track: Track, error):
+        # The player also stops, without an error, when the voice connection is lost
+        if error is None and not self.is_connected():
+            error = Disconnected()
+        self._resolve(track, error)
+        if self.current is track:
+            self._advance(time.perf_counter() if self.queue else None)
+
+    @staticmethod
+    def _resolve(track: Track, result):
+        if not track.future.done():
+            track.future.set_result(result)
+
+    def stop(self):
+        """
+        Drops every queued track and stops the one currently playing.
+        """
+        while self.queue:
+            self._resolve(self.queue.popleft(), None)
+        if self.voice_client is not None and self.voice_client.is_playing():
+            # The player's `after` callback resolves the current track
+            self.voice_client.stop()
+
+    async def disconnect(self):
+        """
+        Stops playback and leaves the voice channel.
+        """
+        self.stop()
+        if self.is_connected():
+            await self.voice_client.disconnect()
+        self.voice_client = None
+
+
+class PlaybackEngine:
+    """
+    Registry of per-guild players.
+    """
+    def __init__(self):
+        self.players = {}
+
+    def player_for(self, guild: discord.Guild) -> GuildPlayer:
+        player = self.players.get(guild.id)
+        if player is None:
+            player = GuildPlayer(guild.id, asyncio.get_running_loop())
+            self.players[guild.id] = player
+        if player.voice_client is None:
+            # Adopt a voice connection made before the player existed (e.g. by another cog)
+            player.voice_client = guild.voice_client
+        return player
+
+    async def disconnect(self, guild: discord.Guild):
+        """
+        Disconnects a guild's player and forgets it.
+        """
+        player = self.players.pop(guild.id, None)
+        if player is not None:
+            await player.disconnect()
+
+    async def close(self):
+        """
+        Disconnects every player.
+        """
+        players = list(self.players.values())
+        self.players.clear()
+        for player in players:
+            await player.disconnect()
+
+
+_engine = None
+
+def get_engine() -> PlaybackEngine:
+    """
+    Returns the process-wide playback engine.
+    """
+    global _engine
+    if _engine is None:
+        _engine = PlaybackEngine()
+    return _engine
+
+
+VOICE_SESSIONS.callback = lambda: sum(player.is_connected() for player in get_engine().players.values())
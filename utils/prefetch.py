@@ -0,0 +1,139 @@
+"""
+Look-ahead prefetch pipeline for Ayah-by-Ayah playback.
+
+A producer task resolves the Ayah table and prepares the next few Ayahs while
+the current one is playing, so the playback loop only has to dequeue ready items.
+"""
+import asyncio
+import logging
+import os
+
+from utils.api_client import get_client
+from utils.audio_cache import get_cache
+from utils.metrics import CACHE_REQUESTS
+from utils.opus_store import get_opus_store
+from utils.providers import resolve_surah_ayahs
+from utils.surahs import clamp_ayah_range
+from utils.translation_store import get_translation_store
+
+logger = logging.getLogger(__name__)
+
+# Number of Ayahs prepared ahead of the one currently playing
+PREFETCH_DEPTH = int(os.getenv("PREFETCH_DEPTH", "3"))
+
+# Bytes of audio fetched ahead of playback to warm the CDN (0 disables it)
+PREFETCH_WARM_BYTES = int(os.getenv("PREFETCH_WARM_BYTES", "0"))
+
+
+class AyahPrefetchQueue:
+    """
+    Bounded producer/consumer queue of ready-to-play Ayahs.
+
+    Items are `(ayah_number, {"audio": url, "text": translation})` tuples.
+    The producer stops as soon as `stop_event` is set or `close()` is called.
+    """
+    def __init__(self, surah_number: int, reciter_config: dict, lang_code: str = None,
+                 start: int = None, end: int = None, depth: int = PREFETCH_DEPTH,
+                 warm_bytes: int = PREFETCH_WARM_BYTES):
+        self.surah_number = surah_number
+        self.reciter_config = reciter_config
+        # Cache key of the provider that served the Ayah table, set once it is resolved
+        self.audio_key = reciter_config["aladhan"]
+        self.lang_code = lang_code
+        # Explicit bounds from the surah table, so exactly the Ayahs that exist are requested
+        self.start_ayah, self.end_ayah = clamp_ayah_range(surah_number, start, end)
+        self.warm_bytes = warm_bytes
+        self.queue = asyncio.Queue(maxsize=max(1, depth))
+        self.error = None
+        self._task = None
+        self._stop_event = None
+
+    def start(self, stop_event: asyncio.Event):
+        """
+        Starts the producer task.
+        """
+        self._stop_event = stop_event
+        self._task = asyncio.create_task(self._produce())
+
+    async def _produce(self):
+        try:
+            # Serve translations from the offline corpus when the edition has been imported
+            store = get_translation_store()
+            offline = bool(self.lang_code) and store.has_edition(self.lang_code)
+            if self.lang_code:
+                CACHE_REQUESTS.inc("translation_store", "hit" if offline else "miss")
+            lang_code = None if offline else self.lang_code
+            self.audio_key, ayahs = await resolve_surah_ayahs(self.reciter_config, self.surah_number, lang_code, self.start_ayah, self.end_ayah)
+            if offline:
+                texts = store.get_range(self.lang_code, self.surah_number, self.start_ayah, self.end_ayah)
+                for ayah_number, ayah in ayahs.items():
+                    ayah["text"] = texts.get(ayah_number)
+            for ayah_number, ayah in ayahs.items():
+                if self._stop_event.is_set():
+                    break
+                await self.prepare(ayah_number, ayah)
+                await self.queue.put((ayah_number, ayah))
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self.error = e
+        await self.queue.put(None)
+
+    async def prepare(self, ayah_number: int, ayah: dict):
+        """
+        Prepares a single Ayah before it is handed to the consumer.
+
+        A pre-transcoded Opus asset is preferred (`ayah["opus"]` is set). Otherwise,
+        with the audio cache enabled the whole Ayah is downloaded and `ayah["path"]`
+        points at the local file; without it the first bytes are optionally warmed.
+        """
+        opus_store = get_opus_store()
+        opus_path = opus_store.get(self.audio_key, self.surah_number, ayah_number)
+        if opus_path:
+            ayah["path"] = opus_path
+            ayah["opus"] = True
+            return
+
+        cache = get_cache()
+        if cache.enabled and ayah["audio"]:
+            try:
+                ayah["path"] = await cache.fetch(self.audio_key, self.surah_number, ayah_number, ayah["audio"])
+            except Exception as e:
+                logger.debug("Failed to cache audio for Surah %s Ayah %s: %s", self.surah_number, ayah_number, e)
+        elif self.warm_bytes and ayah["audio"]:
+            try:
+                await get_client().prefetch_audio(ayah["audio"], self.warm_bytes)
+            except Exception as e:
+                logger.debug("Failed to warm audio for Surah %s Ayah %s: %s", self.surah_number, ayah_number, e)
+
+        if ayah["audio"]:
+            opus_store.record_play(self.audio_key, self.surah_number, ayah_number, ayah.get("path") or ayah["audio"])
+
+    async def get(self):
+        """
+        Returns the next ready Ayah, or None once the range is exhausted or playback is stopped.
+        """
+        if self._stop_event.is_set():
+            return None
+
+        get_task = asyncio.ensure_future(self.queue.get())
+        stop_task = asyncio.ensure_future(self._stop_event.wait())
+        try:
+            await asyncio.wait({get_task, stop_task}, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            stop_task.cancel()
+            if not get_task.done():
+                get_task.cancel()
+
+        if get_task.cancelled() or self._stop_event.is_set():
+            return None
+        return get_task.result()
+
+    def close(self):
+        """
+        Cancels the producer and drops any prepared Ayahs.
+        """
+        if self._task and not self._task.done():
+            self._task.cancel()
+        while not self.queue.empty():
+            self.queue.get_nowait()
@@ -0,0 +1,180 @@
+"""
+Hedged audio resolution across Quran.com and AlQuran.cloud.
+
+Every reciter in `RECITER_MAPPING` is available from AlQuran.cloud; Quran.com
+is only asked for reciters with a verified `quran_com_chapters` (full surahs) or
+`quran_com_verses` (per-Ayah) id, so both providers serve the same recording. The
+resolver asks the healthier provider first; if it has not answered within its
+own recent latency percentile, the same lookup is sent to the other provider and
+whichever succeeds first wins. Each provider has a circuit breaker so a failing
+one is skipped until it has had time to recover.
+"""
+import asyncio
+import os
+import time
+from collections import deque
+
+from utils.api_client import get_client
+from utils.chapter_index import get_chapter_index
+from utils.metrics import REGISTRY
+
+# Hedge once the primary is slower than this percentile of its recent latencies
+HEDGE_PERCENTILE = float(os.getenv("HEDGE_PERCENTILE", "0.9"))
+HEDGE_MIN_DELAY = float(os.getenv("HEDGE_MIN_DELAY", "0.15"))
+HEDGE_DEFAULT_DELAY = float(os.getenv("HEDGE_DEFAULT_DELAY", "0.5"))
+# Consecutive failures that open a provider's circuit, and how long it stays open
+BREAKER_THRESHOLD = int(os.getenv("BREAKER_THRESHOLD", "5"))
+BREAKER_COOLDOWN = float(os.getenv("BREAKER_COOLDOWN", "30"))
+
+HEDGED_REQUESTS = REGISTRY.counter("quran_hedged_requests_total", "Resolver outcomes by winning provider", ("provider", "outcome"))
+
+
+class ProviderHealth:
+    """
+    Recent latencies and circuit-breaker state of one provider.
+    """
+    def __init__(self, name: str, window: int = 100):
+        self.name = name
+        self.latencies = deque(maxlen=window)
+        self.failures = 0
+        self.open_until = 0.0
+
+    def hedge_delay(self) -> float:
+        if len(self.latencies) < 10:
+            return HEDGE_DEFAULT_DELAY
+        ordered = sorted(self.latencies)
+        return max(HEDGE_MIN_DELAY, ordered[int(HEDGE_PERCENTILE * (len(ordered) - 1))])
+
+    def is_available(self) -> bool:
+        # Once the cooldown has passed the breaker is half-open: the next call is a trial
+        return self.failures < BREAKER_THRESHOLD or time.monotonic() >= self.open_until
+
+    def record_success(self, latency: float):
+        self.latencies.append(latency)
+        self.failures = 0
+
+    def record_failure(self):
+        self.failures += 1
+        if self.failures >= BREAKER_THRESHOLD:
+            self.open_until = time.monotonic() + BREAKER_COOLDOWN
+
+
+class HedgedResolver:
+    def __init__(self):
+        self.health = {}
+
+    def health_of(self, provider: str) -> ProviderHealth:
+        health = self.health.get(provider)
+        if health is None:
+            health = self.health[provider] = ProviderHealth(provider)
+        return health
+
+    async def resolve(self, attempts: list):
+        """
+        Runs `(provider, loader)` attempts hedged and returns `(provider, result)` for the first non-empty result.
+
+        Attempts are tried in the given order, skipping providers whose circuit is
+        open unless every one of them is. An empty result counts as a failure, but
+        is returned if nothing better arrives.
+        """
+        available = [attempt for attempt in attempts if self.health_of(attempt[0]).is_available()]
+        queue = deque(available or attempts)
+        primary_provider = queue[0][0]
+        running = {}
+        last_error = None
+        empty = None
+        failed_over = False
+
+        def launch():
+            provider, loader = queue.popleft()
+            running[asyncio.ensure_future(loader())] = (provider, time.perf_counter())
+
+        launch()
+        try:
+            while running:
+                timeout = None
+                if queue:
+                    primary = next(iter(running.values()))[0]
+                    timeout = self.health_of(primary).hedge_delay()
+
+                done, _ = await asyncio.wait(running, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    launch()
+                    continue
+
+                for task in done:
+                    provider, started = running.pop(task)
+                    health = self.health_of(provider)
+                    if task.exception() is None and task.result():
+                        health.record_success(time.perf_counter() - started)
+                        outcome = "failover" if failed_over else ("primary" if provider == primary_provider else "hedge")
+                        HEDGED_REQUESTS.inc(provider, outcome)
+                        return provider, task.result()
+
+                    health.record_failure()
+                    if task.exception() is None:
+                        empty = (provider, task.result())
+                    else:
+                        last_error = task.exception()
+
+                if not running and queue:
+                    failed_over = True
+                    launch()
+        finally:
+            for task in running:
+                task.cancel()
+
+        if empty is not None:
+            return empty
+        raise last_error
+
+
+_resolver = None
+
+def get_resolver() -> HedgedResolver:
+    """
+    Returns the process-wide hedged resolver.
+    """
+    global _resolver
+    if _resolver is None:
+        _resolver = HedgedResolver()
+    return _resolver
+
+
+async def resolve_surah_audio_url(reciter_config: dict, surah_number: int) -> tuple[str, str]:
+    """
+    Returns `(audio_key, url)` for a full surah, hedging between Quran.com and the AlQuran.cloud CDN.
+
+    `audio_key` names the recording the URL points at, so caches keyed by it never
+    mix up the two providers' files. Quran.com is only asked for reciters with a
+    verified chapter-reciter id.
+    """
+    attempts = [("alquran_cloud", lambda: get_client().get_surah_audio_cdn(surah_number, reciter_config["aladhan"]))]
+    reciter_id = reciter_config.get("quran_com_chapters")
+    if reciter_id:
+        attempts.insert(0, ("quran_com", lambda: get_chapter_index().audio_url(reciter_id, surah_number)))
+    provider, audio_url = await get_resolver().resolve(attempts)
+    if provider == "quran_com":
+        return f"quran_com:{reciter_id}", audio_url
+    return f"alquran_cloud:{reciter_config['aladhan']}", audio_url
+
+
+async def resolve_surah_ayahs(reciter_config: dict, surah_number: int, lang_code: str = None,
+                              start: int = None, end: int = None) -> tuple[str, dict[int, dict]]:
+    """
+    Returns `(audio_key, table)` for a surah's Ayahs, hedging between AlQuran.cloud and Quran.com.
+
+    Quran.com is only asked for reciters with a verified per-verse recitation id.
+    It returns no translation texts, so it is not asked when `lang_code` is set;
+    callers serving texts from the offline translation store pass no `lang_code`
+    and keep the hedge.
+    """
+    client = get_client()
+    attempts = [("alquran_cloud", lambda: client.get_surah_ayahs(surah_number, reciter_config["aladhan"], lang_code, start, end))]
+    recitation_id = reciter_config.get("quran_com_verses")
+    if recitation_id and not lang_code:
+        attempts.append(("quran_com", lambda: client.get_verse_audio_files(surah_number, recitation_id, start, end)))
+    provider, table = await get_resolver().resolve(attempts)
+    if provider == "quran_com":
+        return f"quran_com_verses:{recitation_id}", table
+    return reciter_config["aladhan"], table
@@ -0,0 +1,408 @@
+"""
+Registry of dashboard sessions keyed by message id.
+
+Each `/quran` dashboard is a compact `DashboardSession` record rather than a
+live view object. Records are persisted to SQLite, so buttons on dashboards
+sent before a restart keep working. In memory they are kept in a size-capped
+LRU, and sessions idle for too long are dropped entirely.
+
+The registry also remembers where each guild's last recitation stopped, so
+`/resume` can continue from that Ayah.
+"""
+import asyncio
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import NamedTuple
+
+from utils.ayah_timestamps import SurahTimestamps
+from utils.metrics import CACHE_REQUESTS
+
+logger = logging.getLogger(__name__)
+
+SESSION_DB = os.getenv("SESSION_DB", "data/sessions.sqlite3")
+# Sessions kept in memory; older idle ones are reloaded from disk on their next interaction
+SESSION_MAX = int(os.getenv("SESSION_MAX", "2000"))
+# Seconds without interaction after which a dashboard expires
+SESSION_IDLE_TTL = float(os.getenv("SESSION_IDLE_TTL", str(7 * 24 * 3600)))
+# Seconds between saves of a playing guild's position for /resume
+POSITION_SAVE_INTERVAL = float(os.getenv("POSITION_SAVE_INTERVAL", "10"))
+# Seconds writes are collected before they are committed together in a worker thread
+SESSION_FLUSH_DELAY = float(os.getenv("SESSION_FLUSH_DELAY", "1"))
+
+
+class DashboardSession:
+    """
+    Per-message dashboard state. Only the first `PERSISTED` fields are stored on disk.
+    """
+    PERSISTED = ("message_id", "guild_id", "surah_number", "reciter", "language", "start_ayah", "end_ayah", "current_surah", "last_used")
+    __slots__ = PERSISTED + ("play_task", "stop_event", "audio_queue", "track")
+
+    def __init__(self, message_id: int, guild_id: int, surah_number: int, reciter: str = "husary",
+                 language: str = "none", start_ayah: int = None, end_ayah: int = None,
+                 current_surah: int = None, last_used: float = None):
+        self.message_id = message_id
+        self.guild_id = guild_id
+        self.surah_number = surah_number
+        self.reciter = reciter
+        self.language = language
+        self.start_ayah = start_ayah
+        self.end_ayah = end_ayah
+        self.current_surah = current_surah or (1 if surah_number == 0 else surah_number)
+        self.last_used = last_used or time.time()
+        # Runtime-only playback state, created when playback starts
+        self.play_task = None
+        self.stop_event = None
+        self.audio_queue = None
+        # (reciter_id, surah, ayah, seconds into the recording, monotonic start) of the track playing
+        self.track = None
+
+    @property
+    def is_full_quran(self) -> bool:
+        return self.surah_number == 0
+
+    def is_playing(self) -> bool:
+        return self.play_task is not None and not self.play_task.done()
+
+    def row(self) -> tuple:
+        return tuple(getattr(self, field) for field in self.PERSISTED)
+
+    def mark_track(self, reciter_id: int, surah: int, ayah: int, offset: float = None):
+        """
+        Records that a track started playing at `ayah`; `offset` is set for full-surah streams.
+        """
+        self.track = (reciter_id, surah, ayah, offset, time.monotonic())
+
+    def position(self, timestamps: SurahTimestamps = None) -> tuple[int, int]:
+        """
+        Returns the (surah, Ayah) playing now, or None before the first track starts.
+
+        Within a full-surah stream the Ayah is derived from the elapsed time and
+        the recording's `timestamps`; without them it is the Ayah the stream started at.
+        """
+        if self.track is None:
+            return None
+        _, surah, ayah, offset, started = self.track
+        if offset is not None and timestamps is not None:
+            ayah = timestamps.ayah_at(offset + time.monotonic() - started)
+        return surah, ayah
+
+
+class PlaybackPosition(NamedTuple):
+    """
+    Where a guild's last recitation stopped. `surah_number` is the dashboard's (0 for Full Quran).
+    """
+    guild_id: int
+    reciter: str
+    surah_number: int
+    surah: int
+    ayah: int
+    end_ayah: int
+    updated: float
+
+
+class WriteBatch:
+    """
+    Registry writes waiting to be committed together.
+
+    `positions` maps a guild to its position row, or None to delete it;
+    `touched` holds last-use times of sessions whose row was not rewritten.
+    """
+    __slots__ = ("sessions", "positions", "touched", "cutoff")
+
+    def __init__(self):
+        self.sessions = {}
+        self.positions = {}
+        self.touched = {}
+        self.cutoff = None
+
+    def __bool__(self) -> bool:
+        return bool(self.sessions or self.positions or self.touched or self.cutoff)
+
+    def merge_older(self, older: "WriteBatch"):
+        """
+        Adds the writes of an earlier batch that this one does not supersede.
+        """
+        for message_id, row in older.sessions.items():
+            self.sessions.setdefault(message_id, row)
+        for guild_id, row in older.positions.items():
+            self.positions.setdefault(guild_id, row)
+        for message_id, last_used in older.touched.items():
+            if message_id not in self.sessions:
+                self.touched.setdefault(message_id, last_used)
+        self.cutoff = self.cutoff or older.cutoff
+
+
+class SessionRegistry:
+    """
+    Writes are collected for `SESSION_FLUSH_DELAY` seconds and committed in one
+    transaction in a worker thread, so the event loop never waits on a commit.
+    Reads use their own connection; with the database in WAL mode they never
+    wait on a commit either, from this process or another cluster worker.
+    Batches that fail to commit (e.g. "database is locked") are retried.
+    """
+    def __init__(self, path: str = SESSION_DB, max_sessions: int = SESSION_MAX, idle_ttl: float = SESSION_IDLE_TTL,
+                 flush_delay: float = SESSION_FLUSH_DELAY):
+        self.path = path
+        self.max_sessions = max_sessions
+        self.idle_ttl = idle_ttl
+        self.flush_delay = flush_delay
+        self.sessions = OrderedDict()
+        # Other messages showing a session's controls, e.g. the ephemeral playback reply
+        self.aliases = {}
+        # Writes not yet committed, and the batch a worker thread is committing
+        self._pending = WriteBatch()
+        self._writing = WriteBatch()
+        self._flush_task = None
+        # Serialises commits from worker threads with the final one in close()
+        self._write_lock = threading.Lock()
+        self._conn = None
+        self._read_conn = None
+        self._last_expiry = 0.0
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        if self._conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS sessions ("
+                "message_id INTEGER PRIMARY KEY, guild_id INTEGER, surah_number INTEGER NOT NULL, "
+                "reciter TEXT NOT NULL, language TEXT NOT NULL, start_ayah INTEGER, end_ayah INTEGER, "
+                "current_surah INTEGER, last_used REAL NOT NULL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS sessions_last_used ON sessions (last_used)")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS positions ("
+                "guild_id INTEGER PRIMARY KEY, reciter TEXT NOT NULL, surah_number INTEGER NOT NULL, "
+                "surah INTEGER NOT NULL, ayah INTEGER NOT NULL, end_ayah INTEGER, updated REAL NOT NULL)"
+            )
+        return self._conn
+
+    @property
+    def read_conn(self) -> sqlite3.Connection:
+        """
+        Connection used for lookups on the event loop, separate from the one commits run on.
+        """
+        if self._read_conn is None:
+            self.conn  # Creates the database and its tables
+            self._read_conn = sqlite3.connect(self.path, check_same_thread=False)
+        return self._read_conn
+
+    def close(self):
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            self._flush_task = None
+        if self._conn is not None:
+            batch, self._pending = self._pending, WriteBatch()
+            self._write(batch)
+            with self._write_lock:
+                self._conn.close()
+        if self._read_conn is not None:
+            self._read_conn.close()
+        self._conn = self._read_conn = None
+
+    def create(self, message_id: int, guild_id: int, surah_number: int) -> DashboardSession:
+        """
+        Registers the session of a newly sent dashboard message.
+        """
+        session = DashboardSession(message_id, guild_id, surah_number)
+        self.sessions[message_id] = session
+        self.save(session)
+        self._evict()
+        return session
+
+    def get(self, message_id: int) -> DashboardSession:
+        """
+        Returns the session of a dashboard message, reloading it from disk if it was evicted from memory.
+
+        Every lookup counts as use of the dashboard. Returns None if the dashboard
+        is unknown or has expired.
+        """
+        message_id = self.aliases.get(message_id, message_id)
+        session = self.sessions.get(message_id)
+        if session is not None:
+            self.sessions.move_to_end(message_id)
+            CACHE_REQUESTS.inc("sessions", "hit")
+        else:
+            row = self._unwritten("sessions", message_id)
+            if row is None:
+                row = self.read_conn.execute(
+                    f"SELECT {', '.join(DashboardSession.PERSISTED)} FROM sessions WHERE message_id = ?", (message_id,)
+                ).fetchone()
+            last_used = self._unwritten("touched", message_id) or (row and row[-1])
+            if row is None or time.time() - last_used > self.idle_ttl:
+                CACHE_REQUESTS.inc("sessions", "miss")
+                return None
+
+            CACHE_REQUESTS.inc("sessions", "restored")
+            session = DashboardSession(*row)
+            self.sessions[message_id] = session
+            self._evict()
+
+        session.last_used = self._pending.touched[message_id] = time.time()
+        self._expire()
+        return session
+
+    def alias(self, message_id: int, session: DashboardSession):
+        """
+        Routes interactions on another message (such as an ephemeral reply) to `session`.
+        """
+        if message_id is not None and message_id != session.message_id:
+            self.aliases[message_id] = session.message_id
+
+    def save(self, session: DashboardSession):
+        """
+        Marks the session as used and queues its persisted fields for writing.
+        """
+        session.last_used = time.time()
+        self._pending.touched.pop(session.message_id, None)
+        self._pending.sessions[session.message_id] = session.row()
+        self._schedule_flush()
+        self._expire()
+
+    def save_position(self, session: DashboardSession, surah: int, ayah: int):
+        """
+        Remembers that the guild's recitation is at `ayah` of `surah`.
+        """
+        if session.guild_id is None:
+            return
+        self._pending.positions[session.guild_id] = (
+            session.guild_id, session.reciter, session.surah_number, surah, ayah, session.end_ayah, time.time(),
+        )
+        self._schedule_flush()
+
+    def get_position(self, guild_id: int) -> PlaybackPosition:
+        """
+        Returns where the guild's last recitation stopped, or None.
+        """
+        for batch in (self._pending, self._writing):
+            if guild_id in batch.positions:
+                row = batch.positions[guild_id]
+                break
+        else:
+            row = self.read_conn.execute(
+                f"SELECT {', '.join(PlaybackPosition._fields)} FROM positions WHERE guild_id = ?", (guild_id,)
+            ).fetchone()
+        if row is None or time.time() - row[-1] > self.idle_ttl:
+            return None
+        return PlaybackPosition(*row)
+
+    def clear_position(self, guild_id: int):
+        self._pending.positions[guild_id] = None
+        self._schedule_flush()
+
+    def _unwritten(self, field: str, key):
+        """
+        Returns a value queued for writing but not committed yet, or None.
+        """
+        for batch in (self._pending, self._writing):
+            value = getattr(batch, field).get(key)
+            if value is not None:
+                return value
+        return None
+
+    def _schedule_flush(self):
+        if self._flush_task is not None:
+            return
+        try:
+            self._flush_task = asyncio.get_running_loop().create_task(self._flush_later())
+        except RuntimeError:
+            # No event loop (e.g. a script): nothing else can be blocked, so write in place
+            batch, self._pending = self._pending, WriteBatch()
+            self._write(batch)
+
+    async def _flush_later(self):
+        await asyncio.sleep(self.flush_delay)
+        self._flush_task = None
+        self._writing, self._pending = self._pending, WriteBatch()
+        try:
+            await asyncio.to_thread(self._write, self._writing)
+        except Exception as e:
+            # Keep the batch behind any newer writes and try again with the next flush
+            logger.warning("Failed to save dashboard sessions, retrying: %s", e)
+            self._pending.merge_older(self._writing)
+            self._schedule_flush()
+        finally:
+            self._writing = WriteBatch()
+
+    def _write(self, batch: WriteBatch):
+        """
+        Commits a batch of writes in one transaction.
+        """
+        if not batch:
+            return
+        with self._write_lock, self.conn:
+            self.conn.executemany(
+                f"INSERT OR REPLACE INTO sessions ({', '.join(DashboardSession.PERSISTED)}) "
+                f"VALUES ({', '.join('?' * len(DashboardSession.PERSISTED))})",
+                list(batch.sessions.values()),
+            )
+            self.conn.executemany(
+                "UPDATE sessions SET last_used = ? WHERE message_id = ?",
+                [(last_used, message_id) for message_id, last_used in batch.touched.items()],
+            )
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO positions VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [row for row in batch.positions.values() if row is not None],
+            )
+            self.conn.executemany(
+                "DELETE FROM positions WHERE guild_id = ?",
+                [(guild_id,) for guild_id, row in batch.positions.items() if row is None],
+            )
+            if batch.cutoff is not None:
+                self.conn.execute("DELETE FROM sessions WHERE last_used < ?", (batch.cutoff,))
+                self.conn.execute("DELETE FROM positions WHERE updated < ?", (batch.cutoff,))
+
+    def _evict(self):
+        """
+        Drops the least recently used idle sessions from memory until the cap is met.
+
+        Sessions that are playing are never evicted; they are moved to the back instead.
+        """
+        for _ in range(len(self.sessions)):
+            if len(self.sessions) <= self.max_sessions:
+                break
+            message_id, session = next(iter(self.sessions.items()))
+            if session.is_playing():
+                self.sessions.move_to_end(message_id)
+                continue
+            del self.sessions[message_id]
+            CACHE_REQUESTS.inc("sessions", "evicted")
+        if len(self.aliases) > self.max_sessions:
+            live = set(self.sessions)
+            self.aliases = {alias: target for alias, target in self.aliases.items() if target in live}
+
+    def _expire(self):
+        """
+        Drops sessions idle for longer than the TTL, at most once a minute.
+
+        Rows are deleted with the next batch, after the last-use times queued with it.
+        """
+        now = time.time()
+        if now - self._last_expiry < 60:
+            return
+        self._last_expiry = now
+        cutoff = now - self.idle_ttl
+        self._pending.cutoff = cutoff
+        self._schedule_flush()
+        for message_id in [mid for mid, session in self.sessions.items() if session.last_used < cutoff and not session.is_playing()]:
+            del self.sessions[message_id]
+
+
+_registry = None
+
+def get_session_registry() -> SessionRegistry:
+    """
+    Returns the process-wide dashboard session registry.
+    """
+    global _registry
+    if _registry is None:
+        _registry = SessionRegistry()
+    return _registry
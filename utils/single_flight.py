@@ -0,0 +1,83 @@
+"""
+Single-flight request coalescing with a bounded TTL cache.
+
+Concurrent identical lookups share one in-flight call and its result or error;
+successful results are then kept for a TTL in a size-bounded LRU.
+"""
+import asyncio
+import functools
+import inspect
+import time
+from collections import OrderedDict
+
+from utils.metrics import CACHE_REQUESTS
+
+
+class SingleFlight:
+    def __init__(self, maxsize: int = 4096, ttl: float = 600.0, name: str = "api"):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.name = name
+        self._cache = OrderedDict()
+        self._inflight = {}
+
+    async def run(self, key, loader):
+        """
+        Returns the cached value for `key`, or awaits `loader()`, sharing it with concurrent callers.
+        """
+        entry = self._cache.get(key)
+        if entry is not None:
+            expires_at, value = entry
+            if expires_at > time.monotonic():
+                self._cache.move_to_end(key)
+                CACHE_REQUESTS.inc(self.name, "hit")
+                return value
+            del self._cache[key]
+
+        task = self._inflight.get(key)
+        if task is None:
+            CACHE_REQUESTS.inc(self.name, "miss")
+            task = asyncio.ensure_future(self._load(key, loader))
+            self._inflight[key] = task
+            task.add_done_callback(lambda t: t.cancelled() or t.exception())
+        else:
+            CACHE_REQUESTS.inc(self.name, "coalesced")
+        # Shielded so one caller giving up does not cancel the call for the others
+        return await asyncio.shield(task)
+
+    async def _load(self, key, loader):
+        try:
+            value = await loader()
+        finally:
+            self._inflight.pop(key, None)
+
+        if self.maxsize > 0 and self.ttl > 0:
+            self._cache[key] = (time.monotonic() + self.ttl, value)
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.maxsize:
+                self._cache.popitem(last=False)
+        return value
+
+    def clear(self):
+        self._cache.clear()
+
+
+def single_flight(name: str, copy=None):
+    """
+    Decorates a coroutine method so identical calls go through `self.flights`.
+
+    The cache key is the method name plus its bound arguments. `copy` is applied
+    to every returned value when callers may mutate it.
+    """
+    def decorator(method):
+        signature = inspect.signature(method)
+
+        @functools.wraps(method)
+        async def wrapper(self, *args, **kwargs):
+            bound = signature.bind(self, *args, **kwargs)
+            bound.apply_defaults()
+            key = (name,) + tuple(bound.arguments.values())[1:]
+            value = await self.flights.run(key, lambda: method(self, *args, **kwargs))
+            return copy(value) if copy else value
+        return wrapper
+    return decorator
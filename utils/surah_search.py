@@ -0,0 +1,124 @@
+"""
+Prebuilt search index for surah autocomplete.
+
+Surah numbers, transliterated names and English names are normalised once into
+a prefix table and a trigram table, so a keystroke is answered with a few dict
+lookups instead of scanning and re-formatting all 114 entries.
+"""
+import re
+import unicodedata
+
+from discord import app_commands
+
+from utils.surahs import SURAH_INFO
+
+# Discord shows at most 25 autocomplete choices
+MAX_CHOICES = 25
+# Minimum trigram similarity (Jaccard) of a fuzzy match to any searchable term
+FUZZY_CUTOFF = 0.25
+FULL_QURAN_LABEL = "0. The Entire Quran (Full Recitation)"
+
+
+def normalize(text: str) -> str:
+    """
+    Lowercases, strips accents and punctuation, and collapses whitespace.
+
+    "Ali 'Imran" and "ali imran" both become "ali imran".
+    """
+    text = unicodedata.normalize("NFKD", text)
+    text = "".join(char for char in text if not unicodedata.combining(char))
+    text = re.sub(r"['`’ʿʾ]", "", text.lower())
+    return " ".join(re.sub(r"[^a-z0-9]+", " ", text).split())
+
+
+def trigrams(text: str) -> set[str]:
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class SurahIndex:
+    """
+    Prefix and trigram index over surah numbers and names.
+
+    `prefixes` maps every prefix of every searchable token (and of the whole
+    normalised name) to surah ids, those with a term equal to the prefix first
+    and the rest in table order; `grams` maps each trigram to
+    the ids containing it, and `term_grams` holds each id's per-term trigram sets
+    for scoring fuzzy matches.
+    """
+    def __init__(self, surahs=SURAH_INFO[1:], include_full_quran: bool = True):
+        self.prefixes = {}
+        self.terms = {}
+        self.grams = {}
+        self.term_grams = {}
+        self.choices = {}
+        self.default_choices = []
+
+        entries = [(surah.id, surah.label, (str(surah.id), surah.name, surah.translated_name)) for surah in surahs]
+        if include_full_quran:
+            entries.insert(0, (0, FULL_QURAN_LABEL, ("0", "full quran", "entire quran")))
+
+        for surah_id, label, fields in entries:
+            self.choices[surah_id] = app_commands.Choice(name=label, value=surah_id)
+            for field in fields:
+                text = normalize(field)
+                # "al-baqarah" is also found as "baqarah"
+                for term in {text, text.replace(" ", "")} | set(text.split()):
+                    exact = self.terms.setdefault(term, [])
+                    if surah_id not in exact:
+                        exact.append(surah_id)
+                    for end in range(1, len(term) + 1):
+                        ids = self.prefixes.setdefault(term[:end], [])
+                        if surah_id not in ids:
+                            ids.append(surah_id)
+                    grams = trigrams(term)
+                    self.term_grams.setdefault(surah_id, []).append(grams)
+                    for gram in grams:
+                        self.grams.setdefault(gram, set()).add(surah_id)
+        # "an nas" is An-Nas itself before An-Nasr, which only starts with it
+        for prefix, exact in self.terms.items():
+            self.prefixes[prefix] = exact + [surah_id for surah_id in self.prefixes[prefix] if surah_id not in exact]
+        self.default_choices = list(self.choices.values())[:MAX_CHOICES]
+
+    def search(self, query: str, limit: int = MAX_CHOICES) -> list[int]:
+        """
+        Returns up to `limit` surah ids: exact term matches, then other prefix
+        matches, then the closest fuzzy matches.
+        """
+        text = normalize(query)
+        if not text:
+            return list(self.choices)[:limit]
+
+        results = list(self.prefixes.get(text, ()))
+        if len(results) < limit:
+            # Rank by trigram similarity to the closest term; only typos and infix matches reach here
+            query_grams = trigrams(text)
+            seen = set(results)
+            candidates = {surah_id for gram in query_grams for surah_id in self.grams.get(gram, ()) if surah_id not in seen}
+            scores = {}
+            for surah_id in candidates:
+                score = max(len(query_grams & grams) / len(query_grams | grams) for grams in self.term_grams[surah_id])
+                if score >= FUZZY_CUTOFF:
+                    scores[surah_id] = score
+            results += sorted(scores, key=lambda surah_id: (-scores[surah_id], surah_id))
+        return results[:limit]
+
+    def autocomplete(self, query: str) -> list[app_commands.Choice[int]]:
+        """
+        Returns ready-made choices for an autocomplete response.
+        """
+        if not query:
+            return self.default_choices
+        return [self.choices[surah_id] for surah_id in self.search(query)]
+
+
+_index = None
+
+def get_surah_index() -> SurahIndex:
+    """
+    Returns the process-wide surah search index, building it on first use.
+    """
+    global _index
+    if _index is None:
+        _index = SurahIndex()
+    return _index
@@ -0,0 +1,121 @@
+"""
+Generated by generate_surahs.py; do not edit.
+
+Rows are (id, name, translated_name, ayah_count, revelation_place, ayah_offset).
+"""
+SURAH_TABLE = (
+    (1, 'Al-Fatihah', 'The Opener', 7, 'makkah', 0),
+    (2, 'Al-Baqarah', 'The Cow', 286, 'madinah', 7),
+    (3, "Ali 'Imran", 'Family of Imran', 200, 'madinah', 293),
+    (4, 'An-Nisa', 'The Women', 176, 'madinah', 493),
+    (5, "Al-Ma'idah", 'The Table Spread', 120, 'madinah', 669),
+    (6, "Al-An'am", 'The Cattle', 165, 'makkah', 789),
+    (7, "Al-A'raf", 'The Heights', 206, 'makkah', 954),
+    (8, 'Al-Anfal', 'The Spoils of War', 75, 'madinah', 1160),
+    (9, 'At-Tawbah', 'The Repentance', 129, 'madinah', 1235),
+    (10, 'Yunus', 'Jonah', 109, 'makkah', 1364),
+    (11, 'Hud', 'Hud', 123, 'makkah', 1473),
+    (12, 'Yusuf', 'Joseph', 111, 'makkah', 1596),
+    (13, "Ar-Ra'd", 'The Thunder', 43, 'madinah', 1707),
+    (14, 'Ibrahim', 'Abraham', 52, 'makkah', 1750),
+    (15, 'Al-Hijr', 'The Rocky Tract', 99, 'makkah', 1802),
+    (16, 'An-Nahl', 'The Bee', 128, 'makkah', 1901),
+    (17, 'Al-Isra', 'The Night Journey', 111, 'makkah', 2029),
+    (18, 'Al-Kahf', 'The Cave', 110, 'makkah', 2140),
+    (19, 'Maryam', 'Mary', 98, 'makkah', 2250),
+    (20, 'Taha', 'Ta-Ha', 135, 'makkah', 2348),
+    (21, 'Al-Anbya', 'The Prophets', 112, 'makkah', 2483),
+    (22, 'Al-Hajj', 'The Pilgrimage', 78, 'madinah', 2595),
+    (23, "Al-Mu'minun", 'The Believers', 118, 'makkah', 2673),
+    (24, 'An-Nur', 'The Light', 64, 'madinah', 2791),
+    (25, 'Al-Furqan', 'The Criterion', 77, 'makkah', 2855),
+    (26, "Ash-Shu'ara", 'The Poets', 227, 'makkah', 2932),
+    (27, 'An-Naml', 'The Ant', 93, 'makkah', 3159),
+    (28, 'Al-Qasas', 'The Stories', 88, 'makkah', 3252),
+    (29, "Al-'Ankabut", 'The Spider', 69, 'makkah', 3340),
+    (30, 'Ar-Rum', 'The Romans', 60, 'makkah', 3409),
+    (31, 'Luqman', 'Luqman', 34, 'makkah', 3469),
+    (32, 'As-Sajdah', 'The Prostration', 30, 'makkah', 3503),
+    (33, 'Al-Ahzab', 'The Combined Forces', 73, 'madinah', 3533),
+    (34, 'Saba', 'Sheba', 54, 'makkah', 3606),
+    (35, 'Fatir', 'Originator', 45, 'makkah', 3660),
+    (36, 'Ya-Sin', 'Ya Sin', 83, 'makkah', 3705),
+    (37, 'As-Saffat', 'Those who set the Ranks', 182, 'makkah', 3788),
+    (38, 'Sad', "The Letter 'Saad'", 88, 'makkah', 3970),
+    (39, 'Az-Zumar', 'The Troops', 75, 'makkah', 4058),
+    (40, 'Ghafir', 'The Forgiver', 85, 'makkah', 4133),
+    (41, 'Fussilat', 'Explained in Detail', 54, 'makkah', 4218),
+    (42, 'Ash-Shuraa', 'The Consultation', 53, 'makkah', 4272),
+    (43, 'Az-Zukhruf', 'The Ornaments of Gold', 89, 'makkah', 4325),
+    (44, 'Ad-Dukhan', 'The Smoke', 59, 'makkah', 4414),
+    (45, 'Al-Jathiyah', 'The Crouching', 37, 'makkah', 4473),
+    (46, 'Al-Ahqaf', 'The Wind-Curved Sandhills', 35, 'makkah', 4510),
+    (47, 'Muhammad', 'Muhammad', 38, 'madinah', 4545),
+    (48, 'Al-Fath', 'The Victory', 29, 'madinah', 4583),
+    (49, 'Al-Hujurat', 'The Rooms', 18, 'madinah', 4612),
+    (50, 'Qaf', "The Letter 'Qaf'", 45, 'makkah', 4630),
+    (51, 'Adh-Dhariyat', 'The Winnowing Winds', 60, 'makkah', 4675),
+    (52, 'At-Tur', 'The Mount', 49, 'makkah', 4735),
+    (53, 'An-Najm', 'The Star', 62, 'makkah', 4784),
+    (54, 'Al-Qamar', 'The Moon', 55, 'makkah', 4846),
+    (55, 'Ar-Rahman', 'The Beneficent', 78, 'madinah', 4901),
+    (56, "Al-Waqi'ah", 'The Inevitable', 96, 'makkah', 4979),
+    (57, 'Al-Hadid', 'The Iron', 29, 'madinah', 5075),
+    (58, 'Al-Mujadila', 'The Pleading Woman', 22, 'madinah', 5104),
+    (59, 'Al-Hashr', 'The Exile', 24, 'madinah', 5126),
+    (60, 'Al-Mumtahanah', 'She that is to be examined', 13, 'madinah', 5150),
+    (61, 'As-Saf', 'The Ranks', 14, 'madinah', 5163),
+    (62, "Al-Jumu'ah", 'The Congregation, Friday', 11, 'madinah', 5177),
+    (63, 'Al-Munafiqun', 'The Hypocrites', 11, 'madinah', 5188),
+    (64, 'At-Taghabun', 'The Mutual Disillusion', 18, 'madinah', 5199),
+    (65, 'At-Talaq', 'The Divorce', 12, 'madinah', 5217),
+    (66, 'At-Tahrim', 'The Prohibition', 12, 'madinah', 5229),
+    (67, 'Al-Mulk', 'The Sovereignty', 30, 'makkah', 5241),
+    (68, 'Al-Qalam', 'The Pen', 52, 'makkah', 5271),
+    (69, 'Al-Haqqah', 'The Reality', 52, 'makkah', 5323),
+    (70, "Al-Ma'arij", 'The Ascending Stairways', 44, 'makkah', 5375),
+    (71, 'Nuh', 'Noah', 28, 'makkah', 5419),
+    (72, 'Al-Jinn', 'The Jinn', 28, 'makkah', 5447),
+    (73, 'Al-Muzzammil', 'The Enshrouded One', 20, 'makkah', 5475),
+    (74, 'Al-Muddaththir', 'The Cloaked One', 56, 'makkah', 5495),
+    (75, 'Al-Qiyamah', 'The Resurrection', 40, 'makkah', 5551),
+    (76, 'Al-Insan', 'The Man', 31, 'madinah', 5591),
+    (77, 'Al-Mursalat', 'The Emissaries', 50, 'makkah', 5622),
+    (78, 'An-Naba', 'The Tidings', 40, 'makkah', 5672),
+    (79, "An-Nazi'at", 'Those who drag forth', 46, 'makkah', 5712),
+    (80, "'Abasa", 'He Frowned', 42, 'makkah', 5758),
+    (81, 'At-Takwir', 'The Overthrowing', 29, 'makkah', 5800),
+    (82, 'Al-Infitar', 'The Cleaving', 19, 'makkah', 5829),
+    (83, 'Al-Mutaffifin', 'The Defrauding', 36, 'makkah', 5848),
+    (84, 'Al-Inshiqaq', 'The Sundering', 25, 'makkah', 5884),
+    (85, 'Al-Buruj', 'The Mansions of the Stars', 22, 'makkah', 5909),
+    (86, 'At-Tariq', 'The Nightcommer', 17, 'makkah', 5931),
+    (87, "Al-A'la", 'The Most High', 19, 'makkah', 5948),
+    (88, 'Al-Ghashiyah', 'The Overwhelming', 26, 'makkah', 5967),
+    (89, 'Al-Fajr', 'The Dawn', 30, 'makkah', 5993),
+    (90, 'Al-Balad', 'The City', 20, 'makkah', 6023),
+    (91, 'Ash-Shams', 'The Sun', 15, 'makkah', 6043),
+    (92, 'Al-Layl', 'The Night', 21, 'makkah', 6058),
+    (93, 'Ad-Duhaa', 'The Morning Hours', 11, 'makkah', 6079),
+    (94, 'Ash-Sharh', 'The Relief', 8, 'makkah', 6090),
+    (95, 'At-Tin', 'The Fig', 8, 'makkah', 6098),
+    (96, "Al-'Alaq", 'The Clot', 19, 'makkah', 6106),
+    (97, 'Al-Qadr', 'The Power', 5, 'makkah', 6125),
+    (98, 'Al-Bayyinah', 'The Clear Proof', 8, 'madinah', 6130),
+    (99, 'Az-Zalzalah', 'The Earthquake', 8, 'madinah', 6138),
+    (100, "Al-'Adiyat", 'The Courser', 11, 'makkah', 6146),
+    (101, "Al-Qari'ah", 'The Calamity', 11, 'makkah', 6157),
+    (102, 'At-Takathur', 'The Rivalry in world increase', 8, 'makkah', 6168),
+    (103, "Al-'Asr", 'The Declining Day', 3, 'makkah', 6176),
+    (104, 'Al-Humazah', 'The Traducer', 9, 'makkah', 6179),
+    (105, 'Al-Fil', 'The Elephant', 5, 'makkah', 6188),
+    (106, 'Quraysh', 'Quraysh', 4, 'makkah', 6193),
+    (107, "Al-Ma'un", 'The Small kindnesses', 7, 'makkah', 6197),
+    (108, 'Al-Kawthar', 'The Abundance', 3, 'makkah', 6204),
+    (109, 'Al-Kafirun', 'The Disbelievers', 6, 'makkah', 6207),
+    (110, 'An-Nasr', 'The Divine Support', 3, 'madinah', 6213),
+    (111, 'Al-Masad', 'The Palm Fiber', 5, 'makkah', 6216),
+    (112, 'Al-Ikhlas', 'The Sincerity', 4, 'makkah', 6221),
+    (113, 'Al-Falaq', 'The Daybreak', 5, 'makkah', 6225),
+    (114, 'An-Nas', 'Mankind', 6, 'makkah', 6230),
+)
@@ -1,116 +1,77 @@
-SURAHS = [
-    "1. Al-Fatihah (The Opener)",
-    "2. Al-Baqarah (The Cow)",
-    "3. Ali 'Imran (Family of Imran)",
-    "4. An-Nisa (The Women)",
-    "5. Al-Ma'idah (The Table Spread)",
-    "6. Al-An'am (The Cattle)",
-    "7. Al-A'raf (The Heights)",
-    "8. Al-Anfal (The Spoils of War)",
-    "9. At-Tawbah (The Repentance)",
-    "10. Yunus (Jonah)",
-    "11. Hud (Hud)",
-    "12. Yusuf (Joseph)",
-    "13. Ar-Ra'd (The Thunder)",
-    "14. Ibrahim (Abraham)",
-    "15. Al-Hijr (The Rocky Tract)",
-    "16. An-Nahl (The Bee)",
-    "17. Al-Isra (The Night Journey)",
-    "18. Al-Kahf (The Cave)",
-    "19. Maryam (Mary)",
-    "20. Taha (Ta-Ha)",
-    "21. Al-Anbya (The Prophets)",
-    "22. Al-Hajj (The Pilgrimage)",
-    "23. Al-Mu'minun (The Believers)",
-    "24. An-Nur (The Light)",
-    "25. Al-Furqan (The Criterion)",
-    "26. Ash-Shu'ara (The Poets)",
-    "27. An-Naml (The Ant)",
-    "28. Al-Qasas (The Stories)",
-    "29. Al-'Ankabut (The Spider)",
-    "30. Ar-Rum (The Romans)",
-    "31. Luqman (Luqman)",
-    "32. As-Sajdah (The Prostration)",
-    "33. Al-Ahzab (The Combined Forces)",
-    "34. Saba (Sheba)",
-    "35. Fatir (Originator)",
-    "36. Ya-Sin (Ya Sin)",
-    "37. As-Saffat (Those who set the Ranks)",
-    "38. Sad (The Letter 'Saad')",
-    "39. Az-Zumar (The Troops)",
-    "40. Ghafir (The Forgiver)",
-    "41. Fussilat (Explained in Detail)",
-    "42. Ash-Shuraa (The Consultation)",
-    "43. Az-Zukhruf (The Ornaments of Gold)",
-    "44. Ad-Dukhan (The Smoke)",
-    "45. Al-Jathiyah (The Crouching)",
-    "46. Al-Ahqaf (The Wind-Curved Sandhills)",
-    "47. Muhammad (Muhammad)",
-    "48. Al-Fath (The Victory)",
-    "49. Al-Hujurat (The Rooms)",
-    "50. Qaf (The Letter 'Qaf')",
-    "51. Adh-Dhariyat (The Winnowing Winds)",
-    "52. At-Tur (The Mount)",
-    "53. An-Najm (The Star)",
-    "54. Al-Qamar (The Moon)",
-    "55. Ar-Rahman (The Beneficent)",
-    "56. Al-Waqi'ah (The Inevitable)",
-    "57. Al-Hadid (The Iron)",
-    "58. Al-Mujadila (The Pleading Woman)",
-    "59. Al-Hashr (The Exile)",
-    "60. Al-Mumtahanah (She that is to be examined)",
-    "61. As-Saf (The Ranks)",
-    "62. Al-Jumu'ah (The Congregation, Friday)",
-    "63. Al-Munafiqun (The Hypocrites)",
-    "64. At-Taghabun (The Mutual Disillusion)",
-    "65. At-Talaq (The Divorce)",
-    "66. At-Tahrim (The Prohibition)",
-    "67. Al-Mulk (The Sovereignty)",
-    "68. Al-Qalam (The Pen)",
-    "69. Al-Haqqah (The Reality)",
-    "70. Al-Ma'arij (The Ascending Stairways)",
-    "71. Nuh (Noah)",
-    "72. Al-Jinn (The Jinn)",
-    "73. Al-Muzzammil (The Enshrouded One)",
-    "74. Al-Muddaththir (The Cloaked One)",
-    "75. Al-Qiyamah (The Resurrection)",
-    "76. Al-Insan (The Man)",
-    "77. Al-Mursalat (The Emissaries)",
-    "78. An-Naba (The Tidings)",
-    "79. An-Nazi'at (Those who drag forth)",
-    "80. 'Abasa (He Frowned)",
-    "81. At-Takwir (The Overthrowing)",
-    "82. Al-Infitar (The Cleaving)",
-    "83. Al-Mutaffifin (The Defrauding)",
-    "84. Al-Inshiqaq (The Sundering)",
-    "85. Al-Buruj (The Mansions of the Stars)",
-    "86. At-Tariq (The Nightcommer)",
-    "87. Al-A'la (The Most High)",
-    "88. Al-Ghashiyah (The Overwhelming)",
-    "89. Al-Fajr (The Dawn)",
-    "90. Al-Balad (The City)",
-    "91. Ash-Shams (The Sun)",
-    "92. Al-Layl (The Night)",
-    "93. Ad-Duhaa (The Morning Hours)",
-    "94. Ash-Sharh (The Relief)",
-    "95. At-Tin (The Fig)",
-    "96. Al-'Alaq (The Clot)",
-    "97. Al-Qadr (The Power)",
-    "98. Al-Bayyinah (The Clear Proof)",
-    "99. Az-Zalzalah (The Earthquake)",
-    "100. Al-'Adiyat (The Courser)",
-    "101. Al-Qari'ah (The Calamity)",
-    "102. At-Takathur (The Rivalry in world increase)",
-    "103. Al-'Asr (The Declining Day)",
-    "104. Al-Humazah (The Traducer)",
-    "105. Al-Fil (The Elephant)",
-    "106. Quraysh (Quraysh)",
-    "107. Al-Ma'un (The Small kindnesses)",
-    "108. Al-Kawthar (The Abundance)",
-    "109. Al-Kafirun (The Disbelievers)",
-    "110. An-Nasr (The Divine Support)",
-    "111. Al-Masad (The Palm Fiber)",
-    "112. Al-Ikhlas (The Sincerity)",
-    "113. Al-Falaq (The Daybreak)",
-    "114. An-Nas (Mankind)",
-]
+"""
+Surah metadata loaded from the generated `utils/surah_table.py`.
+
+Lookups by surah number are tuple indexing; `locate_ayah` maps a global Ayah
+number (1-6236) back to its surah with a binary search over the offsets.
+"""
+from bisect import bisect_right
+from typing import NamedTuple
+
+from utils.surah_table import SURAH_TABLE
+
+
+class Surah(NamedTuple):
+    id: int
+    name: str
+    translated_name: str
+    ayah_count: int
+    revelation_place: str
+    ayah_offset: int
+
+    @property
+    def label(self) -> str:
+        return f"{self.id}. {self.name} ({self.translated_name})"
+
+
+# Index 0 is unused so SURAH_INFO[n] is Surah n
+SURAH_INFO = (None,) + tuple(Surah(*row) for row in SURAH_TABLE)
+SURAH_COUNT = len(SURAH_TABLE)
+TOTAL_AYAHS = SURAH_INFO[-1].ayah_offset + SURAH_INFO[-1].ayah_count
+
+# Display strings, e.g. "1. Al-Fatihah (The Opener)"
+SURAHS = [surah.label for surah in SURAH_INFO[1:]]
+
+_OFFSETS = [surah.ayah_offset for surah in SURAH_INFO[1:]]
+
+
+def get_surah(surah_number: int) -> Surah:
+    """
+    Returns the metadata of a surah, or None if the number is out of range.
+    """
+    if 1 <= surah_number <= SURAH_COUNT:
+        return SURAH_INFO[surah_number]
+    return None
+
+
+def ayah_count(surah_number: int) -> int:
+    """
+    Returns the number of Ayahs in a surah.
+    """
+    return SURAH_INFO[surah_number].ayah_count
+
+
+def clamp_ayah_range(surah_number: int, start: int = None, end: int = None) -> tuple[int, int]:
+    """
+    Returns inclusive `(start, end)` bounds limited to the Ayahs that exist in the surah.
+    """
+    count = ayah_count(surah_number)
+    start = max(1, start or 1)
+    end = min(count, end or count)
+    return start, end
+
+
+def global_ayah_number(surah_number: int, ayah_number: int) -> int:
+    """
+    Returns the 1-based position of an Ayah in the whole Quran.
+    """
+    return SURAH_INFO[surah_number].ayah_offset + ayah_number
+
+
+def locate_ayah(global_number: int) -> tuple[int, int]:
+    """
+    Returns `(surah_number, ayah_number)` for a global Ayah number.
+    """
+    if not 1 <= global_number <= TOTAL_AYAHS:
+        raise ValueError(f"Ayah {global_number} is outside 1-{TOTAL_AYAHS}")
+    surah_number = bisect_right(_OFFSETS, global_number - 1)
+    return surah_number, global_number - SURAH_INFO[surah_number].ayah_offset
@@ -0,0 +1,119 @@
+"""
+Offline translation corpus.
+
+Translation editions are imported once from AlQuran.cloud into a single SQLite
+file keyed by (edition, surah, ayah), so playback can look texts up without
+any network I/O.
+"""
+import os
+import sqlite3
+
+from utils.api_client import get_client
+
+TRANSLATION_DB = os.getenv("TRANSLATION_DB", "data/translations.sqlite3")
+
+
+class TranslationStore:
+    """
+    Lazily opened, read-mostly SQLite store of translation texts.
+    """
+    def __init__(self, path: str = TRANSLATION_DB):
+        self.path = path
+        self._conn = None
+        self._editions = None
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        if self._conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            # Keep the resident page cache small; lookups hit the primary key index directly
+            self._conn.execute("PRAGMA cache_size = -512")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS translations ("
+                "edition TEXT NOT NULL, surah INTEGER NOT NULL, ayah INTEGER NOT NULL, text TEXT NOT NULL, "
+                "PRIMARY KEY (edition, surah, ayah)) WITHOUT ROWID"
+            )
+        return self._conn
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+        self._conn = None
+        self._editions = None
+
+    def editions(self) -> set[str]:
+        """
+        Returns the editions that have been imported.
+        """
+        if self._editions is None:
+            if not os.path.exists(self.path):
+                return set()
+            rows = self.conn.execute("SELECT DISTINCT edition FROM translations").fetchall()
+            self._editions = {row[0] for row in rows}
+        return self._editions
+
+    def has_edition(self, edition: str) -> bool:
+        return edition in self.editions()
+
+    def get(self, edition: str, surah_number: int, ayah_number: int) -> str:
+        """
+        Returns the translation of a single Ayah, or None if it is not stored.
+        """
+        if not self.has_edition(edition):
+            return None
+        row = self.conn.execute(
+            "SELECT text FROM translations WHERE edition = ? AND surah = ? AND ayah = ?",
+            (edition, surah_number, ayah_number),
+        ).fetchone()
+        return row[0] if row else None
+
+    def get_range(self, edition: str, surah_number: int, start: int = None, end: int = None) -> dict[int, str]:
+        """
+        Returns `{ayah_number: text}` for an inclusive Ayah range of a surah.
+        """
+        if not self.has_edition(edition):
+            return {}
+        rows = self.conn.execute(
+            "SELECT ayah, text FROM translations WHERE edition = ? AND surah = ? AND ayah BETWEEN ? AND ? ORDER BY ayah",
+            (edition, surah_number, start or 1, end or 10000),
+        ).fetchall()
+        return dict(rows)
+
+    async def import_edition(self, edition: str) -> int:
+        """
+        Downloads a whole translation edition in one request and stores it. Returns the Ayah count.
+        """
+        client = get_client()
+        url = f"{client.alquran_cloud_api}/quran/{edition}"
+        async with client.get("quran_edition", url) as response:
+            if response.status == 200:
+                data = await response.json()
+            else:
+                error_text = await response.text()
+                raise Exception(f"AlQuran.cloud API returned status {response.status}: {error_text}")
+
+        rows = [
+            (edition, surah["number"], ayah["numberInSurah"], ayah["text"])
+            for surah in data.get("data", {}).get("surahs", [])
+            for ayah in surah.get("ayahs", [])
+        ]
+        with self.conn:
+            self.conn.execute("DELETE FROM translations WHERE edition = ?", (edition,))
+            self.conn.executemany("INSERT INTO translations VALUES (?, ?, ?, ?)", rows)
+        self._editions = None
+        return len(rows)
+
+
+_store = None
+
+def get_translation_store() -> TranslationStore:
+    """
+    Returns the process-wide translation store.
+    """
+    global _store
+    if _store is None:
+        _store = TranslationStore()
+    return _store
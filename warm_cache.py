@@ -0,0 +1,274 @@
+"""
+Warms the local caches so production playback reads only local data.
+
+Usage: python warm_cache.py [--reciters KEY ...] [--languages KEY ...] [--surahs 1-114]
+                            [--no-surah-audio] [--no-ayah-audio] [--concurrency 8] [--rate 10] [--verify]
+
+Downloads full-surah and per-Ayah audio into the audio cache, stores the Ayah
+timestamps used for seeking into full-surah recordings, and imports the
+translation editions into the offline store, for the chosen `RECITER_MAPPING`
+and `TRANSLATION_MAPPING` keys. Downloads run on a bounded worker pool behind a
+token-bucket rate limit. Every completed file is appended to a checksum manifest
+in the cache directory, so an interrupted run resumes where it stopped.
+
+The run is refused up front when the chosen files would not fit in
+AUDIO_CACHE_MAX_BYTES, since the cache would evict its own downloads.
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import time
+
+from utils.api_client import RECITER_MAPPING, TRANSLATION_MAPPING, get_client
+from utils.audio_cache import get_cache
+from utils.ayah_timestamps import get_timestamp_index
+from utils.providers import resolve_surah_audio_url, resolve_surah_ayahs
+from utils.surahs import SURAH_COUNT, TOTAL_AYAHS, get_surah
+from utils.translation_store import get_translation_store
+
+# Rough size of one Ayah of recitation at 128 kbps, used to check the run fits the cache budget
+ESTIMATED_AYAH_BYTES = int(os.getenv("WARM_ESTIMATED_AYAH_BYTES", "200000"))
+
+
+def parse_surahs(spec: str) -> list[int]:
+    """
+    Parses "1-10,36,67-114" into surah numbers.
+    """
+    surahs = set()
+    for part in spec.split(","):
+        start, _, end = part.partition("-")
+        surahs.update(range(int(start), int(end or start) + 1))
+    return sorted(surah for surah in surahs if 1 <= surah <= SURAH_COUNT)
+
+
+def sha256_file(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class RateLimiter:
+    """
+    Token bucket allowing `rate` acquisitions per second with bursts of up to `rate`.
+    """
+    def __init__(self, rate: float):
+        self.rate = rate
+        self.tokens = rate
+        self.updated = time.monotonic()
+        self.lock = asyncio.Lock()
+
+    async def acquire(self):
+        if self.rate <= 0:
+            return
+        async with self.lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.rate, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class Manifest:
+    """
+    Append-only JSON-lines record of cached files and their checksums.
+
+    Each line is written once its file is in place, so a crash loses at most the
+    line being written and the file is simply checked again on the next run.
+    """
+    def __init__(self, path: str):
+        self.path = path
+        self.entries = {}
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue
+                    self.entries[entry["file"]] = entry
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._file = open(path, "a", encoding="utf-8")
+
+    def is_complete(self, file: str, verify: bool = False) -> bool:
+        entry = self.entries.get(file)
+        if entry is None or not os.path.exists(file) or os.path.getsize(file) != entry["bytes"]:
+            return False
+        return not verify or sha256_file(file) == entry["sha256"]
+
+    def add(self, file: str, **fields):
+        entry = {"file": file, **fields}
+        self.entries[file] = entry
+        self._file.write(json.dumps(entry) + "\n")
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+
+class CacheWarmer:
+    def __init__(self, reciters: list[str], editions: list[str], surahs: list[int], surah_audio: bool = True,
+                 ayah_audio: bool = True, concurrency: int = 8, rate: float = 10.0, verify: bool = False):
+        self.reciters = reciters
+        self.editions = editions
+        self.surahs = surahs
+        self.surah_audio = surah_audio
+        self.ayah_audio = ayah_audio
+        self.concurrency = concurrency
+        self.verify = verify
+        self.limiter = RateLimiter(rate)
+        self.cache = get_cache()
+        self.manifest = Manifest(os.path.join(self.cache.directory, "manifest.jsonl"))
+        self.jobs = asyncio.Queue(maxsize=concurrency * 4)
+        self.downloaded = self.skipped = self.failed = self.bytes = 0
+        self.started = time.monotonic()
+
+    def report(self, final: bool = False):
+        elapsed = max(time.monotonic() - self.started, 1e-9)
+        print(f"{'Done' if final else 'Progress'}: {self.downloaded} downloaded, {self.skipped} already cached, "
+              f"{self.failed} failed, {self.bytes / 2 ** 20:.1f} MiB in {elapsed:.0f}s "
+              f"({self.downloaded / elapsed:.1f} files/s, {self.bytes / 2 ** 20 / elapsed:.2f} MiB/s)")
+
+    def estimated_bytes(self) -> int:
+        """
+        Estimates the size of every file the run would cache, from the Ayah count of each surah.
+        """
+        ayahs = sum(get_surah(surah).ayah_count for surah in self.surahs)
+        copies = len(self.reciters) * (int(self.surah_audio) + int(self.ayah_audio))
+        return ayahs * copies * ESTIMATED_AYAH_BYTES
+
+    async def run(self):
+        if not self.cache.enabled:
+            raise SystemExit("The audio cache is disabled (AUDIO_CACHE_MAX_BYTES=0).")
+        estimate = self.estimated_bytes()
+        if estimate > self.cache.max_bytes:
+            raise SystemExit(
+                f"The chosen audio needs about {estimate / 2 ** 30:.1f} GiB but AUDIO_CACHE_MAX_BYTES allows "
+                f"{self.cache.max_bytes / 2 ** 30:.1f} GiB. Raise AUDIO_CACHE_MAX_BYTES or choose fewer "
+                f"--reciters/--surahs (or --no-surah-audio/--no-ayah-audio)."
+            )
+        await self.cache.load()
+
+        await self.import_translations()
+        workers = [asyncio.create_task(self.worker()) for _ in range(self.concurrency)]
+        reporter = asyncio.create_task(self.report_periodically())
+        try:
+            await self.produce()
+            await self.jobs.join()
+        finally:
+            for task in workers + [reporter]:
+                task.cancel()
+            await asyncio.gather(*workers, reporter, return_exceptions=True)
+            self.manifest.close()
+            self.report(final=True)
+        if self.bytes and self.cache.total_bytes >= self.cache.max_bytes:
+            print("Warning: the cache reached AUDIO_CACHE_MAX_BYTES, so older files were evicted. Raise the budget to keep everything.")
+
+    async def import_translations(self):
+        store = get_translation_store()
+        for edition in self.editions:
+            if store.has_edition(edition):
+                count = store.conn.execute("SELECT COUNT(*) FROM translations WHERE edition = ?", (edition,)).fetchone()[0]
+                if count == TOTAL_AYAHS:
+                    print(f"Translation {edition} already imported")
+                    continue
+            await self.limiter.acquire()
+            print(f"Imported translation {edition}: {await store.import_edition(edition)} ayahs")
+
+    async def report_periodically(self, interval: float = 10.0):
+        while True:
+            await asyncio.sleep(interval)
+            self.report()
+
+    async def produce(self):
+        """
+        Resolves audio URLs per reciter and surah and queues the files that still need downloading.
+        """
+        for reciter_key in self.reciters:
+            reciter_config = RECITER_MAPPING[reciter_key]
+            for surah in self.surahs:
+                try:
+                    if self.surah_audio:
+                        await self.limiter.acquire()
+                        audio_key, audio_url = await resolve_surah_audio_url(reciter_config, surah)
+                        if audio_url:
+                            await self.jobs.put((audio_key, surah, None, audio_url))
+                        if reciter_config.get("quran_com_chapters"):
+                            await self.limiter.acquire()
+                            await get_timestamp_index().get(reciter_config["quran_com_chapters"], surah)
+                    if self.ayah_audio:
+                        await self.limiter.acquire()
+                        audio_key, ayahs = await resolve_surah_ayahs(reciter_config, surah)
+                        for ayah_number, ayah in ayahs.items():
+                            if ayah["audio"]:
+                                await self.jobs.put((audio_key, surah, ayah_number, ayah["audio"]))
+                except Exception as e:
+                    self.failed += 1
+                    print(f"Failed to resolve {reciter_key} Surah {surah}: {e}")
+
+    async def worker(self):
+        while True:
+            job = await self.jobs.get()
+            try:
+                await self.warm(*job)
+            except Exception as e:
+                self.failed += 1
+                print(f"Failed to download {job[0]} Surah {job[1]} Ayah {job[2]}: {e}")
+            finally:
+                self.jobs.task_done()
+
+    async def warm(self, reciter: str, surah_number: int, ayah_number: int, audio_url: str):
+        path = self.cache.path_for(reciter, surah_number, ayah_number)
+        if await asyncio.to_thread(self.manifest.is_complete, path, self.verify):
+            self.skipped += 1
+            return
+
+        # Files played in production before the first warm-up only need a checksum
+        if self.cache.get(reciter, surah_number, ayah_number) and not self.verify:
+            self.skipped += 1
+        else:
+            if os.path.exists(path):
+                os.remove(path)
+                self.cache.total_bytes -= self.cache.entries.pop(path, 0)
+            await self.limiter.acquire()
+            path = await self.cache.fetch(reciter, surah_number, ayah_number, audio_url)
+            self.downloaded += 1
+            self.bytes += os.path.getsize(path)
+
+        self.manifest.add(
+            path, reciter=reciter, surah=surah_number, ayah=ayah_number,
+            bytes=os.path.getsize(path), sha256=await asyncio.to_thread(sha256_file, path),
+        )
+
+
+async def main(args: argparse.Namespace):
+    editions = [TRANSLATION_MAPPING[key]["aladhan"] for key in args.languages if TRANSLATION_MAPPING[key]["aladhan"]]
+    warmer = CacheWarmer(
+        args.reciters, editions, parse_surahs(args.surahs), surah_audio=not args.no_surah_audio,
+        ayah_audio=not args.no_ayah_audio, concurrency=args.concurrency, rate=args.rate, verify=args.verify,
+    )
+    try:
+        await warmer.run()
+    finally:
+        await get_client().close()
+        get_translation_store().close()
+        get_timestamp_index().close()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Download recitation audio and translations into the local caches.")
+    parser.add_argument("--reciters", nargs="+", choices=list(RECITER_MAPPING), default=list(RECITER_MAPPING))
+    parser.add_argument("--languages", nargs="*", choices=list(TRANSLATION_MAPPING), default=list(TRANSLATION_MAPPING))
+    parser.add_argument("--surahs", default=f"1-{SURAH_COUNT}", help="surah numbers and ranges, e.g. 1-10,36")
+    parser.add_argument("--no-surah-audio", action="store_true", help="skip full-surah recordings")
+    parser.add_argument("--no-ayah-audio", action="store_true", help="skip per-Ayah recordings")
+    parser.add_argument("--concurrency", type=int, default=8, help="parallel downloads")
+    parser.add_argument("--rate", type=float, default=10.0, help="maximum requests per second (0 for unlimited)")
+    parser.add_argument("--verify", action="store_true", help="re-hash files listed in the manifest and re-download mismatches")
+    asyncio.run(main(parser.parse_args()))